@@ -24,12 +24,12 @@
 # -----------------------------------------------------------------------------
 import _thread
 from collections import OrderedDict
-from time import sleep
 
 from ev3dev2 import Device
 from ev3dev2._platform.ev3 import LEDS, LED_GROUPS, LED_COLORS, LED_DEFAULT_COLOR
 from ev3dev2simulator.connector.led_connector import LedConnector
 from ev3dev2.stopwatch import StopWatch
+from ev3dev2simulator.connector.clock_connector import ClockConnector
 
 
 class Led(Device):
@@ -340,6 +340,7 @@ class Leds(object):
             self.all_off()
             even = True
             duration_ms = duration * 1000
+            clock = ClockConnector()
             stopwatch = StopWatch()
             stopwatch.start()
 
@@ -355,7 +356,7 @@ class Leds(object):
                     break
 
                 even = not even
-                sleep(sleeptime)
+                clock.sleep(sleeptime)
 
             self.animate_thread_stop = False
             self.animate_thread_id = None
@@ -388,6 +389,7 @@ class Leds(object):
         def _animate_flash():
             even = True
             duration_ms = duration * 1000
+            clock = ClockConnector()
             stopwatch = StopWatch()
             stopwatch.start()
 
@@ -402,7 +404,7 @@ class Leds(object):
                     break
 
                 even = not even
-                sleep(sleeptime)
+                clock.sleep(sleeptime)
 
             self.animate_thread_stop = False
             self.animate_thread_id = None
@@ -437,6 +439,7 @@ class Leds(object):
             index = 0
             max_index = len(colors)
             duration_ms = duration * 1000
+            clock = ClockConnector()
             stopwatch = StopWatch()
             stopwatch.start()
 
@@ -452,7 +455,7 @@ class Leds(object):
                 if self.animate_thread_stop or stopwatch.value_ms >= duration_ms:
                     break
 
-                sleep(sleeptime)
+                clock.sleep(sleeptime)
 
             self.animate_thread_stop = False
             self.animate_thread_id = None
@@ -494,6 +497,7 @@ class Leds(object):
             MAX_VALUE = 1
             self.all_off()
             duration_ms = duration * 1000
+            clock = ClockConnector()
             stopwatch = StopWatch()
             stopwatch.start()
 
@@ -531,7 +535,7 @@ class Leds(object):
                 if self.animate_thread_stop or stopwatch.value_ms >= duration_ms:
                     break
 
-                sleep(sleeptime)
+                clock.sleep(sleeptime)
 
             self.animate_thread_stop = False
             self.animate_thread_id = None
@@ -21,12 +21,12 @@
 # -----------------------------------------------------------------------------
 import _thread
 import sys
-import time
 import math
 from collections import OrderedDict
 
 from ev3dev2 import Device
-from ev3dev2simulator.connector.motor_connector import MotorConnector
+from ev3dev2simulator.connector.clock_connector import ClockConnector
+from ev3dev2simulator.connector.motor_connector import MotorConnector, MotorCommandGroup
 
 if sys.version_info < (3, 4):
     raise SystemError('Must be using Python 3.4 or higher')
@@ -294,7 +294,7 @@ class Motor(Device):
         'max_dps',
         'max_dpm',
         'connector',
-        'running_until',
+        'clock',
     ]
 
     #: Run the motor until another command is sent.
@@ -411,7 +411,7 @@ class Motor(Device):
         self.max_dpm = self.max_rpm * 360
 
         self.connector = MotorConnector(self.address, self.max_speed)
-        self.running_until = time.time()
+        self.clock = ClockConnector()
 
 
     @property
@@ -558,12 +558,12 @@ class Motor(Device):
         Writing will set the position to that value.
         """
 
-        return self._position
+        return self.connector.get_position()  # CHANGE: read the encoder of the simulated motor
 
 
     @position.setter
     def position(self, value):
-        self._position = value
+        self.connector.set_position(value)  # CHANGE: reset the encoder of the simulated motor
 
 
     @property
@@ -645,7 +645,7 @@ class Motor(Device):
         attribute to convert this value to RPM or deg/sec.
         """
 
-        return self._speed
+        return self.connector.get_speed()  # CHANGE: read the speed of the simulated motor
 
 
     @property
@@ -753,7 +753,7 @@ class Motor(Device):
         `running`, `ramping`, `holding`, `overloaded` and `stalled`.
         """
 
-        if time.time() < self.running_until:
+        if self.connector.is_running():  # CHANGE: the simulator tells when the motor is idle
             return Motor.STATE_RUNNING
         else:
             return Motor.STATE_HOLDING
@@ -819,8 +819,7 @@ class Motor(Device):
 
         self.command = self.COMMAND_RUN_FOREVER
 
-        run_time = self.connector.run_forever()
-        self.running_until = time.time() + run_time
+        self.connector.run_forever()
 
 
     def run_to_abs_pos(self):
@@ -831,8 +830,8 @@ class Motor(Device):
 
         self._command = self.COMMAND_RUN_TO_ABS_POS
 
-        run_time = self.connector.run_to_rel_pos()
-        self.running_until = time.time() + run_time
+        self.connector.set_distance(self.position_sp - self.position)  # CHANGE: distance to the target position
+        self.connector.run_to_rel_pos()
 
 
     def run_to_rel_pos(self):
@@ -845,8 +844,7 @@ class Motor(Device):
 
         self.command = self.COMMAND_RUN_TO_REL_POS
 
-        run_time = self.connector.run_to_rel_pos()
-        self.running_until = time.time() + run_time
+        self.connector.run_to_rel_pos()
 
 
     def run_timed(self):
@@ -857,8 +855,7 @@ class Motor(Device):
 
         self.command = self.COMMAND_RUN_TIMED
 
-        run_time = self.connector.run_timed()
-        self.running_until = time.time() + run_time
+        self.connector.run_timed()
 
 
     def run_direct(self):
@@ -870,8 +867,7 @@ class Motor(Device):
 
         self.command = self.COMMAND_RUN_DIRECT
 
-        run_time = self.connector.run_direct()
-        self.running_until = time.time() + run_time
+        self.connector.run_direct()
 
 
     def stop(self):
@@ -882,8 +878,7 @@ class Motor(Device):
 
         self.command = self.COMMAND_STOP
 
-        run_time = self.connector.stop()
-        self.running_until = time.time() + run_time
+        self.connector.stop()
 
 
     def reset(self):
@@ -894,8 +889,7 @@ class Motor(Device):
 
         self.command = self.COMMAND_RESET
 
-        run_time = self.connector.stop()
-        self.running_until = time.time() + run_time
+        self.connector.stop()
 
 
     @property
@@ -904,7 +898,7 @@ class Motor(Device):
         Power is being sent to the motor.
         """
 
-        return time.time() < self.running_until
+        return self.connector.is_running()
 
 
     @property
@@ -921,7 +915,7 @@ class Motor(Device):
         The motor is not turning, but rather attempting to hold a fixed position.
         """
 
-        return time.time() > self.running_until
+        return not self.connector.is_running()
 
 
     @property
@@ -949,24 +943,24 @@ class Motor(Device):
         is reached.
         """
 
-        start = time.time()
-
-        if timeout:
-            sleep_time = min(timeout, 0.1)
-        else:
-            sleep_time = 0.1
+        start = self.clock.time()
 
+        # CHANGE: the simulator pushes an event when the motor becomes idle, so wait for that instead of
+        # checking every 100 ms. The change frame is taken before checking the state, so an event pushed in
+        # between ends the wait right away instead of being missed.
         while True:
-            now = time.time()
-
-            if cond(now):
+            frame = self.connector.get_change_frame()
+            if cond(self.state):
                 return True
 
-            time.sleep(sleep_time)
+            remaining = None
+            if timeout is not None:
+                remaining = start + timeout / 1000 - self.clock.time()
+                if remaining <= 0:
+                    # Final check when user timeout is reached
+                    return cond(self.state)
 
-            if timeout is not None and time.time() >= start + timeout / 1000:
-                # Final check when user timeout is reached
-                return cond(now)
+            self.connector.wait_for_change(frame, remaining)
 
 
     def wait_until_not_moving(self, timeout=None):
@@ -981,8 +975,7 @@ class Motor(Device):
             m.wait_until_not_moving()
         """
 
-        l = lambda now: True if self.running_until is None else self.running_until < now
-        return self.wait(l, timeout)
+        return self.wait(lambda state: self.STATE_RUNNING not in state or self.STATE_STALLED in state, timeout)
 
 
     def wait_until(self, s, timeout=None):
@@ -996,8 +989,7 @@ class Motor(Device):
             m.wait_until('stalled')
         """
 
-        l = lambda now: False if self.running_until is None else now < self.running_until
-        return self.wait(l, timeout)
+        return self.wait(lambda state: s in state, timeout)
 
 
     def wait_while(self, s, timeout=None):
@@ -1011,8 +1003,7 @@ class Motor(Device):
             m.wait_while('running')
         """
 
-        l = lambda now: True if self.running_until is None else self.running_until < now
-        return self.wait(l, timeout)
+        return self.wait(lambda state: s not in state, timeout)
 
 
     def _speed_native_units(self, speed, label=None):
@@ -1215,6 +1206,7 @@ class MotorSet(object):
             self.motors[motor_port].reset()
 
         self.desc = desc
+        self.clock = ClockConnector()
 
 
     def __str__(self):
@@ -1304,8 +1296,9 @@ class MotorSet(object):
         for motor in motors:
             motor._set_brake(brake)
 
-        for motor in motors:
-            motor.stop()
+        with self._command_group(motors):
+            for motor in motors:
+                motor.stop()
 
 
     def stop(self, motors=None, brake=True):
@@ -1317,6 +1310,12 @@ class MotorSet(object):
         self.off(motors, brake)
 
 
+    def _command_group(self, motors=None):
+        # CHANGE: send the commands of the motors in a single message, so the simulator starts them in the same frame
+        motors = motors if motors is not None else self.motors.values()
+        return MotorCommandGroup(motor.connector for motor in motors)
+
+
     def _is_state(self, motors, state):
         motors = motors if motors is not None else self.motors.values()
 
@@ -1508,8 +1507,9 @@ class MoveTank(MotorSet):
         #     self.right_motor.position, self.right_motor.position_sp))
 
         # Start the motors
-        self.left_motor.run_to_rel_pos()
-        self.right_motor.run_to_rel_pos()
+        with self._command_group():
+            self.left_motor.run_to_rel_pos()
+            self.right_motor.run_to_rel_pos()
 
         if block:
             self._block()
@@ -1551,8 +1551,9 @@ class MoveTank(MotorSet):
                   (self, seconds, left_speed, right_speed))
 
         # Start the motors
-        self.left_motor.run_timed()
-        self.right_motor.run_timed()
+        with self._command_group():
+            self.left_motor.run_timed()
+            self.right_motor.run_timed()
 
         if block:
             self._block()
@@ -1576,8 +1577,9 @@ class MoveTank(MotorSet):
         #     (self, self.left_motor.speed_sp, self.right_motor.speed_sp))
 
         # Start the motors
-        self.left_motor.run_forever()
-        self.right_motor.run_forever()
+        with self._command_group():
+            self.left_motor.run_forever()
+            self.right_motor.run_forever()
 
 
     def follow_line(self,
@@ -1679,7 +1681,7 @@ class MoveTank(MotorSet):
                 off_line_count = 0
 
             if sleep_time:
-                time.sleep(sleep_time)
+                self.clock.sleep(sleep_time)
 
             self.on(left_speed, right_speed)
 
@@ -1996,7 +1998,7 @@ class MoveDifferential(MoveTank):
                 # Have we moved?
                 if not left_ticks and not right_ticks:
                     if sleep_time:
-                        time.sleep(sleep_time)
+                        self.clock.sleep(sleep_time)
                     continue
 
                 # log.debug("%s: left_ticks %s (from %s to %s)" %
@@ -2030,7 +2032,7 @@ class MoveDifferential(MoveTank):
                 self.y_pos_mm += mm * math.sin(self.theta)
 
                 if sleep_time:
-                    time.sleep(sleep_time)
+                    self.clock.sleep(sleep_time)
 
             self.odometry_thread_id = None
 
@@ -66,28 +66,30 @@ class TouchSensor(Sensor):
 
 
     def _wait(self, wait_for_press, timeout_ms, sleep_ms):
-        tic = time.time()
+        clock = self.connector.clock
+        tic = clock.time()
 
-        if sleep_ms:
-            sleep_ms = float(sleep_ms / 1000)
-
-        # The kernel does not supoort POLLPRI or POLLIN for sensors so we have
-        # to drop into a loop and check often
+        # CHANGE: the simulator pushes the value of the sensor when it changes, so wait for that instead of
+        # checking every sleep_ms. sleep_ms is ignored, the wait ends in the frame the sensor changed. The change
+        # frame is taken before reading the value, so a push in between ends the wait right away.
         while True:
-
+            frame = self.connector.get_change_frame()
             if self.is_pressed == wait_for_press:
                 return True
 
-            if timeout_ms is not None and time.time() >= tic + timeout_ms / 1000:
-                return False
+            timeout = None
+            if timeout_ms is not None:
+                timeout = tic + timeout_ms / 1000 - clock.time()
+                if timeout <= 0:
+                    return False
 
-            if sleep_ms:
-                time.sleep(sleep_ms)
+            self.connector.wait_for_change(frame, timeout)
 
 
     def wait_for_pressed(self, timeout_ms=None, sleep_ms=10):
         """
         Wait for the touch sensor to be pressed down.
+        In the simulator ``sleep_ms`` is ignored, the wait ends as soon as the sensor changes.
         """
 
         return self._wait(True, timeout_ms, sleep_ms)
@@ -96,6 +98,7 @@ class TouchSensor(Sensor):
     def wait_for_released(self, timeout_ms=None, sleep_ms=10):
         """
         Wait for the touch sensor to be released.
+        In the simulator ``sleep_ms`` is ignored, the wait ends as soon as the sensor changes.
         """
 
         return self._wait(False, timeout_ms, sleep_ms)
@@ -106,11 +109,11 @@ class TouchSensor(Sensor):
         Wait for the touch sensor to be pressed down and then released.
         Both actions must happen within timeout_ms.
         """
-        start_time = time.time()
+        start_time = self.connector.clock.time()
 
         if self.wait_for_pressed(timeout_ms, sleep_ms):
             if timeout_ms is not None:
-                timeout_ms -= int((time.time() - start_time) * 1000)
+                timeout_ms -= int((self.connector.clock.time() - start_time) * 1000)
             return self.wait_for_released(timeout_ms, sleep_ms)
 
         return False
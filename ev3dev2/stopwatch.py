@@ -7,14 +7,15 @@ from ev3dev2 import is_micropython
 if is_micropython():
     import utime
 else:
-    import datetime as dt
+    from ev3dev2simulator.connector.clock_connector import ClockConnector
 
 
 def get_ticks_ms():
     if is_micropython():
         return utime.ticks_ms()
     else:
-        return int(dt.datetime.timestamp(dt.datetime.now()) * 1000)
+        # CHANGE: use the time of the simulator instead of the wall clock
+        return int(ClockConnector().time() * 1000)
 
 
 class StopWatch(object):
@@ -145,9 +145,14 @@ class ConfigChecker:
             }),
             'exec_settings': Map({
                 'frames_per_second': Int(),
+                Optional('physics_substeps'): Int(),
+                Optional('render_frames_per_second'): Int(),
+                'transport': Regex('tcp|unix|shm'),
                 'socket_port': Int(),
+                'socket_path': Str(),
                 'bluetooth_port': Int(),
-                'message_size': Int()
+                'sensor_snapshot': Bool(),
+                'codec': Regex('binary|json')
             }),
             'motor_settings': Map({
                 'distance_coasting_subtraction': Float(),
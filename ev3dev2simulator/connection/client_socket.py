@@ -3,30 +3,60 @@ Singleton module client_sockets contains the class ClientSocket and the function
 """
 
 import json
-import socket
-import time
+import os
+import queue
+import threading
 import sys
-from typing import Any, Optional
+from typing import Any, List, Optional, Tuple
 from ev3dev2simulator.config.config import get_simulation_settings, load_config
+from ev3dev2simulator.connection.device_table import DeviceTable
 from ev3dev2simulator.connection.message.command import Command
+from ev3dev2simulator.connection.message.subscribe_request import SubscribeRequest, POSITION_SUFFIX, SPEED_SUFFIX
+from ev3dev2simulator.connection.message.watch_request import WatchRequest
+from ev3dev2simulator.connection.protocol import get_codec
+from ev3dev2simulator.connection.sensor_snapshot import SensorSnapshot
+from ev3dev2simulator.connection.transport import get_transport
 
 THIS = sys.modules[__name__]
 
+ROBOT_VARIABLE = 'EV3DEV2SIMULATOR_ROBOT'
+BRICK_VARIABLE = 'EV3DEV2SIMULATOR_BRICK'
+
 
 class ClientSocket:
     """
     Class responsible for the establishing and maintaining the socket connection with the simulator.
-    This connection is a TCP stream.
+    The transport of the connection is selected in the simulation settings, TCP by default.
+    The messages are encoded by the codec agreed on with the simulator.
+    When the simulator publishes a sensor snapshot, sensor values and the simulated time are read from it instead.
+
+    Sensors can be subscribed to, after which the simulator pushes their values whenever they change. From then on
+    a receiver thread reads all messages: it keeps the latest value of every subscribed sensor and hands the
+    responses to the thread that sent the request. Motors can be subscribed to as well, their value is the number
+    of commands they finished. Their position and speed are pushed along with it.
     """
 
     def __init__(self):
         load_config(None)
-        port = int(get_simulation_settings()['exec_settings']['socket_port'])
 
-        self.client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.client.connect(('localhost', port))
+        self.snapshot = None
+        self.snapshot_indices = {}
+        self.snapshot_motor_indices = {}
+        self.watched_sensors = set()
+        self.devices = None
+        self.client = get_transport().connect()
+        self.codec = self._handshake(get_simulation_settings()['exec_settings']['codec'])
 
-        time.sleep(1)
+        # commands can be send from multiple threads, such as animated leds, so keep requests and responses together
+        self.lock = threading.Lock()
+
+        self.receiver = None
+        self.responses = queue.Queue()
+        self.sensor_values = {}
+        self.change_frames = {}
+        self.updates = threading.Condition()
+        self.is_closed = False
+        self.sent_commands = {}
 
     def send_command(self, command: Command, wait_for_response=False) -> Optional[object]:
         """
@@ -35,44 +65,229 @@ class ClientSocket:
         :param wait_for_response: set to True if you expect a result and want to wait for it blocking.
         """
 
-        jsn = self.serialize(command)
-        self.client.send(jsn)
-
-        if wait_for_response:
-            while True:
-                data = self.client.recv(32)
+        payload = self.serialize(command)
+        with self.lock:
+            self.client.send(payload)
 
-                if data:
-                    return self.deserialize(data)
+            if wait_for_response:
+                return self.deserialize(self._receive_response())
         return None
 
-    @staticmethod
-    def serialize(message: Any) -> bytes:
+    def subscribe(self, address: Optional[str] = None):
+        """
+        Subscribe to the values of a sensor, or of all sensors of the brick. The simulator pushes the values
+        whenever they change, the latest ones are available through get_sensor_value.
+        :param address: of the sensor, None for all sensors of the brick.
+        """
+        with self.lock:
+            self.client.send(self.serialize(SubscribeRequest(address)))
+            response = self.deserialize(self._receive_response())
+            self._apply_update(response['frame'], response['values'])
+
+            if self.receiver is None:
+                self.receiver = threading.Thread(target=self._receive_messages, daemon=True)
+                self.receiver.start()
+
+    def get_sensor_value(self, address: str) -> Optional[Any]:
+        """
+        Get the latest value pushed by the simulator for a subscribed sensor.
+        :param address: of the sensor.
+        :return: the value, or None if the sensor is not subscribed to or has no value.
+        """
+        return self.sensor_values.get(address)
+
+    def count_command(self, address: str):
+        """
+        Count a command replacing the jobs of a motor, the simulator counts them as well.
+        :param address: of the motor.
+        """
+        with self.updates:
+            self.sent_commands[address] = self.sent_commands.get(address, 0) + 1
+
+    def is_idle(self, address: str) -> bool:
+        """
+        Check if a subscribed motor finished all commands counted for it.
+        :param address: of the motor.
+        """
+        with self.updates:
+            finished = self.sensor_values.get(address)
+            return finished is not None and finished >= self.sent_commands.get(address, 0)
+
+    def get_motor_state(self, address: str) -> Optional[dict]:
+        """
+        Get the latest position and speed pushed by the simulator for a subscribed motor.
+        :param address: of the motor.
+        :return: a dictionary with the position in tacho counts and the speed in tacho counts per second,
+        or None if the motor is not subscribed to.
+        """
+        with self.updates:
+            position = self.sensor_values.get(address + POSITION_SUFFIX)
+            speed = self.sensor_values.get(address + SPEED_SUFFIX)
+        if position is None or speed is None:
+            return None
+        return {'position': int(position), 'speed': int(speed)}
+
+    def get_change_frame(self, address: str) -> int:
+        """
+        Get the frame in which the value of a subscribed sensor last changed.
+        :param address: of the sensor.
+        """
+        return self.change_frames.get(address, -1)
+
+    def wait_for_change(self, address: str, frame: int, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the value of a subscribed sensor changed after the given frame.
+        :param address: of the sensor.
+        :param frame: last change known to the caller, as given by get_change_frame.
+        :param timeout: maximum time in seconds to wait, None to wait until the value changes.
+        :return: True if the value changed, False if the timeout expired.
+        """
+        with self.updates:
+            changed = self.updates.wait_for(lambda: self.is_closed or self.get_change_frame(address) > frame, timeout)
+        if self.is_closed:
+            raise ConnectionError('Connection to the simulator was closed')
+        return changed
+
+    def serialize(self, message: Any) -> bytes:
         """
         Serialize the given message so it can be send via a stream channel.
         :param message: to be serialized.
         :return: bytes representing the message.
         """
 
-        obj_dict = message.serialize()
+        return self.codec.encode_message(message.serialize())
 
-        jsn = json.dumps(obj_dict)
-        jsn = jsn.ljust(int(get_simulation_settings()['exec_settings']['message_size']), '#')
-
-        return str.encode(jsn)
-
-    @staticmethod
-    def deserialize(data: bytes) -> Any:
+    def deserialize(self, data: bytes) -> Any:
         """
         Deserialize the given data.
         :param data: to be deserialized.
         :return: any type representing value inside the data.
         """
 
-        val = data.decode()
-        obj_dict = json.loads(val)
+        return self.codec.decode_response(data)
+
+    def read_sensor(self, address: str) -> Optional[Tuple[Optional[float], int]]:
+        """
+        Read the value of a sensor from the sensor snapshot of the simulator. The simulator only evaluates sensors
+        that are needed, so the first time a sensor is read the simulator is told to watch it and None is returned,
+        because the snapshot may contain an old value.
+        :param address: of the sensor.
+        :return: a tuple with the value of the sensor and the frame it belongs to, or None if it is not in the
+        snapshot or was not watched yet.
+        """
+        index = self.snapshot_indices.get(address)
+        if self.snapshot is None or index is None:
+            return None
+        if address not in self.watched_sensors:
+            self.send_command(WatchRequest(address))
+            self.watched_sensors.add(address)
+            return None
+        return self.snapshot.read_value(index)
+
+    def read_sensors(self, addresses: List[str]) -> Optional[Tuple[List[Optional[float]], int]]:
+        """
+        Read the values of several sensors belonging to the same frame from the sensor snapshot of the simulator.
+        Like read_sensor, sensors that are read for the first time are watched first.
+        :param addresses: of the sensors.
+        :return: a tuple with the values of the sensors and the frame they belong to, or None if not all of them are
+        in the snapshot or were watched yet.
+        """
+        indices = [self.snapshot_indices.get(address) for address in addresses]
+        if self.snapshot is None or None in indices:
+            return None
+        unwatched = [address for address in addresses if address not in self.watched_sensors]
+        for address in unwatched:
+            self.send_command(WatchRequest(address))
+            self.watched_sensors.add(address)
+        if unwatched:
+            return None
+        return self.snapshot.read_values(indices)
+
+    def read_motor_state(self, address: str) -> Optional[dict]:
+        """
+        Read the position and speed of a motor from the sensor snapshot of the simulator.
+        :param address: of the motor.
+        :return: a dictionary with the position in tacho counts and the speed in tacho counts per second,
+        or None if the motor is not in the snapshot.
+        """
+        indices = self.snapshot_motor_indices.get(address)
+        if self.snapshot is None or indices is None:
+            return None
+        (position, speed), _ = self.snapshot.read_values(indices)
+        return {'position': int(round(position)), 'speed': int(round(speed))}
+
+    def _receive_response(self) -> bytes:
+        """
+        Receive the response to the request that was just sent, from the receiver thread once it runs.
+        :return: the encoded response.
+        """
+        if self.receiver is None:
+            data = self.client.receive_frame()
+        else:
+            data = self.responses.get()
+        if data is None:
+            raise ConnectionError('Connection to the simulator was closed')
+        return data
+
+    def _receive_messages(self):
+        """
+        Receive all messages from the simulator. Pushed values are stored, responses are handed over.
+        """
+        while True:
+            data = self.client.receive_frame()
+            if data is None:
+                with self.updates:
+                    self.is_closed = True
+                    self.updates.notify_all()
+                self.responses.put(None)
+                return
+
+            push = self.codec.decode_push(data)
+            if push is None:
+                self.responses.put(data)
+            else:
+                self._apply_update(*push)
+
+    def _apply_update(self, frame: int, values: dict):
+        """
+        Store the given values of subscribed sensors and wake up the threads waiting for a change.
+        :param frame: the values belong to.
+        :param values: by address.
+        """
+        with self.updates:
+            for address, value in values.items():
+                self.sensor_values[address] = value
+                self.change_frames[address] = frame
+            self.updates.notify_all()
+
+    def _handshake(self, codec_name: str):
+        """
+        Tell the simulator which robot and brick this client is and which codec it prefers. The robot and brick are
+        named by the EV3DEV2SIMULATOR_ROBOT and EV3DEV2SIMULATOR_BRICK environment variables. Without them the
+        simulator picks the first brick that is not connected yet.
+        :param codec_name: name of the preferred codec.
+        The sensor snapshot is mapped when the simulator publishes one. The devices of the brick are kept to find
+        the ports of devices without asking the simulator.
+        :return: the codec agreed on, json when the simulator does not know the preferred codec.
+        """
+        hello = {'robot': os.environ.get(ROBOT_VARIABLE), 'brick': os.environ.get(BRICK_VARIABLE), 'codec': codec_name}
+        self.client.send(str.encode(json.dumps(hello)))
+
+        data = self.client.receive_frame()
+        if data is None:
+            raise ConnectionError('Connection to the simulator was closed')
+        answer = json.loads(data.decode())
+        if 'error' in answer:
+            raise ConnectionError(answer['error'])
+        if 'devices' in answer:
+            self.devices = DeviceTable(answer['devices'])
 
-        return obj_dict['value']
+        snapshot = answer.get('snapshot')
+        if snapshot is not None and os.path.exists(snapshot['path']):
+            self.snapshot = SensorSnapshot(snapshot['path'])
+            self.snapshot_indices = snapshot['indices']
+            self.snapshot_motor_indices = snapshot.get('motors', {})
+        return get_codec(answer['codec'])
 
 
 THIS.CLIENT_SOCKET = None
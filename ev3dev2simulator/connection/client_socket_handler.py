@@ -2,51 +2,117 @@
 The client_socket_handler is used to communicate with a client opened by robot code.
 """
 
-import socket
-import threading
-from time import sleep
+from collections import deque
+from typing import List, Optional
 
-from ev3dev2simulator.config.config import get_simulation_settings
 from ev3dev2simulator.connection.message_handler import MessageHandler
 from ev3dev2simulator.state.message_processor import MessageProcessor
+from ev3dev2simulator.state.simulation_clock import PendingResult
 from ev3dev2simulator.state import robot_simulator
 
 
-class ClientSocketHandler(threading.Thread):
+class ClientSocketHandler:
     """
-    Class responsible for managing a socket connection from the ev3dev2 mock processes.
+    Class responsible for managing the socket connection of a single brick from the ev3dev2 mock processes.
+    It does not block: the ServerSockets event loop feeds it the received frames and resumes requests
+    which could only be answered after a frame has been simulated. It also pushes the changes of subscribed sensors.
     """
 
     def __init__(self, robot_sim: robot_simulator, brick_id: int, brick_name: str):
-        threading.Thread.__init__(self)
         self.message_handler = MessageHandler(MessageProcessor(brick_id, robot_sim))
         self.client = None
         self.brick_id = brick_id
-        self.is_running = True
         self.is_connected = False
         self.brick_name = brick_name
         self.robot_sim = robot_sim
-        self.message_size = int(get_simulation_settings()['exec_settings']['message_size'])
-
-    def run(self):
-        """
-        Manage the socket connection.
-        """
-        while self.is_running:
-            if not self.is_connected:
-                sleep(0.1)
-            else:
-                try:
-                    data = self.client.recv(self.message_size)
-                    if data:
-                        val = self.message_handler.process(data)
-                        if val:
-                            self.client.send(val)
-                    else:
-                        self.is_connected = False
-                except socket.error:
-                    self.is_connected = False
-                    self.robot_sim.reset_queues_of_brick(self.brick_id)
-                    print(f'Closing connection from \"{self.brick_name}\" (id: {self.brick_id}) from robot '
-                          f'\"{self.robot_sim.robot.name}\"')
-                    self.client.close()
+        self.participant = (robot_sim.robot.name, brick_id)
+        self.frames = deque()
+        self.pending: Optional[PendingResult] = None
+        self.updates = deque()
+
+    def connect(self, client, codec):
+        """
+        Start managing the given connection. The client takes part in lock-step simulations from now on.
+        :param client: connection of the client, created by the transport, after the handshake.
+        :param codec: used to encode the messages of this connection.
+        """
+        self.client = client
+        self.message_handler.codec = codec
+        self.frames = deque()
+        self.pending = None
+        self.updates = deque()
+        self.robot_sim.clock.add_participant(self.participant)
+        self.is_connected = True
+
+    def disconnect(self):
+        """
+        Stop managing the current connection, so the simulation does not wait for this client anymore.
+        """
+        self.is_connected = False
+        self.pending = None
+        self.message_handler.message_processor.clear_subscriptions()
+        self.robot_sim.clock.remove_participant(self.participant)
+        self.robot_sim.reset_queues_of_brick(self.brick_id)
+        print(f'Closing connection from \"{self.brick_name}\" (id: {self.brick_id}) from robot '
+              f'\"{self.robot_sim.robot.name}\"')
+        self.client.close()
+
+    def receive(self, frames: List[bytes]):
+        """
+        Handle the given frames received from the client.
+        :param frames: received.
+        """
+        self.frames.extend(frames)
+        self._process_frames()
+
+    def collect_updates(self, frame: int):
+        """
+        Collect the changes of the subscribed sensors, so they can be pushed by the event loop.
+        Called by the simulation thread once the sensors of the given frame have been processed.
+        :param frame: simulated.
+        """
+        changes = self.message_handler.message_processor.collect_sensor_updates()
+        if changes:
+            self.updates.append((frame, changes))
+
+    def send_updates(self):
+        """
+        Push the collected changes of the subscribed sensors to the client.
+        """
+        while self.updates:
+            frame, changes = self.updates.popleft()
+            self.client.send(self.message_handler.serialize_update(frame, changes))
+
+    def is_resumable(self) -> bool:
+        """
+        Check if the request waiting for a frame can be answered.
+        """
+        return self.pending is not None and self.pending.is_ready(self.robot_sim.clock.frame)
+
+    def resume(self):
+        """
+        Answer the request that was waiting for a frame and continue with the requests received after it.
+        """
+        pending = self.pending
+        self.pending = None
+        self.robot_sim.clock.clear_waiting(self.participant)
+        self._respond(pending.resume())
+        self._process_frames()
+
+    def _process_frames(self):
+        """
+        Process the received frames in order, until a request has to wait for a frame.
+        """
+        while self.pending is None and self.frames:
+            self._respond(self.message_handler.process(self.frames.popleft()))
+
+    def _respond(self, value):
+        """
+        Send the response to a request, or keep it until the frame it waits for has been simulated.
+        :param value: the serialized response, None when no response is needed or a PendingResult.
+        """
+        if isinstance(value, PendingResult):
+            self.pending = value
+            self.robot_sim.clock.set_waiting(self.participant, value.frame)
+        elif value:
+            self.client.send(value)
@@ -0,0 +1,65 @@
+"""
+The device_table module contains the class DeviceTable, which finds the port of a device created by the ev3dev2 mock.
+"""
+
+from typing import Dict, Iterable, List
+
+# Port given to a device that could not be found
+NOT_CONNECTED = 'dev_not_connected'
+
+# Port of the leds, which every brick has
+LEDS_ADDRESS = 'leds_addr'
+
+
+class DeviceTable:
+    """
+    Table of the devices of a single brick with their address, driver name and class, indexed by driver name.
+    The simulator sends the table of a brick to its client when it connects, so the client finds the port of
+    every device it creates without asking the simulator.
+    """
+
+    def __init__(self, devices: List[dict]):
+        self.devices = devices
+        self.by_address: Dict[str, dict] = {}
+        self.by_driver_name: Dict[str, List[str]] = {}
+
+        for device in devices:
+            self.by_address[device['address']] = device
+            self.by_driver_name.setdefault(device['driver_name'], []).append(device['address'])
+
+    @classmethod
+    def from_parts(cls, parts: Iterable) -> 'DeviceTable':
+        """
+        Create the table of the given sensors and actuators of a brick.
+        :param parts: the robot parts of the devices.
+        :return: the table.
+        """
+        return cls([{'address': part.address, 'driver_name': part.driver_name, 'class': part.ev3type}
+                    for part in parts])
+
+    def determine_port(self, kwargs: dict, class_name: str) -> str:
+        """
+        Determines the port of a device based on the kwargs given to the device.
+        :param kwargs: keyword arguments given by the sensor or actuator to the device.
+        :param class_name: some devices do not have a driver_name such as leds, for these, we use class_name
+        :return: returns 'dev_not_connected' or the port as string.
+        """
+        if class_name == 'leds':
+            return LEDS_ADDRESS
+
+        driver_name = kwargs.get('driver_name')
+        if class_name == 'tacho-motor' and 'driver_name' not in kwargs:
+            driver_name = 'lego-ev3-m-motor'
+        if driver_name is None:
+            return NOT_CONNECTED
+        driver_names = driver_name if isinstance(driver_name, list) else [driver_name]
+
+        address = kwargs.get('address')
+        if address is not None:
+            device = self.by_address.get(address)
+            if device is not None and device['driver_name'] in driver_names:
+                return address
+            return NOT_CONNECTED
+
+        found = [address for name in dict.fromkeys(driver_names) for address in self.by_driver_name.get(name, [])]
+        return found[0] if len(found) == 1 else NOT_CONNECTED
@@ -0,0 +1,23 @@
+"""
+The module bulk_data_request contains the dataclass BulkDataRequest.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+from ev3dev2simulator.connection.message.command import Command
+
+
+@dataclass
+class BulkDataRequest(Command):
+    """
+    BulkDataRequest objects are used to request the latest values of several sensors of the brick at once.
+    All values belong to the same frame. Without addresses the values of all sensors of the brick are requested.
+    If newer_than is given, the simulator answers once it has values belonging to a later frame.
+    """
+    def __init__(self, addresses: Optional[List[str]] = None, newer_than: Optional[int] = None):
+        self.addresses = addresses
+        self.newer_than = newer_than
+
+    def serialize(self) -> dict:
+        return {'type': 'BulkDataRequest', 'addresses': self.addresses, 'newer_than': self.newer_than}
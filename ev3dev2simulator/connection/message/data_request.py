@@ -3,6 +3,7 @@ The module data_request contains the dataclass DataRequest.
 """
 
 from dataclasses import dataclass
+from typing import Optional
 
 from ev3dev2simulator.connection.message.command import Command
 
@@ -11,9 +12,11 @@ from ev3dev2simulator.connection.message.command import Command
 class DataRequest(Command):
     """
     DataRequest object are used to request the latest value of a sensor attached to the given address.
+    If newer_than is given, the simulator answers once it has a value belonging to a later frame.
     """
-    def __init__(self, address: str):
+    def __init__(self, address: str, newer_than: Optional[int] = None):
         self.address = address
+        self.newer_than = newer_than
 
     def serialize(self) -> dict:
-        return {'type': 'DataRequest', 'address': self.address}
+        return {'type': 'DataRequest', 'address': self.address, 'newer_than': self.newer_than}
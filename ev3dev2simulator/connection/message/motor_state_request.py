@@ -0,0 +1,21 @@
+"""
+The module motor_state_request contains the dataclass MotorStateRequest.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from ev3dev2simulator.connection.message.command import Command
+
+
+@dataclass
+class MotorStateRequest(Command):
+    """
+    MotorStateRequest objects are used to request the position and speed of the motor attached to the given address.
+    Without an address the state of all motors of the brick is requested at once.
+    """
+    def __init__(self, address: Optional[str] = None):
+        self.address = address
+
+    def serialize(self) -> dict:
+        return {'type': 'MotorStateRequest', 'address': self.address}
@@ -0,0 +1,26 @@
+"""
+The module multi_rotate_command contains the dataclass MultiRotateCommand.
+"""
+
+from dataclasses import dataclass
+from typing import List
+
+from ev3dev2simulator.connection.message.command import Command
+from ev3dev2simulator.connection.message.motor_command import MotorCommand
+
+
+@dataclass
+class MultiRotateCommand(Command):
+    """
+    Command send from the ev3dev2 mock to the simulator containing the RotateCommands and StopCommands of several
+    motors, such as the motors of a MoveTank. The simulator starts all of them in the same frame.
+    """
+
+    def __init__(self, commands: List[MotorCommand]):
+        self.commands = commands
+
+    def serialize(self) -> dict:
+        return {
+            'type': 'MultiRotateCommand',
+            'commands': [command.serialize() for command in self.commands]
+        }
@@ -0,0 +1,20 @@
+"""
+The module sleep_request contains the dataclass SleepRequest.
+"""
+
+from dataclasses import dataclass
+
+from ev3dev2simulator.connection.message.command import Command
+
+
+@dataclass
+class SleepRequest(Command):
+    """
+    SleepRequest objects are used to wait until the given amount of simulated time has passed.
+    In lock-step mode this also tells the simulator the client is done with the current frame.
+    """
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def serialize(self) -> dict:
+        return {'type': 'SleepRequest', 'seconds': self.seconds}
@@ -0,0 +1,26 @@
+"""
+The module subscribe_request contains the dataclass SubscribeRequest.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from ev3dev2simulator.connection.message.command import Command
+
+# a subscribed motor pushes the number of commands it finished under its address, and its position and speed
+# in tacho counts under its address followed by these suffixes
+POSITION_SUFFIX = '/position'
+SPEED_SUFFIX = '/speed'
+
+
+@dataclass
+class SubscribeRequest(Command):
+    """
+    SubscribeRequest objects are used to receive the values of a sensor whenever they change, instead of requesting
+    them. Without an address all sensors and motors of the brick are subscribed to.
+    """
+    def __init__(self, address: Optional[str] = None):
+        self.address = address
+
+    def serialize(self) -> dict:
+        return {'type': 'SubscribeRequest', 'address': self.address}
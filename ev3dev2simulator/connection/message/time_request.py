@@ -0,0 +1,17 @@
+"""
+The module time_request contains the dataclass TimeRequest.
+"""
+
+from dataclasses import dataclass
+
+from ev3dev2simulator.connection.message.command import Command
+
+
+@dataclass
+class TimeRequest(Command):
+    """
+    TimeRequest objects are used to request the current simulated time and the speed of the simulation.
+    """
+
+    def serialize(self) -> dict:
+        return {'type': 'TimeRequest'}
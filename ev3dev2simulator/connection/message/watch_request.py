@@ -0,0 +1,21 @@
+"""
+The module watch_request contains the dataclass WatchRequest.
+"""
+
+from dataclasses import dataclass
+
+from ev3dev2simulator.connection.message.command import Command
+
+
+@dataclass
+class WatchRequest(Command):
+    """
+    WatchRequest objects tell the simulator that the value of the sensor attached to the given address is read from
+    the sensor snapshot. The simulator only evaluates sensors that are needed, so it evaluates watched sensors every
+    frame. No response is sent.
+    """
+    def __init__(self, address: str):
+        self.address = address
+
+    def serialize(self) -> dict:
+        return {'type': 'WatchRequest', 'address': self.address}
@@ -2,17 +2,24 @@
 The message_handler module contains the MessageHandler class.
 """
 
-import json
 from logging import warning
 from typing import Any
 
+from ev3dev2simulator.connection.message.bulk_data_request import BulkDataRequest
 from ev3dev2simulator.connection.message.config_request import ConfigRequest
+from ev3dev2simulator.connection.protocol import get_codec, DEFAULT_CODEC
 from ev3dev2simulator.state.message_processor import MessageProcessor
+from ev3dev2simulator.state.simulation_clock import PendingResult
 from ev3dev2simulator.connection.message.data_request import DataRequest
 from ev3dev2simulator.connection.message.led_command import LedCommand
+from ev3dev2simulator.connection.message.motor_state_request import MotorStateRequest
+from ev3dev2simulator.connection.message.multi_rotate_command import MultiRotateCommand
 from ev3dev2simulator.connection.message.rotate_command import RotateCommand
+from ev3dev2simulator.connection.message.sleep_request import SleepRequest
 from ev3dev2simulator.connection.message.sound_command import SoundCommand
 from ev3dev2simulator.connection.message.stop_command import StopCommand
+from ev3dev2simulator.connection.message.subscribe_request import SubscribeRequest
+from ev3dev2simulator.connection.message.watch_request import WatchRequest
 
 
 class MessageHandler:
@@ -21,18 +28,16 @@ class MessageHandler:
     """
     def __init__(self, message_processor: MessageProcessor):
         self.message_processor = message_processor
+        self.codec = get_codec(DEFAULT_CODEC)
 
     def process(self, data: bytes) -> bytes:
         """
         Process incoming data by decoding it and sending it to the MessageProcessor.
-        :param data: to process.
+        :param data: a single frame to process.
         :return: a possible response in bytes when the incoming message requires it.
         """
 
-        jsn = data.decode()
-        jsn = jsn.replace('#', '')
-
-        obj_dict = json.loads(jsn)
+        obj_dict = self.codec.decode_message(data)
 
         tpe = obj_dict['type']
         if tpe == 'RotateCommand':
@@ -41,6 +46,9 @@ class MessageHandler:
         if tpe == 'StopCommand':
             return self._process_stop_command(obj_dict)
 
+        if tpe == 'MultiRotateCommand':
+            return self._process_multi_rotate_command(obj_dict)
+
         if tpe == 'SoundCommand':
             return self._process_sound_command(obj_dict)
 
@@ -57,6 +65,24 @@ class MessageHandler:
             return self._process_data_request(obj_dict)
         if tpe == 'ConfigRequest':
             return self._process_config_request(obj_dict)
+        if tpe == 'TimeRequest':
+            return self._process_time_request()
+        if tpe == 'SleepRequest':
+            return self._process_sleep_request(obj_dict)
+        return self.handle_state_request(tpe, obj_dict)
+
+    def handle_state_request(self, tpe, obj_dict):
+        """
+        Function handling requests for the state of the sensors and motors.
+        """
+        if tpe == 'SubscribeRequest':
+            return self._process_subscribe_request(obj_dict)
+        if tpe == 'MotorStateRequest':
+            return self._process_motor_state_request(obj_dict)
+        if tpe == 'WatchRequest':
+            return self.message_processor.process_watch_request(WatchRequest(obj_dict['address']))
+        if tpe == 'BulkDataRequest':
+            return self._process_bulk_data_request(obj_dict)
         return warning(f'Unknown command type {tpe}')
 
     def _process_drive_command(self, command_dict: dict) -> Any:
@@ -64,9 +90,7 @@ class MessageHandler:
         Deserialize the given dictionary into a RotateCommand and send it to the MessageProcessor.
         :param command_dict: to process.
         """
-        command = RotateCommand(command_dict['address'], command_dict['speed'],
-                                command_dict['distance'], command_dict['stop_action'])
-        value = self.message_processor.process_rotate_command(command)
+        value = self.message_processor.process_rotate_command(self._to_rotate_command(command_dict))
 
         return self.serialize_response(value)
 
@@ -76,11 +100,37 @@ class MessageHandler:
         :param command_dict: to process.
         """
 
-        command = StopCommand(command_dict['address'], command_dict['speed'], command_dict['stop_action'])
-        value = self.message_processor.process_stop_command(command)
+        value = self.message_processor.process_stop_command(self._to_stop_command(command_dict))
+
+        return self.serialize_response(value)
+
+    def _process_multi_rotate_command(self, command_dict: dict) -> Any:
+        """
+        Deserialize the given dictionary into a MultiRotateCommand and send it to the MessageProcessor.
+        :param command_dict: to process.
+        """
+
+        commands = [self._to_rotate_command(motor_dict) if motor_dict['type'] == 'RotateCommand'
+                    else self._to_stop_command(motor_dict) for motor_dict in command_dict['commands']]
+        value = self.message_processor.process_multi_rotate_command(MultiRotateCommand(commands))
 
         return self.serialize_response(value)
 
+    @staticmethod
+    def _to_rotate_command(command_dict: dict) -> RotateCommand:
+        """
+        Deserialize the given dictionary into a RotateCommand.
+        """
+        return RotateCommand(command_dict['address'], command_dict['speed'],
+                             command_dict['distance'], command_dict['stop_action'])
+
+    @staticmethod
+    def _to_stop_command(command_dict: dict) -> StopCommand:
+        """
+        Deserialize the given dictionary into a StopCommand.
+        """
+        return StopCommand(command_dict['address'], command_dict['speed'], command_dict['stop_action'])
+
     def _process_led_command(self, command_dict: dict) -> Any:
         """
         Deserialize the given dictionary into a LedCommand and send it to the MessageProcessor.
@@ -102,15 +152,39 @@ class MessageHandler:
     def _process_data_request(self, command_dict: dict) -> bytes:
         """
         Deserialize the given dictionary into a DataRequest and send it to the MessageProcessor.
-        Return a serialized response with the requested value.
+        Return a serialized response with the requested value and the frame it belongs to.
         :param command_dict: to process.
         :return: a bytes object representing the serialized response.
         """
-        request = DataRequest(command_dict['address'])
+        request = DataRequest(command_dict['address'], command_dict.get('newer_than'))
         value = self.message_processor.process_data_request(request)
 
         return self.serialize_response(value)
 
+    def _process_bulk_data_request(self, command_dict: dict) -> bytes:
+        """
+        Deserialize the given dictionary into a BulkDataRequest and send it to the MessageProcessor.
+        Return a serialized response with the requested values and the frame they belong to.
+        :param command_dict: to process.
+        :return: a bytes object representing the serialized response.
+        """
+        request = BulkDataRequest(command_dict['addresses'], command_dict.get('newer_than'))
+        value = self.message_processor.process_bulk_data_request(request)
+
+        return self.serialize_response(value)
+
+    def _process_motor_state_request(self, command_dict: dict) -> bytes:
+        """
+        Deserialize the given dictionary into a MotorStateRequest and send it to the MessageProcessor.
+        Return a serialized response with the position and speed of the requested motors.
+        :param command_dict: to process.
+        :return: a bytes object representing the serialized response.
+        """
+        request = MotorStateRequest(command_dict['address'])
+        value = self.message_processor.process_motor_state_request(request)
+
+        return self.serialize_response(value)
+
     def _process_config_request(self, command_dict: dict):
         """
         Deserialize the given dictionary into a ConfigRequest and send it to the MessageProcessor.
@@ -123,15 +197,55 @@ class MessageHandler:
 
         return self.serialize_response(value)
 
+    def _process_time_request(self) -> bytes:
+        """
+        Process a TimeRequest by sending it to the MessageProcessor.
+        Return a serialized response with the simulated time and the speed of the simulation.
+        :return: a bytes object representing the serialized response.
+        """
+        value = self.message_processor.process_time_request()
 
-    @staticmethod
-    def serialize_response(value) -> bytes:
+        return self.serialize_response(value)
+
+    def _process_sleep_request(self, command_dict: dict) -> bytes:
         """
-        Serialize the given value into a bytes object containing a dictionary.
-        :param value: to serialize.
+        Deserialize the given dictionary into a SleepRequest and send it to the MessageProcessor.
+        Return a serialized response with the simulated time after sleeping.
+        :param command_dict: to process.
+        :return: a bytes object representing the serialized response.
         """
+        request = SleepRequest(command_dict['seconds'])
+        value = self.message_processor.process_sleep_request(request)
+
+        return self.serialize_response(value)
 
-        command_dict = {'value': value}
+    def _process_subscribe_request(self, command_dict: dict) -> bytes:
+        """
+        Deserialize the given dictionary into a SubscribeRequest and send it to the MessageProcessor.
+        Return a serialized response with the current values of the subscribed sensors.
+        :param command_dict: to process.
+        :return: a bytes object representing the serialized response.
+        """
+        request = SubscribeRequest(command_dict['address'])
+        value = self.message_processor.process_subscribe_request(request)
+
+        return self.serialize_response(value)
+
+    def serialize_update(self, frame: int, values: dict) -> bytes:
+        """
+        Serialize the changed values of subscribed sensors into a push message, using the codec of the connection.
+        :param frame: the values belong to.
+        :param values: by address.
+        """
+        return self.codec.encode_push(frame, values)
+
+    def serialize_response(self, value) -> bytes:
+        """
+        Serialize the given value into a bytes object using the codec of the connection.
+        A PendingResult is serialized once its value is available.
+        :param value: to serialize.
+        """
 
-        jsn = json.dumps(command_dict)
-        return str.encode(jsn)
+        if isinstance(value, PendingResult):
+            return value.then(self.serialize_response)
+        return self.codec.encode_response(value)
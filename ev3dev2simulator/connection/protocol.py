@@ -0,0 +1,308 @@
+"""
+The protocol module contains everything needed to send messages between the ev3dev2 mock and the simulator.
+Every message is sent as a frame: a four byte length header followed by the encoded message.
+How messages are encoded is decided by the codec, which the client and simulator agree on when connecting.
+Besides responses to requests the simulator pushes the changed values of subscribed sensors to the client.
+The binary codec is the fastest, the json codec is human readable which makes debugging easier.
+"""
+
+import json
+import math
+import socket
+import struct
+from typing import Any, Dict, Optional, Tuple
+
+FRAME_HEADER = struct.Struct('!I')
+
+DOUBLE = struct.Struct('!d')
+# a string field starts with whether it has a value and the length of the encoded string
+STRING_HEADER = struct.Struct('!?I')
+VALUE_COUNT = struct.Struct('!I')
+MESSAGE_TYPE = struct.Struct('!B')
+RESPONSE_TAG = struct.Struct('!B')
+INTEGER = struct.Struct('!q')
+BOOLEAN = struct.Struct('!?')
+
+DEFAULT_CODEC = 'json'
+
+
+def send_frame(sock: socket.socket, payload: bytes):
+    """
+    Send the given payload as a single frame.
+    :param sock: to send the frame with.
+    :param payload: the encoded message.
+    """
+    sock.sendall(FRAME_HEADER.pack(len(payload)) + payload)
+
+
+class FrameBuffer:
+    """
+    Collects the bytes received from a stream socket and splits them into frames.
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def feed(self, data: bytes):
+        """
+        Add received bytes to the buffer.
+        :param data: received.
+        """
+        self.data.extend(data)
+
+    def next_frame(self) -> Optional[bytes]:
+        """
+        Take the next complete frame from the buffer.
+        :return: the encoded message, or None if no complete frame has been received yet.
+        """
+        if len(self.data) < FRAME_HEADER.size:
+            return None
+        end = FRAME_HEADER.size + FRAME_HEADER.unpack_from(self.data)[0]
+        if len(self.data) < end:
+            return None
+
+        frame = bytes(self.data[FRAME_HEADER.size:end])
+        del self.data[:end]
+        return frame
+
+
+class JsonCodec:
+    """
+    Codec encoding messages as json. Slower than the binary codec, but easy to read when debugging.
+    """
+
+    name = 'json'
+
+    @staticmethod
+    def encode_message(message: dict) -> bytes:
+        """
+        Encode the given serialized command.
+        :param message: dictionary created by Command.serialize.
+        :return: bytes representing the message.
+        """
+        return str.encode(json.dumps(message))
+
+    @staticmethod
+    def decode_message(data: bytes) -> dict:
+        """
+        Decode the given data into the dictionary of a command.
+        :param data: to decode.
+        :return: the dictionary as created by Command.serialize.
+        """
+        return json.loads(data.decode())
+
+    @staticmethod
+    def encode_response(value: Any) -> bytes:
+        """
+        Encode the given response value.
+        :param value: to encode.
+        :return: bytes representing the value.
+        """
+        return str.encode(json.dumps({'value': value}))
+
+    @staticmethod
+    def decode_response(data: bytes) -> Any:
+        """
+        Decode the given data into a response value.
+        :param data: to decode.
+        :return: the value of the response.
+        """
+        return json.loads(data.decode())['value']
+
+    @staticmethod
+    def encode_push(frame: int, values: Dict[str, Any]) -> bytes:
+        """
+        Encode the changed values of subscribed sensors.
+        :param frame: the values belong to.
+        :param values: by address.
+        :return: bytes representing the push message.
+        """
+        return str.encode(json.dumps({'push': {'frame': frame, 'values': values}}))
+
+    @staticmethod
+    def decode_push(data: bytes) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """
+        Decode the given data if it is a push message.
+        :param data: to decode.
+        :return: a tuple with the frame and the values by address, or None if the data is a response.
+        """
+        # responses are decoded by decode_response, so only decode the data when it may be a push message
+        if b'"push"' not in data:
+            return None
+        message = json.loads(data.decode())
+        if 'push' not in message:
+            return None
+        return message['push']['frame'], message['push']['values']
+
+
+class BinaryCodec:
+    """
+    Codec packing every message type in a fixed schema of doubles and length prefixed strings.
+    Fields that do not fit a schema, such as the keyword arguments of a ConfigRequest, are packed as json strings.
+    """
+
+    name = 'binary'
+
+    # Per message type its identifier and the type of each field: 'd' for double, 's' for string and 'j' for json.
+    SCHEMAS = {
+        'RotateCommand': (1, (('address', 's'), ('speed', 'd'), ('distance', 'd'), ('stop_action', 's'))),
+        'StopCommand': (2, (('address', 's'), ('speed', 'd'), ('stop_action', 's'))),
+        'SoundCommand': (3, (('message', 's'), ('duration', 'd'), ('soundType', 's'))),
+        'LedCommand': (4, (('address', 's'), ('brightness', 'd'))),
+        'DataRequest': (5, (('address', 's'), ('newer_than', 'j'))),
+        'ConfigRequest': (6, (('kwargs', 'j'), ('class_name', 'j'))),
+        'TimeRequest': (7, ()),
+        'SleepRequest': (8, (('seconds', 'd'),)),
+        'SubscribeRequest': (9, (('address', 's'),)),
+        'MotorStateRequest': (10, (('address', 's'),)),
+        'MultiRotateCommand': (11, (('commands', 'j'),)),
+        'WatchRequest': (12, (('address', 's'),)),
+        'BulkDataRequest': (13, (('addresses', 'j'), ('newer_than', 'j'))),
+    }
+    TYPES = {type_id: (tpe, fields) for tpe, (type_id, fields) in SCHEMAS.items()}
+
+    TAG_NONE, TAG_BOOLEAN, TAG_INTEGER, TAG_DOUBLE, TAG_STRING, TAG_JSON, TAG_PUSH = range(7)
+
+    def encode_message(self, message: dict) -> bytes:
+        """
+        Encode the given serialized command.
+        :param message: dictionary created by Command.serialize.
+        :return: bytes representing the message.
+        """
+        type_id, fields = self.SCHEMAS[message['type']]
+        parts = [MESSAGE_TYPE.pack(type_id)]
+        for name, kind in fields:
+            value = message[name]
+            if kind == 'd':
+                parts.append(DOUBLE.pack(value))
+            elif kind == 's':
+                parts.append(self._pack_string(value))
+            else:
+                parts.append(self._pack_string(json.dumps(value)))
+        return b''.join(parts)
+
+    def decode_message(self, data: bytes) -> dict:
+        """
+        Decode the given data into the dictionary of a command.
+        :param data: to decode.
+        :return: the dictionary as created by Command.serialize.
+        """
+        tpe, fields = self.TYPES[MESSAGE_TYPE.unpack_from(data)[0]]
+        message = {'type': tpe}
+        offset = MESSAGE_TYPE.size
+        for name, kind in fields:
+            if kind == 'd':
+                message[name] = DOUBLE.unpack_from(data, offset)[0]
+                offset += DOUBLE.size
+            else:
+                value, offset = self._unpack_string(data, offset)
+                message[name] = value if kind == 's' else json.loads(value)
+        return message
+
+    def encode_response(self, value: Any) -> bytes:
+        """
+        Encode the given response value, prefixed by a tag telling its type.
+        :param value: to encode.
+        :return: bytes representing the value.
+        """
+        if value is None:
+            return RESPONSE_TAG.pack(self.TAG_NONE)
+        if isinstance(value, bool):
+            return RESPONSE_TAG.pack(self.TAG_BOOLEAN) + BOOLEAN.pack(value)
+        if isinstance(value, int):
+            return RESPONSE_TAG.pack(self.TAG_INTEGER) + INTEGER.pack(value)
+        if isinstance(value, float):
+            return RESPONSE_TAG.pack(self.TAG_DOUBLE) + DOUBLE.pack(value)
+        if isinstance(value, str):
+            return RESPONSE_TAG.pack(self.TAG_STRING) + self._pack_string(value)
+        return RESPONSE_TAG.pack(self.TAG_JSON) + self._pack_string(json.dumps(value))
+
+    def decode_response(self, data: bytes) -> Any:
+        """
+        Decode the given data into a response value.
+        :param data: to decode.
+        :return: the value of the response.
+        """
+        tag = RESPONSE_TAG.unpack_from(data)[0]
+        offset = RESPONSE_TAG.size
+        if tag == self.TAG_NONE:
+            return None
+        if tag == self.TAG_BOOLEAN:
+            return BOOLEAN.unpack_from(data, offset)[0]
+        if tag == self.TAG_INTEGER:
+            return INTEGER.unpack_from(data, offset)[0]
+        if tag == self.TAG_DOUBLE:
+            return DOUBLE.unpack_from(data, offset)[0]
+
+        value = self._unpack_string(data, offset)[0]
+        return value if tag == self.TAG_STRING else json.loads(value)
+
+    def encode_push(self, frame: int, values: Dict[str, Any]) -> bytes:
+        """
+        Encode the changed values of subscribed sensors: the frame, the number of values and per value the address
+        followed by the value as a double. Sensors without a value are sent as NaN.
+        :param frame: the values belong to.
+        :param values: by address.
+        :return: bytes representing the push message.
+        """
+        parts = [RESPONSE_TAG.pack(self.TAG_PUSH), INTEGER.pack(frame), VALUE_COUNT.pack(len(values))]
+        for address, value in values.items():
+            parts.append(self._pack_string(address))
+            parts.append(DOUBLE.pack(math.nan if value is None else value))
+        return b''.join(parts)
+
+    def decode_push(self, data: bytes) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """
+        Decode the given data if it is a push message.
+        :param data: to decode.
+        :return: a tuple with the frame and the values by address, or None if the data is a response.
+        """
+        if RESPONSE_TAG.unpack_from(data)[0] != self.TAG_PUSH:
+            return None
+
+        offset = RESPONSE_TAG.size
+        frame = INTEGER.unpack_from(data, offset)[0]
+        count = VALUE_COUNT.unpack_from(data, offset + INTEGER.size)[0]
+        offset += INTEGER.size + VALUE_COUNT.size
+
+        values = {}
+        for _ in range(count):
+            address, offset = self._unpack_string(data, offset)
+            value = DOUBLE.unpack_from(data, offset)[0]
+            offset += DOUBLE.size
+            values[address] = None if math.isnan(value) else value
+        return frame, values
+
+    @staticmethod
+    def _pack_string(value: Optional[str]) -> bytes:
+        """
+        Pack the given string prefixed by its length.
+        """
+        if value is None:
+            return STRING_HEADER.pack(False, 0)
+        encoded = str.encode(value)
+        return STRING_HEADER.pack(True, len(encoded)) + encoded
+
+    @staticmethod
+    def _unpack_string(data: bytes, offset: int) -> (Optional[str], int):
+        """
+        Unpack a length prefixed string starting at the given offset.
+        :return: a tuple with the string and the offset of the next field.
+        """
+        has_value, length = STRING_HEADER.unpack_from(data, offset)
+        start = offset + STRING_HEADER.size
+        if not has_value:
+            return None, start
+        return data[start:start + length].decode(), start + length
+
+
+CODECS = {codec.name: codec for codec in (JsonCodec(), BinaryCodec())}
+
+
+def get_codec(name: str):
+    """
+    Get the codec with the given name, falling back to json for unknown names.
+    :param name: of the codec.
+    :return: the codec.
+    """
+    return CODECS.get(name, CODECS[DEFAULT_CODEC])
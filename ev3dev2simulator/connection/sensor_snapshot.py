@@ -0,0 +1,175 @@
+"""
+The sensor_snapshot module contains the classes used to share the sensor values of the simulator through shared
+memory. Once per frame the simulator writes the values of all sensors into a memory mapped file, clients on the same
+host read them from the mapping without sending a request.
+
+The file starts with a sequence number, which is odd while the simulator is writing. A reader retries until it read
+the same even sequence number before and after reading, so it never sees a half written frame (a seqlock).
+It is followed by the frame number, the simulated time, the speed, whether the simulation runs in lock-step and
+a double for every sensor. Sensors without a value are stored as NaN. After the sensors come the tacho count and
+speed of every motor.
+"""
+
+import math
+import mmap
+import os
+import struct
+import tempfile
+from typing import Dict, List, Optional
+
+SEQUENCE = struct.Struct('!Q')
+STATUS = struct.Struct('!Qdd?')
+VALUES_OFFSET = SEQUENCE.size + STATUS.size
+
+
+def get_snapshot_path(settings: dict) -> str:
+    """
+    Get the path of the snapshot file of the simulator with the given settings.
+    :param settings: the exec settings of the simulation settings.
+    :return: the path, in shared memory when available.
+    """
+    directory = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(directory, f'ev3dev2simulator-{settings["socket_port"]}.snapshot')
+
+
+class SensorSnapshot:
+    """
+    Memory mapped file containing the sensor values of a single frame. The simulator creates it with the number of
+    sensors it publishes, clients open the existing file.
+    """
+
+    def __init__(self, path: str, count: Optional[int] = None):
+        self.path = path
+        if count is not None:
+            if os.path.exists(path):
+                os.remove(path)  # clients of a previous simulator keep their own mapping
+            with open(path, 'wb') as file:
+                file.truncate(VALUES_OFFSET + count * SEQUENCE.size)
+
+        with open(path, 'r+b') as file:
+            self.memory = mmap.mmap(file.fileno(), 0)
+        self.values = struct.Struct(f'!{(len(self.memory) - VALUES_OFFSET) // SEQUENCE.size}d')
+
+    def publish(self, frame: int, status: dict, values: List[Optional[float]]):
+        """
+        Write the values of a frame.
+        :param frame: the values belong to.
+        :param status: of the simulation clock, as given by SimulationClock.get_status.
+        :param values: of all sensors, None for sensors without a value.
+        """
+        sequence = SEQUENCE.unpack_from(self.memory)[0] + 1
+        SEQUENCE.pack_into(self.memory, 0, sequence)
+        STATUS.pack_into(self.memory, SEQUENCE.size, frame, status['time'], status['speed'], status['lock_step'])
+        self.values.pack_into(self.memory, VALUES_OFFSET,
+                              *(math.nan if value is None else float(value) for value in values))
+        SEQUENCE.pack_into(self.memory, 0, sequence + 1)
+
+    def read_value(self, index: int) -> (Optional[float], int):
+        """
+        Read the value of a single sensor.
+        :param index: of the sensor in the snapshot.
+        :return: a tuple with the value, or None if the sensor has no value, and the frame it belongs to.
+        """
+        offset = VALUES_OFFSET + index * SEQUENCE.size
+        while True:
+            sequence = SEQUENCE.unpack_from(self.memory)[0]
+            if sequence % 2 == 1:
+                continue
+            frame = STATUS.unpack_from(self.memory, SEQUENCE.size)[0]
+            value = struct.unpack_from('!d', self.memory, offset)[0]
+            if SEQUENCE.unpack_from(self.memory)[0] == sequence:
+                return (None if math.isnan(value) else value), frame
+
+    def read_values(self, indices: List[int]) -> (List[Optional[float]], int):
+        """
+        Read several values belonging to the same frame.
+        :param indices: of the values in the snapshot.
+        :return: a tuple with the values, None for values that are not available, and the frame they belong to.
+        """
+        while True:
+            sequence = SEQUENCE.unpack_from(self.memory)[0]
+            if sequence % 2 == 1:
+                continue
+            frame = STATUS.unpack_from(self.memory, SEQUENCE.size)[0]
+            values = [struct.unpack_from('!d', self.memory, VALUES_OFFSET + index * SEQUENCE.size)[0]
+                      for index in indices]
+            if SEQUENCE.unpack_from(self.memory)[0] == sequence:
+                return [None if math.isnan(value) else value for value in values], frame
+
+    def read_status(self) -> dict:
+        """
+        Read the status of the simulation clock at the last published frame.
+        :return: a dictionary like the one of SimulationClock.get_status, including the frame.
+        """
+        while True:
+            sequence = SEQUENCE.unpack_from(self.memory)[0]
+            if sequence % 2 == 1:
+                continue
+            frame, sim_time, speed, lock_step = STATUS.unpack_from(self.memory, SEQUENCE.size)
+            if SEQUENCE.unpack_from(self.memory)[0] == sequence:
+                return {'frame': frame, 'time': sim_time, 'speed': speed, 'lock_step': lock_step}
+
+    def close(self):
+        """
+        Unmap the snapshot.
+        """
+        self.memory.close()
+
+
+class SnapshotPublisher:
+    """
+    Publishes the sensor values and motor states of all robots into a SensorSnapshot after every frame.
+    Every value has a fixed index in the snapshot, which clients get when connecting.
+    """
+
+    def __init__(self, robot_simulators: list, path: str):
+        self.clock = robot_simulators[0].clock if robot_simulators else None
+        self.sources = []
+        self.indices = {}
+        self.motor_indices = {}
+
+        for robot_sim in robot_simulators:
+            for brick, address in robot_sim.robot.sensors:
+                brick_indices = self.indices.setdefault((robot_sim.robot.name, brick), {})
+                brick_indices[address] = len(self.sources)
+                self.sources.append((robot_sim.robot.values, (brick, address)))
+
+        for robot_sim in robot_simulators:
+            for brick, address in robot_sim.tacho_counts:
+                brick_indices = self.motor_indices.setdefault((robot_sim.robot.name, brick), {})
+                brick_indices[address] = [len(self.sources), len(self.sources) + 1]
+                self.sources.append((robot_sim.tacho_counts, (brick, address)))
+                self.sources.append((robot_sim.tacho_speeds, (brick, address)))
+
+        self.snapshot = SensorSnapshot(path, len(self.sources))
+        if self.clock is not None:
+            self.publish(self.clock.frame)
+
+    def publish(self, frame: int):
+        """
+        Publish the current sensor values. Called by the simulation thread after each frame, before the clock
+        advances, so clients that see the new frame also see its values.
+        :param frame: simulated.
+        """
+        status = self.clock.get_status()
+        status['time'] = frame / self.clock.frames_per_second
+        values = [robot_values.get(key) for robot_values, key in self.sources]
+        self.snapshot.publish(frame, status, values)
+
+    def get_indices(self, robot_name: str, brick_id: int) -> Dict[str, int]:
+        """
+        Get the indices of the sensors of a brick.
+        :param robot_name: name of the robot.
+        :param brick_id: identifier of the brick.
+        :return: the index in the snapshot per sensor address.
+        """
+        return self.indices.get((robot_name, brick_id), {})
+
+    def get_motor_indices(self, robot_name: str, brick_id: int) -> Dict[str, List[int]]:
+        """
+        Get the indices of the motors of a brick.
+        :param robot_name: name of the robot.
+        :param brick_id: identifier of the brick.
+        :return: the index of the tacho count and the index of the speed in the snapshot per motor address.
+        """
+        return self.motor_indices.get((robot_name, brick_id), {})
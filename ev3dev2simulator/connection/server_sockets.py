@@ -2,86 +2,327 @@
 The server_sockets module contains the class ServerSockets, responsible for handling all sockets of the simulator.
 """
 
-
+import json
+import selectors
 import socket
 import threading
-import time
+from typing import List, Optional
 
 from ev3dev2simulator.config.config import get_simulation_settings
 from ev3dev2simulator.connection.client_socket_handler import ClientSocketHandler
+from ev3dev2simulator.connection.device_table import DeviceTable
+from ev3dev2simulator.connection.protocol import get_codec
+from ev3dev2simulator.connection.sensor_snapshot import SnapshotPublisher, get_snapshot_path
+from ev3dev2simulator.connection.transport import get_transport
 from ev3dev2simulator.state.world_simulator import WorldSimulator
 
+RECEIVE_SIZE = 4096
+
 
 class ServerSockets(threading.Thread):
     """
     Class responsible for listening to incoming socket connections from ev3dev2 mock processes.
+    A single event loop accepts the connections and handles the messages of all bricks.
+    When the sensor snapshot is enabled the sensor values are also published in shared memory every frame.
     """
 
     def __init__(self, world_simulator: WorldSimulator):
         threading.Thread.__init__(self)
         self.word_simulator = world_simulator
         self.brick_sockets = {}
+        self.transport = get_transport()
         self.first_connected = False
+        self.is_running = True
+
+        self.selector = selectors.DefaultSelector()
+        self.wakeup_receiver, self.wakeup_sender = socket.socketpair()
+        self.wakeup_sender.setblocking(False)
+        self.wake_frame = None
+
+        for robot_sim in self.word_simulator.robot_simulators:
+            for brick in robot_sim.robot.get_bricks():
+                self.brick_sockets[(robot_sim.robot.name, brick.name)] = \
+                    ClientSocketHandler(robot_sim, brick.brick, brick.name)
+
+        settings = get_simulation_settings()['exec_settings']
+        self.snapshot_publisher = None
+        if settings['sensor_snapshot']:
+            self.snapshot_publisher = SnapshotPublisher(self.word_simulator.robot_simulators,
+                                                        get_snapshot_path(settings))
 
     def run(self):
         """
-        Listen for incoming connections. When a connection is established spawn a ClientSocketHandler
-        to manage it. Multiple connections can be established at the same time.
+        Listen for incoming connections and handle them until the simulator stops.
         """
 
-        port = int(get_simulation_settings()['exec_settings']['socket_port'])
-
-        for robot_sim in self.word_simulator.robot_simulators:
-            for brick in robot_sim.robot.get_bricks():
-                sock = ClientSocketHandler(robot_sim, brick.brick, brick.name)
-                sock.setDaemon(True)
-                sock.start()
-                self.brick_sockets[(robot_sim.robot.name, brick.name)] = sock
-
-        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        server.bind(('localhost', port))
-        server.listen(5)
-        server.setblocking(False)
-        server.settimeout(1)
+        server = self.transport.listen()
 
         print('Listening for connections...')
         self.handle_sockets(server)
         print('Closing server')
 
-    def handle_sockets(self, server):
+    def handle_sockets(self, server: socket.socket):
+        """
+        Accept connections on the given server socket and handle the messages of all connected bricks.
+        The loop sleeps until a socket is ready or until a frame is simulated that a request waits for.
+        Connections are non-blocking, data a client does not take at once is sent when its socket is writable.
+        :param server: listening socket.
+        """
+        self.word_simulator.clock.add_tick_listener(self._collect_updates, early=True)
+        self.word_simulator.clock.add_tick_listener(self._on_tick)
+        if self.snapshot_publisher is not None:
+            self.word_simulator.clock.add_tick_listener(self.snapshot_publisher.publish, early=True)
+        server.setblocking(False)
+        self.selector.register(server, selectors.EVENT_READ, self._accept)
+        self.selector.register(self.wakeup_receiver, selectors.EVENT_READ, self._drain_wakeups)
+        self._print_next_brick()
+
+        while self.is_running:
+            self._resume_pending()
+            self._flush_queued()
+            timeout = 0 if self._is_wake_frame_reached() else None
+
+            for key, events in self.selector.select(timeout):
+                if events & selectors.EVENT_READ:
+                    key.data(key.fileobj)
+
+        self.selector.unregister(server)
+        self.selector.unregister(self.wakeup_receiver)
+        server.close()
+
+    def stop(self):
+        """
+        Stop the event loop.
+        """
+        self.is_running = False
+        self._wake()
+
+    def _accept(self, server: socket.socket):
+        """
+        Accept a new connection. It is not assigned to a brick until the handshake has been received.
+        :param server: listening socket.
+        """
+        try:
+            client = self.transport.accept(server)
+        except OSError:
+            return
+        self.selector.register(client, selectors.EVENT_READ, self._receive_handshake)
+
+    def _receive_handshake(self, client):
+        """
+        Receive the first frame of a connection. In it the client names its robot and brick and the codec it prefers.
+        Robot and brick are optional, without them the first brick that is not connected yet is used.
+        The answer contains the devices of the brick, so the client finds their ports itself. It also tells where
+        the sensor snapshot is and at which index the sensors and motors of the brick are.
+        :param client: connection of the connecting client.
+        """
+        frames = self._receive_frames(client)
+        if frames is None:
+            self._close_handshake(client)
+            return
+        if not frames:
+            return
+
+        try:
+            hello = self._parse_hello(frames[0])
+        except (ValueError, KeyError) as error:
+            print(f'Connection refused, malformed handshake: {error}')
+            self._close_handshake(client)
+            return
+
+        robot_name = hello.get('robot')
+        brick_name = hello.get('brick')
+        sock = self._find_brick(robot_name, brick_name)
+        if sock is None:
+            client.send(str.encode(json.dumps(
+                {'error': f'No brick "{brick_name or "any"}" from robot "{robot_name or "any"}" is available'})))
+            self._close_handshake(client)
+            return
+
+        codec = get_codec(hello.get('codec'))
+        answer = {'robot': sock.robot_sim.robot.name, 'brick': sock.brick_name, 'codec': codec.name,
+                  'devices': sock.robot_sim.device_tables.get(sock.brick_id, DeviceTable([])).devices}
+        if self.snapshot_publisher is not None:
+            answer['snapshot'] = {'path': self.snapshot_publisher.snapshot.path,
+                                  'indices': self.snapshot_publisher.get_indices(*sock.participant),
+                                  'motors': self.snapshot_publisher.get_motor_indices(*sock.participant)}
+        client.send(str.encode(json.dumps(answer)))
+
+        print(f'Connection from \"{sock.brick_name}\" from robot \"{sock.robot_sim.robot.name}\" accepted\n')
+        self.first_connected = True
+        sock.connect(client, codec)
+        self.selector.modify(client, selectors.EVENT_READ, lambda _: self._receive(sock))
+        self._print_next_brick()
+        self._receive(sock, frames[1:])
+
+    def _receive(self, sock: ClientSocketHandler, frames: Optional[List[bytes]] = None):
+        """
+        Receive frames from a connected brick.
+        :param sock: handler of the brick.
+        :param frames: already received, if not given the frames are received from the connection of the brick.
+        """
+        try:
+            if frames is None:
+                frames = self._receive_frames(sock.client)
+            if frames is None:
+                self._disconnect(sock)
+            else:
+                sock.receive(frames)
+        except OSError:
+            self._disconnect(sock)
+
+    def _disconnect(self, sock: ClientSocketHandler):
+        """
+        Close the connection of the given brick. When all bricks are disconnected the world is reset.
+        :param sock: handler of the brick.
+        """
+        self.selector.unregister(sock.client)
+        sock.disconnect()
+
+        if self.all_sockets_are_disconnected(self.brick_sockets.values()) and self.first_connected:
+            print('All bricks are disconnected. Resetting world.')
+            self.word_simulator.request_reset()
+            self.first_connected = False
+        self._print_next_brick()
+
+    @staticmethod
+    def _parse_hello(data: bytes) -> dict:
+        """
+        Parse the first frame of a connection.
+        :param data: of the frame.
+        :return: the names of the robot, the brick and the codec, each of which may be None.
+        :raises ValueError: if the frame is not a JSON object with text or null as names.
+        """
+        hello = json.loads(data.decode())
+        if not isinstance(hello, dict):
+            raise ValueError('expected a JSON object')
+        for key in ('robot', 'brick', 'codec'):
+            if not isinstance(hello.get(key), (str, type(None))):
+                raise ValueError(f'{key} must be a string')
+        return hello
+
+    def _close_handshake(self, client):
+        """
+        Close a connection which has not been assigned to a brick.
+        :param client: connection of the client.
+        """
+        self.selector.unregister(client)
+        client.close()
+
+    def _find_brick(self, robot_name: Optional[str], brick_name: Optional[str]) -> Optional[ClientSocketHandler]:
         """
-        Checks if sockets are connected and find first socket that is not connected.
+        Find the first brick that is not connected yet, matching the given names.
+        :param robot_name: name of the robot, None for any robot.
+        :param brick_name: name of the brick, None for any brick.
+        :return: the handler of the brick, or None if no brick is available.
         """
-        while True:
-            for (robot_name, brick_name), sock in self.brick_sockets.items():
-                if not sock.is_connected:
-                    if self.wait_for_brick_to_connect(robot_name, brick_name, sock, server):
-                        break
-            time.sleep(.1)
+        for (robot, brick), sock in self.brick_sockets.items():
+            if not sock.is_connected and robot_name in (None, robot) and brick_name in (None, brick):
+                return sock
+        return None
 
-    def wait_for_brick_to_connect(self, robot_name, brick_name, sock, server):
+    def _print_next_brick(self):
         """
-        Wait for a specific brick to connect.
+        Tell the user which brick connects next when the client does not name its brick.
         """
-        print(f'Please connect brick "{brick_name}" from robot "{robot_name}"')
-        while True:
+        for (robot_name, brick_name), sock in self.brick_sockets.items():
+            if not sock.is_connected:
+                print(f'Please connect brick "{brick_name}" from robot "{robot_name}"')
+                return
+
+    def _resume_pending(self):
+        """
+        Push the changes of subscribed sensors and answer the requests of which the frame they wait for has been
+        simulated, then remember the first frame any other request waits for.
+        The changes are pushed first, so a client that waited for a frame knows the values of that frame.
+        """
+        wake_frame = None
+        for sock in self.brick_sockets.values():
+            if sock.is_connected and (sock.updates or sock.is_resumable()):
+                try:
+                    sock.send_updates()
+                    if sock.is_resumable():
+                        sock.resume()
+                except OSError:
+                    self._disconnect(sock)
+            if sock.pending is not None and (wake_frame is None or sock.pending.frame < wake_frame):
+                wake_frame = sock.pending.frame
+        self.wake_frame = wake_frame
+
+    def _flush_queued(self):
+        """
+        Send the data queued on the connections of the bricks. A connection with data left is watched until its
+        socket is writable, a client that does not read only delays its own messages.
+        """
+        for sock in self.brick_sockets.values():
+            if not sock.is_connected:
+                continue
             try:
-                (client, _) = server.accept()
-                self.first_connected = True
-                print(
-                    f'Connection from \"{brick_name}\" from robot \"{robot_name}\" '
-                    'accepted\n')
-                sock.client = client
-                sock.is_connected = True
-                return False  # should not restart connection procedure
-            except socket.timeout:
-                pass
-            if self.all_sockets_are_disconnected(self.brick_sockets.values()) and self.first_connected:
-                print('All bricks are disconnected. Resetting world.')
-                self.word_simulator.request_reset()
-                self.first_connected = False
-                return True  # should restart connection procedure
+                sock.client.flush()
+            except OSError:
+                self._disconnect(sock)
+                continue
+
+            events = selectors.EVENT_READ | (selectors.EVENT_WRITE if sock.client.wants_writable() else 0)
+            key = self.selector.get_key(sock.client)
+            if key.events != events:
+                self.selector.modify(sock.client, events, key.data)
+
+    def _is_wake_frame_reached(self) -> bool:
+        """
+        Check if a frame was simulated that a request waits for, while the requests were being handled.
+        """
+        return self.wake_frame is not None and self.word_simulator.clock.frame >= self.wake_frame
+
+    def _collect_updates(self, frame: int):
+        """
+        Called by the simulation thread after each frame, before the clock advances. Collects the changes of the
+        sensors subscribed to by the connected bricks.
+        :param frame: simulated.
+        """
+        for sock in self.brick_sockets.values():
+            if sock.is_connected:
+                sock.collect_updates(frame)
+
+    def _on_tick(self, frame: int):
+        """
+        Called by the simulation thread after each frame. Wakes up the event loop if a request waits for the frame
+        or if there are changes of subscribed sensors to push.
+        :param frame: simulated.
+        """
+        wake_frame = self.wake_frame
+        if (wake_frame is not None and frame >= wake_frame) or \
+                any(sock.updates for sock in self.brick_sockets.values()):
+            self._wake()
+
+    def _wake(self):
+        """
+        Wake up the event loop.
+        """
+        try:
+            self.wakeup_sender.send(b'\0')
+        except BlockingIOError:
+            pass  # the event loop has not handled the previous wake ups yet, so it will wake up anyway
+
+    @staticmethod
+    def _drain_wakeups(receiver: socket.socket):
+        """
+        Remove the wake ups from the socket, the pending requests are handled by the event loop.
+        :param receiver: socket the wake ups are sent to.
+        """
+        receiver.recv(RECEIVE_SIZE)
+
+    @staticmethod
+    def _receive_frames(client) -> Optional[List[bytes]]:
+        """
+        Receive the frames that are available on the given connection.
+        :param client: to receive from.
+        :return: the received frames, or None if the connection was closed.
+        """
+        try:
+            return client.receive()
+        except OSError:
+            return None
 
     @staticmethod
     def all_sockets_are_disconnected(sockets):
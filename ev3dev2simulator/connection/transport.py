@@ -0,0 +1,480 @@
+"""
+The transport module contains the different ways the ev3dev2 mock and the simulator can be connected.
+The transport is selected with the transport setting in the simulation settings:
+- tcp: a TCP connection to localhost. This is the default.
+- unix: a Unix domain socket, which skips the TCP stack of the operating system.
+- shm: shared memory ring buffers for the messages, with a Unix domain socket to wake up the receiver.
+All transports deliver whole frames, so the rest of the simulator does not know which one is used.
+The simulator accepts connections as non-blocking: data a client does not take at once is queued on the connection
+and sent by flush, so a client that stops reading cannot block the event loop of the simulator.
+"""
+
+import mmap
+import os
+import select
+import socket
+import struct
+import tempfile
+import time
+from collections import deque
+from typing import List, Optional
+
+from ev3dev2simulator.config.config import get_simulation_settings
+from ev3dev2simulator.connection.protocol import FrameBuffer, FRAME_HEADER, send_frame
+
+RECEIVE_SIZE = 4096
+
+RING_POSITIONS = struct.Struct('!QQ')
+RING_POSITION = struct.Struct('!Q')
+RING_CAPACITY = 1 << 16
+
+# Time in seconds to wait before checking again if a full ring buffer has been read
+RING_FULL_INTERVAL = 0.0001
+
+
+class StreamConnection:
+    """
+    Connection sending frames over a stream socket, either TCP or a Unix domain socket.
+    When the socket is non-blocking, what the socket does not take at once is queued until flush is called.
+    """
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.buffer = FrameBuffer()
+        self.is_non_blocking = sock.gettimeout() == 0.0
+        self.queued = bytearray()
+
+    def fileno(self) -> int:
+        """
+        File descriptor which becomes readable when frames arrive, used to wait for the connection in an event loop.
+        """
+        return self.sock.fileno()
+
+    def send(self, payload: bytes):
+        """
+        Send the given payload as a single frame.
+        :param payload: the encoded message.
+        """
+        if not self.is_non_blocking:
+            send_frame(self.sock, payload)
+            return
+
+        self.queued.extend(FRAME_HEADER.pack(len(payload)))
+        self.queued.extend(payload)
+        self.flush()
+
+    def flush(self):
+        """
+        Send as much of the queued data as the socket takes without blocking.
+        """
+        while self.queued:
+            try:
+                sent = self.sock.send(self.queued)
+            except BlockingIOError:
+                return
+            del self.queued[:sent]
+
+    def wants_writable(self) -> bool:
+        """
+        Check if data is queued, so flush has to be called once the socket is writable.
+        """
+        return bool(self.queued)
+
+    def receive(self) -> Optional[List[bytes]]:
+        """
+        Receive the data that is available, call this when the connection is readable.
+        :return: the frames completed by the received data, or None if the connection was closed.
+        """
+        try:
+            data = self.sock.recv(RECEIVE_SIZE)
+        except BlockingIOError:
+            return []
+        except ConnectionError:
+            return None
+        if not data:
+            return None
+
+        self.buffer.feed(data)
+        frames = []
+        frame = self.buffer.next_frame()
+        while frame is not None:
+            frames.append(frame)
+            frame = self.buffer.next_frame()
+        return frames
+
+    def receive_frame(self) -> Optional[bytes]:
+        """
+        Receive a single frame. Blocks until the frame is complete.
+        :return: the encoded message, or None if the connection was closed.
+        """
+        frame = self.buffer.next_frame()
+        while frame is None:
+            if self.is_non_blocking:
+                select.select([self.sock], [], [])
+            data = self.sock.recv(RECEIVE_SIZE)
+            if not data:
+                return None
+            self.buffer.feed(data)
+            frame = self.buffer.next_frame()
+        return frame
+
+    def close(self):
+        """
+        Close the connection.
+        """
+        self.sock.close()
+
+
+class RingBuffer:
+    """
+    Ring buffer in a memory mapped file, written by one process and read by another.
+    The file starts with the total number of bytes written and read, followed by the data.
+    Data larger than the buffer is written in parts, the reader has to make room in between.
+    """
+
+    def __init__(self, path: str, capacity: int = RING_CAPACITY):
+        self.path = path
+        with open(path, 'r+b') as file:
+            if os.path.getsize(path) == 0:
+                file.truncate(RING_POSITIONS.size + capacity)
+            self.memory = mmap.mmap(file.fileno(), 0)
+        self.capacity = len(self.memory) - RING_POSITIONS.size
+
+    def write(self, data: bytes) -> int:
+        """
+        Write as much of the given data as fits in the buffer, without waiting for the reader.
+        :param data: to write.
+        :return: the number of bytes written.
+        """
+        write_position, read_position = RING_POSITIONS.unpack_from(self.memory)
+        free = self.capacity - (write_position - read_position)
+        written = 0
+        while written < len(data) and free > 0:
+            size = min(free, len(data) - written, self.capacity - write_position % self.capacity)
+            start = RING_POSITIONS.size + write_position % self.capacity
+            self.memory[start:start + size] = data[written:written + size]
+            written += size
+            write_position += size
+            free -= size
+        RING_POSITION.pack_into(self.memory, 0, write_position)
+        return written
+
+    def available(self) -> int:
+        """
+        Get the number of bytes that have been written but not read yet.
+        """
+        write_position, read_position = RING_POSITIONS.unpack_from(self.memory)
+        return write_position - read_position
+
+    def read(self, size: int) -> bytes:
+        """
+        Read the given number of bytes, which must have been written already.
+        :param size: number of bytes to read.
+        :return: the read data.
+        """
+        read_position = RING_POSITIONS.unpack_from(self.memory)[1]
+        data = bytearray()
+        while len(data) < size:
+            start = RING_POSITIONS.size + read_position % self.capacity
+            chunk = min(size - len(data), self.capacity - read_position % self.capacity)
+            data.extend(self.memory[start:start + chunk])
+            read_position += chunk
+        RING_POSITION.pack_into(self.memory, RING_POSITION.size, read_position)
+        return bytes(data)
+
+    def close(self):
+        """
+        Unmap the buffer.
+        """
+        self.memory.close()
+
+
+class SharedMemoryConnection:
+    """
+    Connection writing frames into a shared memory ring buffer. After writing, a single byte is sent over a
+    Unix domain socket, so the receiver can sleep until data arrives instead of checking the buffer all the time.
+    The receiver reads all data available when woken up, so frames larger than the buffer are written in parts.
+    When the socket is non-blocking, what does not fit in the buffer is queued until flush is called. A receiver
+    that empties a full buffer sends a byte back, so the sender knows when to flush.
+    The simulator accepts a connection before its buffers are known. The client sends their paths as the first
+    frame over the socket, the buffers are mapped once that frame has been received.
+    """
+
+    def __init__(self, sock: socket.socket, outgoing: RingBuffer = None, incoming: RingBuffer = None):
+        self.sock = sock
+        self.outgoing = outgoing
+        self.incoming = incoming
+        self.paths_buffer = FrameBuffer() if incoming is None else None
+        self.buffer = FrameBuffer()
+        self.unread = deque()
+        self.is_non_blocking = sock.gettimeout() == 0.0
+        self.queued = deque()
+
+    def fileno(self) -> int:
+        """
+        File descriptor which becomes readable when frames arrive, used to wait for the connection in an event loop.
+        """
+        return self.sock.fileno()
+
+    def send(self, payload: bytes):
+        """
+        Send the given payload as a single frame. The receiver is woken up after every part that is written, so
+        it makes room for the rest when the frame does not fit in the buffer.
+        :param payload: the encoded message.
+        """
+        data = memoryview(FRAME_HEADER.pack(len(payload)) + payload)
+        if self.is_non_blocking:
+            self.queued.append(data)
+            self.flush()
+            return
+
+        written = self.outgoing.write(data)
+        self.sock.sendall(b'\0')
+        while written < len(data):
+            time.sleep(RING_FULL_INTERVAL)
+            size = self.outgoing.write(data[written:])
+            if size:
+                written += size
+                self.sock.sendall(b'\0')
+
+    def flush(self):
+        """
+        Write as much of the queued data as fits in the buffer and wake up the receiver.
+        """
+        while self.queued:
+            written = self.outgoing.write(self.queued[0])
+            if written:
+                self._wake()
+            if written < len(self.queued[0]):
+                self.queued[0] = self.queued[0][written:]
+                return
+            self.queued.popleft()
+
+    @staticmethod
+    def wants_writable() -> bool:
+        """
+        The socket is not needed to write to the buffer, the receiver sends a byte back when it made room.
+        """
+        return False
+
+    def _wake(self):
+        """
+        Wake up the receiver. When the socket does not take the byte, the receiver has not read earlier wake ups
+        yet, which wake it up as well.
+        """
+        try:
+            self.sock.send(b'\0')
+        except BlockingIOError:
+            pass
+
+    def receive(self) -> Optional[List[bytes]]:
+        """
+        Receive the frames that are available, call this when the connection is readable.
+        :return: the received frames, or None if the connection was closed.
+        """
+        try:
+            signals = self.sock.recv(RECEIVE_SIZE)
+        except BlockingIOError:
+            return []
+        except ConnectionError:
+            return None
+        if not signals:
+            return None
+        if self.incoming is None:
+            self._map_buffers(signals)
+            if self.incoming is None:
+                return []
+
+        # a wake up may be for data that was already read with an earlier one, then no frames are returned
+        available = self.incoming.available()
+        self.buffer.feed(self.incoming.read(available))
+        if available == self.incoming.capacity:
+            self._wake()
+        frames = []
+        frame = self.buffer.next_frame()
+        while frame is not None:
+            frames.append(frame)
+            frame = self.buffer.next_frame()
+        return frames
+
+    def _map_buffers(self, data: bytes):
+        """
+        Collect the frame with the paths of the buffers created by the client and map the buffers once it is
+        complete. The client may already have written frames, their wake up bytes follow the paths frame.
+        :param data: received before the buffers were mapped.
+        """
+        self.paths_buffer.feed(data)
+        frame = self.paths_buffer.next_frame()
+        if frame is None:
+            return
+
+        paths = frame.decode().split('\n')
+        self.incoming, self.outgoing = RingBuffer(paths[0]), RingBuffer(paths[1])
+        for path in paths:
+            os.remove(path)
+        self.paths_buffer = None
+
+    def receive_frame(self) -> Optional[bytes]:
+        """
+        Receive a single frame. Blocks until a frame has been written.
+        :return: the encoded message, or None if the connection was closed.
+        """
+        while not self.unread:
+            if self.is_non_blocking:
+                select.select([self.sock], [], [])
+            frames = self.receive()
+            if frames is None:
+                return None
+            self.unread.extend(frames)
+        return self.unread.popleft()
+
+    def close(self):
+        """
+        Close the connection and unmap the buffers.
+        """
+        self.sock.close()
+        for buffer in (self.outgoing, self.incoming):
+            if buffer is not None:
+                buffer.close()
+
+
+class TcpTransport:
+    """
+    Transport connecting to the simulator over TCP on localhost.
+    """
+
+    def __init__(self, settings: dict):
+        self.port = int(settings['socket_port'])
+
+    def listen(self) -> socket.socket:
+        """
+        Create the socket the simulator accepts connections on.
+        """
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(('localhost', self.port))
+        server.listen(5)
+        return server
+
+    @staticmethod
+    def accept(server: socket.socket):
+        """
+        Accept a connection on the given socket.
+        :param server: created by listen.
+        :return: the connection.
+        """
+        client, _ = server.accept()
+        client.setblocking(False)
+        return StreamConnection(client)
+
+    def connect(self):
+        """
+        Connect to the simulator.
+        :return: the connection.
+        """
+        return StreamConnection(socket.create_connection(('localhost', self.port)))
+
+
+class UnixTransport:
+    """
+    Transport connecting to the simulator over a Unix domain socket in the temporary directory.
+    """
+
+    def __init__(self, settings: dict):
+        self.path = os.path.join(tempfile.gettempdir(), str(settings['socket_path']))
+
+    def listen(self) -> socket.socket:
+        """
+        Create the socket the simulator accepts connections on, replacing the socket of a previous simulator.
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.path)
+        server.listen(5)
+        return server
+
+    @staticmethod
+    def accept(server: socket.socket):
+        """
+        Accept a connection on the given socket.
+        :param server: created by listen.
+        :return: the connection.
+        """
+        client, _ = server.accept()
+        client.setblocking(False)
+        return StreamConnection(client)
+
+    def _connect_socket(self) -> socket.socket:
+        """
+        Connect the Unix domain socket of the simulator.
+        """
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(self.path)
+        return client
+
+    def connect(self):
+        """
+        Connect to the simulator.
+        :return: the connection.
+        """
+        return StreamConnection(self._connect_socket())
+
+
+class SharedMemoryTransport(UnixTransport):
+    """
+    Transport sending messages through shared memory ring buffers. The client creates the buffers and sends
+    their paths over the Unix domain socket of the simulator, which is used afterwards to wake up the receiver.
+    """
+
+    @staticmethod
+    def accept(server: socket.socket):
+        """
+        Accept a connection on the given socket. The ring buffers created by the client are mapped when their
+        paths are received, so accepting does not wait for the client.
+        :param server: created by listen.
+        :return: the connection.
+        """
+        client, _ = server.accept()
+        client.setblocking(False)
+        return SharedMemoryConnection(client)
+
+    def connect(self):
+        """
+        Create the ring buffers and connect to the simulator.
+        :return: the connection.
+        """
+        directory = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+        paths = []
+        buffers = []
+        client = None
+        try:
+            for _ in range(2):
+                descriptor, path = tempfile.mkstemp(prefix='ev3dev2simulator-', dir=directory)
+                os.close(descriptor)
+                paths.append(path)
+                buffers.append(RingBuffer(path))
+
+            client = self._connect_socket()
+            send_frame(client, str.encode('\n'.join(paths)))
+        except OSError:
+            # the simulator removes the files once it mapped them, without a simulator nobody else will
+            if client is not None:
+                client.close()
+            for buffer in buffers:
+                buffer.close()
+            for path in paths:
+                os.remove(path)
+            raise
+        return SharedMemoryConnection(client, buffers[0], buffers[1])
+
+
+TRANSPORTS = {'tcp': TcpTransport, 'unix': UnixTransport, 'shm': SharedMemoryTransport}
+
+
+def get_transport():
+    """
+    Get the transport selected in the simulation settings.
+    """
+    settings = get_simulation_settings()['exec_settings']
+    return TRANSPORTS[str(settings['transport'])](settings)
@@ -0,0 +1,75 @@
+"""
+The clock_connector module contains the class ClockConnector.
+"""
+
+import time
+from typing import Optional
+
+from ev3dev2simulator.connection.client_socket import get_client_socket
+from ev3dev2simulator.connection.message.sleep_request import SleepRequest
+from ev3dev2simulator.connection.message.time_request import TimeRequest
+
+# Time in seconds to wait before asking the time again when the simulator runs as fast as possible
+MIN_POLL_INTERVAL = 0.001
+
+
+class ClockConnector:
+    """
+    The ClockConnector class provides the ev3dev2 classes with the time of the simulator.
+    Simulated time advances one frame at a time, which can be slower or faster than real time.
+    This class is responsible for creating TimeRequests to be send to simulator.
+    """
+
+    def __init__(self):
+        self.client_socket = get_client_socket()
+
+    def time(self) -> float:
+        """
+        Get the simulated time.
+        :return: the time in seconds since the start of the simulation.
+        """
+        return self.get_status()['time']
+
+    def sleep(self, seconds: float):
+        """
+        Block until the given amount of simulated time has passed. In lock-step mode the simulator
+        is told this client is done until then, otherwise the time is polled.
+        :param seconds: to sleep.
+        """
+        if seconds <= 0:
+            return
+
+        status = self.get_status()
+        if status.get('lock_step'):
+            self.client_socket.send_command(SleepRequest(seconds), True)
+            return
+
+        end_time = status['time'] + seconds
+
+        while status['time'] < end_time:
+            if status['speed'] > 0:
+                time.sleep(max((end_time - status['time']) / status['speed'], MIN_POLL_INTERVAL))
+            else:
+                time.sleep(MIN_POLL_INTERVAL)
+            status = self.get_status()
+
+    @staticmethod
+    def to_wall_time(seconds: Optional[float], status: dict) -> Optional[float]:
+        """
+        Convert an amount of simulated time into the real time it takes at the current speed of the simulation.
+        :param seconds: of simulated time, None for no limit.
+        :param status: of the clock, as given by get_status.
+        :return: the real time in seconds, the poll interval when the simulation runs as fast as possible.
+        """
+        if seconds is None:
+            return None
+        return seconds / status['speed'] if status['speed'] > 0 else MIN_POLL_INTERVAL
+
+    def get_status(self) -> dict:
+        """
+        Request the simulated time and the speed of the simulation, or read them from the sensor snapshot.
+        :return: a dictionary containing the time, the speed and whether the simulation runs in lock-step.
+        """
+        if self.client_socket.snapshot is not None:
+            return self.client_socket.snapshot.read_status()
+        return self.client_socket.send_command(TimeRequest(), True)
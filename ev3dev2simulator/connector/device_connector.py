@@ -4,6 +4,7 @@ The module device_connector contains the class DeviceConnector, as class used to
 
 import ev3dev2
 from ev3dev2simulator.connection.client_socket import get_client_socket
+from ev3dev2simulator.connection.device_table import NOT_CONNECTED
 from ev3dev2simulator.connection.message.config_request import ConfigRequest
 
 
@@ -22,11 +23,15 @@ class DeviceConnector:
     def request_device_config(self, kwargs):
         """
         Requests the port that the device is attached to. This helps preventing errors if a port is given,
-        or retrieves the port that should be used.
+        or retrieves the port that should be used. The port is found in the devices the simulator sent when
+        connecting, only a simulator which did not send them is asked.
         """
-        request = ConfigRequest(kwargs, self.class_name)
-        new_port = self.client_socket.send_command(request, True)
-        if new_port == 'dev_not_connected':
+        if self.client_socket.devices is not None:
+            new_port = self.client_socket.devices.determine_port(kwargs, self.class_name)
+        else:
+            request = ConfigRequest(kwargs, self.class_name)
+            new_port = self.client_socket.send_command(request, True)
+        if new_port == NOT_CONNECTED:
             raise ev3dev2.DeviceNotFound(
                 f'Could not find device of type(s) '
                 f'{kwargs.get("driver_name")} {f"on port {self.address}" if self.address else ""}')
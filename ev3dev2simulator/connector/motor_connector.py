@@ -2,9 +2,15 @@
 the module motor_connector contains the class MotorConnector.
 """
 
+from typing import Iterable, Optional
+
+from ev3dev2simulator.config.config import get_simulation_settings
 from ev3dev2simulator.connection.client_socket import get_client_socket
+from ev3dev2simulator.connection.message.motor_state_request import MotorStateRequest
+from ev3dev2simulator.connection.message.multi_rotate_command import MultiRotateCommand
 from ev3dev2simulator.connection.message.rotate_command import RotateCommand
 from ev3dev2simulator.connection.message.stop_command import StopCommand
+from ev3dev2simulator.connector.clock_connector import ClockConnector
 
 FOREVER_MOCK_SECONDS = 45
 
@@ -15,6 +21,9 @@ class MotorConnector:
     and the motors on the simulated robot. This includes motor positioning and speed/distance data.
     This class is responsible for calling the MotorCommandCreator to create movement commands for
     the simulator.
+    The motor is subscribed to when its state is first needed, so the simulator tells when the motor has finished
+    its commands and became idle, and pushes its position and speed whenever they change. Motors that are never
+    waited for or checked do not cost any pushes.
     """
 
     def __init__(self, address: str, max_speed: int):
@@ -26,8 +35,15 @@ class MotorConnector:
         self.distance = None
         self.time = None
         self.stop_action = None
+        self.position_offset = 0
 
         self.client_socket = get_client_socket()
+        self.clock = ClockConnector()
+
+        self.frame_time = 1 / int(get_simulation_settings()['exec_settings']['frames_per_second'])
+        self.run_until = 0
+        self.group = None
+        self.is_subscribed = False
 
     def set_duty_cycle(self, duty_cycle: int):
         """
@@ -70,6 +86,90 @@ class MotorConnector:
 
         self.stop_action = action
 
+    def get_position(self) -> int:
+        """
+        Get the position of the motor as measured by its encoder in the simulator.
+        :return: the position in tacho counts, relative to the last position set.
+        """
+
+        return self._get_state()['position'] - self.position_offset
+
+    def set_position(self, position: int):
+        """
+        Set the current position of the motor to the given value, like the encoder of a real motor can be reset.
+        :param position: in tacho counts.
+        """
+
+        self.position_offset = self._get_state()['position'] - position
+
+    def get_speed(self) -> int:
+        """
+        Get the speed the motor is running at in the simulator.
+        :return: the speed in tacho counts per second.
+        """
+
+        return self._get_state()['speed']
+
+    def is_running(self) -> bool:
+        """
+        Check if the motor has not finished all commands sent to it, according to the simulator.
+        """
+
+        self.subscribe()
+        return not self.client_socket.is_idle(self.address)
+
+    def subscribe(self):
+        """
+        Let the simulator push the number of commands the motor finished, so it tells when the motor became idle,
+        and the position and speed of the motor. The simulator counts the commands from the start, so subscribing
+        after commands were sent is fine.
+        """
+
+        if not self.is_subscribed:
+            self.client_socket.subscribe(self.address)
+            self.is_subscribed = True
+
+    def get_change_frame(self) -> int:
+        """
+        Get the frame in which the simulator last told the motor finished a command. Take it before checking the
+        state of the motor and pass it to wait_for_change, so a change in between is not missed.
+        """
+
+        self.subscribe()
+        return self.client_socket.get_change_frame(self.address)
+
+    def wait_for_change(self, frame: int, timeout: Optional[float] = None):
+        """
+        Block until the simulator tells the motor became idle. In lock-step mode the simulation only advances while
+        the program waits, so the time the motor is expected to run is slept instead, at least a single frame.
+        :param frame: last change known to the caller, as given by get_change_frame.
+        :param timeout: maximum simulated time in seconds to wait, None to wait until the motor becomes idle.
+        """
+
+        self.subscribe()
+        status = self.clock.get_status()
+
+        if status.get('lock_step'):
+            seconds = max(self.frame_time, self.run_until - status['time'])
+            self.clock.sleep(seconds if timeout is None else min(timeout, seconds))
+        else:
+            self.client_socket.wait_for_change(self.address, frame, self.clock.to_wall_time(timeout, status))
+
+    def _get_state(self) -> dict:
+        """
+        Get the position and speed of the motor, from the sensor snapshot when available, otherwise as pushed by the
+        simulator after subscribing. Only when neither is available a MotorStateRequest is sent.
+        :return: a dictionary with the position and speed of the motor.
+        """
+
+        state = self.client_socket.read_motor_state(self.address)
+        if state is None:
+            self.subscribe()
+            state = self.client_socket.get_motor_state(self.address)
+        if state is None:
+            state = self.client_socket.send_command(MotorStateRequest(self.address), True)[self.address]
+        return state
+
     def run_forever(self) -> float:
         """
         Run the motor indefinitely. This is translated to 45 seconds.
@@ -127,7 +227,7 @@ class MotorConnector:
                                     self.distance,
                                     self.stop_action)
 
-        return self.client_socket.send_command(command, True)
+        return self._send(command)
 
     def stop(self) -> float:
         """
@@ -147,4 +247,73 @@ class MotorConnector:
             speed *= -1
 
         command = StopCommand(self.address, speed, stop_action)
-        return self.client_socket.send_command(command, True)
+        return self._send(command)
+
+    def _send(self, command) -> float:
+        """
+        Send a command replacing the jobs of the motor. It is counted before sending, so the motor is running
+        until the simulator tells it finished this command. When the motor is part of a MotorCommandGroup the
+        command is sent by the group instead.
+        :param command: to send.
+        :return: the number of seconds the command will take according to the simulator, 0 when the command is
+        sent by a group.
+        """
+
+        if self.group is not None:
+            self.group.add(self, command)
+            return 0
+
+        self.client_socket.count_command(self.address)
+        run_time = self.client_socket.send_command(command, True)
+        self.run_until = self.clock.time() + run_time
+        return run_time
+
+
+class MotorCommandGroup:
+    """
+    Collects the commands of several motors and sends them in a single MultiRotateCommand, so the simulator starts
+    all motors in the same frame. The commands are collected while the group is used as context manager:
+
+        with MotorCommandGroup([left.connector, right.connector]):
+            left.run_timed()
+            right.run_timed()
+    """
+
+    def __init__(self, connectors: Iterable[MotorConnector]):
+        self.connectors = list(connectors)
+        self.commands = []
+
+    def __enter__(self):
+        for connector in self.connectors:
+            connector.group = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for connector in self.connectors:
+            connector.group = None
+        if exc_type is None and self.commands:
+            self.send()
+
+    def add(self, connector: MotorConnector, command):
+        """
+        Add the command of one of the motors to the group.
+        :param connector: of the motor.
+        :param command: to send.
+        """
+
+        self.commands.append((connector, command))
+
+    def send(self):
+        """
+        Send the collected commands in a single message.
+        """
+
+        client_socket = self.connectors[0].client_socket
+        for connector, _ in self.commands:
+            client_socket.count_command(connector.address)
+        run_times = client_socket.send_command(MultiRotateCommand([command for _, command in self.commands]), True)
+
+        now = self.connectors[0].clock.time()
+        for (connector, _), run_time in zip(self.commands, run_times):
+            connector.run_until = now + run_time
+        self.commands = []
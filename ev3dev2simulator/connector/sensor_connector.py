@@ -2,12 +2,13 @@
 The module sensor_connector contains the class SensorConnector.
 """
 
-import time
-from typing import Any
+from typing import Any, Dict, List, Optional
 
 from ev3dev2simulator.config.config import get_simulation_settings
 from ev3dev2simulator.connection.client_socket import get_client_socket
+from ev3dev2simulator.connection.message.bulk_data_request import BulkDataRequest
 from ev3dev2simulator.connection.message.data_request import DataRequest
+from ev3dev2simulator.connector.clock_connector import ClockConnector
 
 
 class SensorConnector:
@@ -15,6 +16,8 @@ class SensorConnector:
     The SensorConnector class provides a translation layer between the ev3dev2 sensor classes
     and the sensors on the simulated robot. This includes sensor data.
     This class is responsible for creating DataRequests to be send to simulator.
+    After subscribing, the values pushed by the simulator are used instead.
+    Several sensors can be read at once with read_many, after which each of them returns its value without a request.
     """
 
     def __init__(self, address: str):
@@ -23,40 +26,142 @@ class SensorConnector:
             raise RuntimeError('created connector with None as address')
 
         self.client_socket = get_client_socket()
+        self.clock = ClockConnector()
 
-        self.wait_time = 0.008
         self.frame_time = 1 / int(get_simulation_settings()['exec_settings']['frames_per_second'])
         self.last_request_time = 0
 
         self.value_cache = None
+        self.value_frame = None
+        self.is_prefetched = False
         self.delta_sum = 0
+        self.is_subscribed = False
 
     def get_value(self) -> Any:
         """
-        Get data of the simulated sensor at the given address if required. Provides caching whenever a second request
-        would result in the same answer as the first, because they happened in such quick succession that the
-        simulator data could not possibly have changed yet. :return: the value in any form of the sensor.
+        Get data of the simulated sensor at the given address. Whenever a second request happens in such quick
+        succession that the simulator data could not possibly have changed yet, the simulator is asked for a value
+        of a later frame than the previous one instead. The simulated time is only asked for in that case, values
+        prefetched by read_many or pushed by the simulator are returned without any request.
+        :return: the value in any form of the sensor.
+        """
+
+        if self.is_prefetched:
+            # the value was read together with other sensors by read_many, a read right after it asks for a later frame
+            self.is_prefetched = False
+            self.last_request_time = None
+            self.delta_sum = 0
+
+        elif self.is_subscribed:
+            # pushed values are free to read and always the latest one, so there is no need to wait for a new frame
+            self.value_cache = self.send_command()
+
+        else:
+            self.value_cache = self._request_value()
+
+        return int(self.value_cache)
+
+    def _request_value(self) -> Any:
+        """
+        Request the value of the sensor, of a later frame than the previous value when it was read less than a
+        frame ago.
+        :return: the value in any form of the sensor.
         """
 
-        now = time.time()
-        delta = now - self.last_request_time
+        now = self.clock.time()
+        delta = 0 if self.last_request_time is None else now - self.last_request_time
 
         self.delta_sum += delta
         self.last_request_time = now
 
-        if delta > self.frame_time or self.delta_sum > self.frame_time:
+        if self.value_cache is None or delta > self.frame_time or self.delta_sum > self.frame_time:
             self.delta_sum = 0
-            self.value_cache = self.send_command()
+            return self.send_command()
+        return self.send_command(self.value_frame)
+
+    @staticmethod
+    def read_many(connectors: List['SensorConnector']) -> Dict[str, Any]:
+        """
+        Read the values of several sensors of the brick in a single request, all belonging to the same frame.
+        The frame is later than the oldest one the sensors were read in before, so reading them again waits for
+        the next frame. The next read of each of these sensors returns the value read here, so a control loop can
+        start every iteration with SensorConnector.read_many([sensor.connector for sensor in sensors]) and then
+        read the sensors as usual.
+        :param connectors: of the sensors to read.
+        :return: the values by address of the sensor.
+        """
+        if not connectors:
+            return {}
+
+        client_socket = connectors[0].client_socket
+        addresses = [connector.address for connector in connectors]
+        frames = [connector.value_frame for connector in connectors]
+        newer_than = None if None in frames else min(frames)
 
+        reading = client_socket.read_sensors(addresses) if client_socket.snapshot is not None else None
+        if reading is not None and None not in reading[0] and (newer_than is None or reading[1] > newer_than):
+            values, frame = dict(zip(addresses, reading[0])), reading[1]
         else:
-            time.sleep(self.wait_time)
+            response = client_socket.send_command(BulkDataRequest(addresses, newer_than), True)
+            values, frame = response['values'], response['frame']
 
-        return int(self.value_cache)
+        for connector in connectors:
+            connector.value_cache = values[connector.address]
+            connector.value_frame = frame
+            connector.is_prefetched = True
+        return values
+
+    def subscribe(self):
+        """
+        Let the simulator push the value of the sensor whenever it changes, instead of requesting it.
+        """
+        if not self.is_subscribed:
+            self.client_socket.subscribe(self.address)
+            self.is_subscribed = True
+
+    def get_change_frame(self) -> int:
+        """
+        Get the frame in which the value of the sensor last changed, subscribing to it first. Take it before reading
+        the value and pass it to wait_for_change, so a change in between is not missed.
+        """
+        self.subscribe()
+        return self.client_socket.get_change_frame(self.address)
+
+    def wait_for_change(self, frame: int, timeout: Optional[float] = None):
+        """
+        Block until the value of the sensor changes. In lock-step mode a single frame is waited for, because
+        the simulation only advances while the program waits.
+        :param frame: last change known to the caller, as given by get_change_frame.
+        :param timeout: maximum simulated time in seconds to wait, None to wait until the value changes.
+        """
+        self.subscribe()
+        status = self.clock.get_status()
 
-    def send_command(self) -> Any:
+        if status.get('lock_step'):
+            self.clock.sleep(self.frame_time if timeout is None else min(timeout, self.frame_time))
+        else:
+            self.client_socket.wait_for_change(self.address, frame, self.clock.to_wall_time(timeout, status))
+
+    def send_command(self, newer_than: Optional[int] = None) -> Any:
         """
-        Get data of the simulated sensor at the given address.
+        Get data of the simulated sensor at the given address. The value pushed by the simulator is used after
+        subscribing, else it is read from the sensor snapshot when the simulator publishes one, otherwise it is
+        requested. The frame the value belongs to is remembered, if it is known.
+        :param newer_than: if given, only a value belonging to a later frame than this one is accepted.
         :return: the value in any form of the sensor.
         """
-        request = DataRequest(self.address)
-        return self.client_socket.send_command(request, True)
+        if self.is_subscribed and newer_than is None:
+            value = self.client_socket.get_sensor_value(self.address)
+            if value is not None:
+                self.value_frame = self.client_socket.get_change_frame(self.address)
+                return value
+
+        if self.client_socket.snapshot is not None:
+            reading = self.client_socket.read_sensor(self.address)
+            if reading is not None and reading[0] is not None and (newer_than is None or reading[1] > newer_than):
+                value, self.value_frame = reading
+                return value
+
+        response = self.client_socket.send_command(DataRequest(self.address, newer_than), True)
+        self.value_frame = response['frame']
+        return response['value']
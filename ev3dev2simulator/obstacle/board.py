@@ -2,11 +2,9 @@
 The module board contains the class Board, the background of the playing field.
 """
 
-
-import arcade as _arcade
-
 from ev3dev2simulator.obstacle.color_obstacle import ColorObstacle
-from ev3dev2simulator.util.util import to_color_code
+from ev3dev2simulator.util.raster import fill_polygon
+from ev3dev2simulator.util.util import Color, PointList, get_rectangle_points, is_point_in_polygon, to_color_code
 
 
 class Board(ColorObstacle):
@@ -19,7 +17,7 @@ class Board(ColorObstacle):
                  y: float,
                  width: int,
                  height: int,
-                 color: _arcade.Color):
+                 color: Color):
         super(Board, self).__init__(to_color_code(color))
         self.x = x
         self.y = y
@@ -38,36 +36,45 @@ class Board(ColorObstacle):
         """
         return [self.shape]
 
+    def create_points(self, scale):
+        """
+        Creates the points of the board, used for collision detection.
+        """
+        self.points = self._create_points(scale)
+
     def create_shape(self, scale):
         """
         Creates the shape of the border.
         """
-        self.points = self._create_points(scale)
+        self.create_points(scale)
         self.shape = self._create_shape()
 
-    def _create_points(self, scale) -> _arcade.PointList:
+    def _create_points(self, scale) -> PointList:
         """
         Create a list of points representing this rock in 2D space.
         :return: a PointList object.
         """
-        return _arcade.get_rectangle_points(self.x * scale,
-                                            self.y * scale,
-                                            self.width * scale,
-                                            self.height * scale,
-                                            self.angle)
+        return get_rectangle_points(self.x * scale,
+                                    self.y * scale,
+                                    self.width * scale,
+                                    self.height * scale,
+                                    self.angle)
 
-    def _create_shape(self) -> _arcade.Shape:
+    def _create_shape(self):
         """
         Create a shape representing the rectangle of this rock.
         :return: a Arcade shape object.
         """
+        # pylint: disable=import-outside-toplevel
+        from arcade import create_rectangles_filled_with_colors
+        # pylint: enable=import-outside-toplevel
 
         colors = []
 
         for _ in range(4):
             colors.append(self.color)
 
-        return _arcade.create_rectangles_filled_with_colors(self.points, colors)
+        return create_rectangles_filled_with_colors(self.points, colors)
 
     def collided_with(self, x: float, y: float) -> bool:
         """
@@ -77,4 +84,11 @@ class Board(ColorObstacle):
         :return: True if collision detected.
         """
 
-        return _arcade.is_point_in_polygon(x, y, self.points)
+        return is_point_in_polygon(x, y, self.points)
+
+    def get_bounding_boxes(self) -> list:
+        return [(self.x - self.width / 2, self.y - self.height / 2,
+                 self.x + self.width / 2, self.y + self.height / 2)]
+
+    def fill_raster(self, raster, value, scale: float):
+        fill_polygon(raster, self.points, value, scale)
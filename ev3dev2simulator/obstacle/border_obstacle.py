@@ -3,9 +3,9 @@ The border_obstacle module contains the class BorderObstacle
 It is a class representing any obstacle acting as a square border.
 """
 
-import arcade as _arcade
-
 from ev3dev2simulator.obstacle.color_obstacle import ColorObstacle
+from ev3dev2simulator.util.raster import fill_polygon
+from ev3dev2simulator.util.util import get_rectangle_points, is_point_in_polygon
 
 
 class BorderObstacle(ColorObstacle):
@@ -26,7 +26,7 @@ class BorderObstacle(ColorObstacle):
         self.bottom_points = None
         self.left_points = None
 
-    def _calc_points(self, scale):
+    def create_points(self, scale):
         """
         Calculate the points of the polygon this BorderObstacle consist of.
         """
@@ -44,28 +44,40 @@ class BorderObstacle(ColorObstacle):
         border_long_width = screen_width - screen_edge_spacing * 2
         border_long_height = screen_height - screen_edge_spacing * 2
 
-        self.top_points = _arcade.get_rectangle_points(screen_center_x,
-                                                       screen_height - screen_edge_spacing - (draw_depth / 2),
-                                                       border_long_width,
-                                                       draw_depth)
+        self.top_points = get_rectangle_points(screen_center_x,
+                                               screen_height - screen_edge_spacing - (draw_depth / 2),
+                                               border_long_width,
+                                               draw_depth)
 
-        self.right_points = _arcade.get_rectangle_points(screen_width - screen_edge_spacing - (draw_depth / 2),
-                                                         screen_center_y,
-                                                         draw_depth,
-                                                         border_long_height)
+        self.right_points = get_rectangle_points(screen_width - screen_edge_spacing - (draw_depth / 2),
+                                                 screen_center_y,
+                                                 draw_depth,
+                                                 border_long_height)
 
-        self.bottom_points = _arcade.get_rectangle_points(screen_center_x,
-                                                          screen_edge_spacing + (draw_depth / 2),
-                                                          border_long_width,
-                                                          draw_depth)
+        self.bottom_points = get_rectangle_points(screen_center_x,
+                                                  screen_edge_spacing + (draw_depth / 2),
+                                                  border_long_width,
+                                                  draw_depth)
 
-        self.left_points = _arcade.get_rectangle_points(screen_edge_spacing + (draw_depth / 2),
-                                                        screen_center_y,
-                                                        draw_depth,
-                                                        border_long_height)
+        self.left_points = get_rectangle_points(screen_edge_spacing + (draw_depth / 2),
+                                                screen_center_y,
+                                                draw_depth,
+                                                border_long_height)
 
     def collided_with(self, x: float, y: float) -> bool:
         for side in [self.top_points, self.right_points, self.bottom_points, self.left_points]:
-            if _arcade.is_point_in_polygon(x, y, side):
+            if is_point_in_polygon(x, y, side):
                 return True
         return False
+
+    def get_bounding_boxes(self) -> list:
+        outer_x = self.rectangle_width - self.edge_spacing
+        outer_y = self.rectangle_height - self.edge_spacing
+        return [(self.edge_spacing, outer_y - self.depth, outer_x, outer_y),
+                (outer_x - self.depth, self.edge_spacing, outer_x, outer_y),
+                (self.edge_spacing, self.edge_spacing, outer_x, self.edge_spacing + self.depth),
+                (self.edge_spacing, self.edge_spacing, self.edge_spacing + self.depth, outer_y)]
+
+    def fill_raster(self, raster, value, scale: float):
+        for side in [self.top_points, self.right_points, self.bottom_points, self.left_points]:
+            fill_polygon(raster, side, value, scale)
@@ -19,6 +19,20 @@ class ColorObstacle:
         :return: True if collision detected.
         """
 
+    def get_bounding_boxes(self) -> list:
+        """
+        Get the rectangles covering this obstacle, used to find the obstacles near a point.
+        :return: a list of tuples with the minimum x, minimum y, maximum x and maximum y in millimeters.
+        """
+
+    def fill_raster(self, raster, value, scale: float):
+        """
+        Set the cells of the given raster which lie inside this obstacle.
+        :param raster: NumPy array with a cell per millimeter, indexed by row (y) and column (x).
+        :param value: to give the cells inside this obstacle.
+        :param scale: pixels per millimeter the points of this obstacle were created with.
+        """
+
     def get_color_code(self):
         """
         Returns the saved color code
@@ -22,7 +22,7 @@ class Edge(BorderObstacle):
         """
         Creates the shape of the edge.
         """
-        self._calc_points(scale)
+        self.create_points(scale)
 
     @staticmethod
     def get_shapes():
@@ -2,11 +2,8 @@
 Module containing the class Hole, used to detect robots driving into lakes.
 """
 
-
-import arcade
-from arcade import PointList
-
-from ev3dev2simulator.util.util import get_circle_points
+from ev3dev2simulator.util.raster import fill_polygon
+from ev3dev2simulator.util.util import PointList, get_circle_points, is_point_in_polygon
 
 
 class Hole:
@@ -25,9 +22,9 @@ class Hole:
         # visualisation
         self.points = None
 
-    def create_shape(self, scale):
+    def create_points(self, scale):
         """
-        Creates the shape of the hole.
+        Creates the points of the hole.
         """
         self.points = self._create_points(scale)
 
@@ -49,4 +46,20 @@ class Hole:
         :return: True if collision detected.
         """
 
-        return arcade.is_point_in_polygon(x, y, self.points)
+        return is_point_in_polygon(x, y, self.points)
+
+    def get_bounding_boxes(self) -> list:
+        """
+        Get the rectangle covering this hole, used to find the obstacles near a point.
+        :return: a list with a tuple of the minimum x, minimum y, maximum x and maximum y in millimeters.
+        """
+        return [(self.x - self.radius, self.y - self.radius, self.x + self.radius, self.y + self.radius)]
+
+    def fill_raster(self, raster, value, scale: float):
+        """
+        Set the cells of the given raster which lie inside this hole.
+        :param raster: NumPy array with a cell per millimeter, indexed by row (y) and column (x).
+        :param value: to give the cells inside this hole.
+        :param scale: pixels per millimeter the points of this hole were created with.
+        """
+        fill_polygon(raster, self.points, value, scale)
@@ -2,13 +2,11 @@
 Module lake containing the class Lake, an obstacle on the playground.
 """
 
-import arcade
-from arcade import Shape, PointList, create_line_strip, create_ellipse_filled
-
 from ev3dev2simulator.obstacle.color_obstacle import ColorObstacle
 from ev3dev2simulator.obstacle.hole import Hole
 from ev3dev2simulator.util.point import Point
-from ev3dev2simulator.util.util import get_circle_points, distance_between_points, to_color_code
+from ev3dev2simulator.util.raster import fill_circle
+from ev3dev2simulator.util.util import Color, PointList, get_circle_points, distance_between_points, to_color_code
 
 
 class Lake(ColorObstacle):
@@ -21,7 +19,7 @@ class Lake(ColorObstacle):
                  pos: Point,
                  outer_radius: float,
                  inner_radius: float,
-                 color: arcade.Color,
+                 color: Color,
                  border_width: int,
                  has_hole: bool):
         super(Lake, self).__init__(to_color_code(color))
@@ -49,16 +47,22 @@ class Lake(ColorObstacle):
         """
         return [self.shape]
 
-    def create_shape(self, scale):
+    def create_points(self, scale):
         """
-        Creates the shape of lake.
+        Creates the position of the lake and the points of its hole, used for collision detection.
         """
         self.scale = scale
         self.center_x = self.x * scale
         self.center_y = self.y * scale
-        self.shape = self._create_shape(scale)
         if self.hole is not None:
-            self.hole.create_shape(scale)
+            self.hole.create_points(scale)
+
+    def create_shape(self, scale):
+        """
+        Creates the shape of lake.
+        """
+        self.create_points(scale)
+        self.shape = self._create_shape(scale)
 
     @classmethod
     def from_config(cls, config):
@@ -86,11 +90,15 @@ class Lake(ColorObstacle):
                                  self.center_y,
                                  self.outer_radius * scale)
 
-    def _create_shape(self, scale) -> Shape:
+    def _create_shape(self, scale):
         """
         Create a shape representing this lake.
         :return: a Arcade shape object.
         """
+        # pylint: disable=import-outside-toplevel
+        from arcade import create_line_strip, create_ellipse_filled
+        # pylint: enable=import-outside-toplevel
+
         if self.hole is not None:
             points = self._create_points(scale)
             return create_line_strip(points,
@@ -114,3 +122,14 @@ class Lake(ColorObstacle):
             return (self.inner_radius * self.scale) < distance <\
                    ((self.outer_radius + (self.border_width/2)) * self.scale)
         return distance < (self.outer_radius * self.scale)
+
+    def get_bounding_boxes(self) -> list:
+        radius = self.outer_radius + (self.border_width/2) if self.hole is not None else self.outer_radius
+        return [(self.x - radius, self.y - radius, self.x + radius, self.y + radius)]
+
+    def fill_raster(self, raster, value, scale: float):
+        if self.hole is not None:
+            fill_circle(raster, self.center_x, self.center_y, (self.outer_radius + (self.border_width/2)) * scale,
+                        value, scale, inner_radius=self.inner_radius * scale)
+        else:
+            fill_circle(raster, self.center_x, self.center_y, self.outer_radius * scale, value, scale)
@@ -4,13 +4,12 @@ The rock module contains the class Rock, an obstacle on the playground.
 
 import math
 
-import arcade as _arcade
 import pymunk
-from arcade import Sprite
 
 from ev3dev2simulator.obstacle.movable_object import MovableObject
 from ev3dev2simulator.util.dimensions import Dimensions
 from ev3dev2simulator.util.point import Point
+from ev3dev2simulator.util.util import Color
 
 
 class Rock(MovableObject):
@@ -20,7 +19,7 @@ class Rock(MovableObject):
     def __init__(self,
                  pos: Point,
                  dims: Dimensions,
-                 color: _arcade.Color,
+                 color: Color,
                  angle: int,
                  movable: bool):
         super().__init__(pos, angle, color)
@@ -63,6 +62,10 @@ class Rock(MovableObject):
         """
         Create the sprite of the rock based on the scale.
         """
+        # pylint: disable=import-outside-toplevel
+        from arcade import Sprite
+        # pylint: enable=import-outside-toplevel
+
         pos_x, pos_y = self.get_pos()
         self.sprite = Sprite('assets/images/brick.png', scale=scale * (self.width / 892),
                              center_x=pos_x * scale, center_y=pos_y * scale)
@@ -6,7 +6,6 @@ import pymunk
 
 from ev3dev2simulator.util.dimensions import Dimensions
 from ev3dev2simulator.util.point import Point
-from ev3dev2simulator.visualisation.robot_part_sprite import RobotPartSprite
 
 # Default friction used for sprites, unless otherwise specified
 DEFAULT_FRICTION = 0.2
@@ -34,6 +33,12 @@ class BodyPart:
         self.y_offset = float(config['y_offset']) + offset.y
 
         self.sensible_obstacles = []
+        self.color_map = None
+
+        # world position of the center of this part, in pixels, and its orientation in degrees
+        self.center_x = 0.0
+        self.center_y = 0.0
+        self.angle = 0.0
 
         self.sprite = None
         self.shape = None
@@ -45,6 +50,13 @@ class BodyPart:
         """
         self.sensible_obstacles = obstacles
 
+    def set_color_map(self, color_map):
+        """
+        Set the raster of the static obstacles, used instead of checking every sensible obstacle.
+        :param color_map: of the world.
+        """
+        self.color_map = color_map
+
     def get_default_value(self):
         """
         Get the default value which the sensor would return without
@@ -70,11 +82,34 @@ class BodyPart:
         self.shape.friction = DEFAULT_FRICTION
         self.shape.mass = DEFAULT_MASS
 
+    def set_pose(self, center_x: float, center_y: float, angle: float):
+        """
+        Set the world position and orientation of this body part and move its sprite along, if it has one.
+        :param center_x: x coordinate of the center of this part.
+        :param center_y: y coordinate of the center of this part.
+        :param angle: orientation of this part in degrees.
+        """
+        self.center_x = center_x
+        self.center_y = center_y
+        self.angle = angle
+
+        if self.sprite is not None:
+            self.sprite.center_x = center_x
+            self.sprite.center_y = center_y
+            self.sprite.angle = angle
+
     def init_sprite_with_list(self, src_list, scale, start_sprite=0):
         """
         Initializes the sprite with a list of textures and the start texture.
         """
+        # pylint: disable=import-outside-toplevel
+        from ev3dev2simulator.visualisation.robot_part_sprite import RobotPartSprite
+        # pylint: enable=import-outside-toplevel
+
         self.sprite = RobotPartSprite(src_list, start_sprite, self.width_mm, scale=scale)
+        self.sprite.center_x = self.center_x
+        self.sprite.center_y = self.center_y
+        self.sprite.angle = self.angle
 
     def init_sprite(self, src, scale):
         """
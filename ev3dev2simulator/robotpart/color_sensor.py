@@ -46,9 +46,12 @@ class ColorSensor(BodyPart):
         Get the color this ColorSensor is currently 'seeing'.
         :return: integer value representing the color.
         """
+        if self.color_map is not None:
+            color = self.color_map.get_color(self.center_x, self.center_y)
+            return self.get_default_value() if color is None else color
 
         for obstacle in self.sensible_obstacles:
-            if obstacle.collided_with(self.sprite.center_x, self.sprite.center_y):
+            if obstacle.collided_with(self.center_x, self.center_y):
                 return obstacle.color_code
 
         return self.get_default_value()
@@ -67,4 +70,5 @@ class ColorSensor(BodyPart):
         converted = COLORS[color]
         if self.old_texture_index != converted:
             self.old_texture_index = converted
-            self.sprite.set_texture(converted)
+            if self.sprite is not None:
+                self.sprite.set_texture(converted)
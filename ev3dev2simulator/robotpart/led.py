@@ -36,4 +36,5 @@ class Led(BodyPart):
         """
         if self.old_texture_index != color:
             self.old_texture_index = color
-            self.sprite.set_texture(color)
+            if self.sprite is not None:
+                self.sprite.set_texture(color)
@@ -8,6 +8,9 @@ from ev3dev2simulator.config.config import get_simulation_settings
 from ev3dev2simulator.robotpart.body_part import BodyPart
 from ev3dev2simulator.util.dimensions import Dimensions
 
+# Distance in millimeters between the sensor and the ground below it
+GROUND_DISTANCE = 20
+
 
 class UltrasonicSensorBottom(BodyPart):
     """
@@ -34,10 +37,14 @@ class UltrasonicSensorBottom(BodyPart):
         Get the distance in pixels between this ultrasonic sensor and an the ground.
         :return: a floating point value representing the distance.
         """
+        if self.color_map is not None:
+            return self.get_default_value() if self.color_map.is_falling(self.center_x, self.center_y) \
+                else GROUND_DISTANCE
+
         for obstacle in self.sensible_obstacles:
-            if obstacle.collided_with(self.sprite.center_x, self.sprite.center_y):
+            if obstacle.collided_with(self.center_x, self.center_y):
                 return self.get_default_value()
-        return 20
+        return GROUND_DISTANCE
 
     def get_default_value(self):
         """
@@ -5,10 +5,8 @@ It represents an ultrasonic sensor on top of a robot that aims in front of the r
 
 
 import math
-from typing import Optional
+from typing import Optional, Tuple
 
-from arcade import Point, create_line
-from arcade.color import RED
 from pymunk import Space
 
 from ev3dev2simulator.config.config import get_simulation_settings, DEBUG
@@ -16,6 +14,12 @@ from ev3dev2simulator.robotpart.body_part import BodyPart
 from ev3dev2simulator.util.dimensions import Dimensions
 from ev3dev2simulator.util.util import distance_between_points
 
+# Max distance in millimeters the real ultrasonic sensor measures
+MAX_DISTANCE = 2550
+
+# Distance in millimeters between the center of the sensor and each of its eyes
+EYE_OFFSET = 25
+
 
 class UltrasonicSensor(BodyPart):
     """
@@ -39,7 +43,7 @@ class UltrasonicSensor(BodyPart):
 
     def distance(self, space: Space) -> float:
         """
-        Get the distance in pixels between this ultrasonic sensors eyes and an object it is pointed to. First check
+        Get the distance in millimeters between this ultrasonic sensors eyes and an object it is pointed to. First check
         the left eye, if this does not see anything check the right eye. If this sensor is not pointing towards an
         object return 2550, which is the max distance of the real robots ultrasonic sensor. :param space: which
         holds the visible objects. :return: a floating point value representing the distance.
@@ -47,17 +51,17 @@ class UltrasonicSensor(BodyPart):
 
         distances = []
 
-        left_eye_x, left_eye_y = self._calc_eye_center(self.sprite.angle + 90)
+        left_eye_x, left_eye_y = self._calc_eye_center(self.angle + 90)
         distance = self._calc_view_distance(space, left_eye_x, left_eye_y)
 
         if distance:
-            distances.append(distance * (1 / self.robot.scale))
+            distances.append(distance)
 
-        right_eye_x, right_eye_y = self._calc_eye_center(self.sprite.angle - 90)
+        right_eye_x, right_eye_y = self._calc_eye_center(self.angle - 90)
         distance = self._calc_view_distance(space, right_eye_x, right_eye_y)
 
         if distance:
-            distances.append(distance * (1 / self.robot.scale))
+            distances.append(distance)
 
         if len(distances) > 0:
             return min(distances)
@@ -66,8 +70,8 @@ class UltrasonicSensor(BodyPart):
 
     def _calc_view_distance(self, space: Space, base_x: float, base_y: float) -> Optional[float]:
         """
-        Calculate the distance between the base point, represented by base_x and base_y, and the furthest
-        viewable object. If no object is in sight, return None.
+        Calculate the distance in millimeters between the base point, represented by base_x and base_y, and the
+        nearest viewable object. If no object is in sight, return None.
         :param space: which holds the visible objects.
         :param base_x: x coordinate of the base point.
         :param base_y: y coordinate of the base point.
@@ -75,43 +79,48 @@ class UltrasonicSensor(BodyPart):
         """
         x, y = self._calc_ray_cast_point(base_x, base_y)
         if DEBUG:
+            # pylint: disable=import-outside-toplevel
+            from arcade import create_line
+            from arcade.color import RED
+            # pylint: enable=import-outside-toplevel
             line = create_line(x, y, base_x, base_y, RED, 5)
             self.robot.debug_shapes.append(line)
         query = space.segment_query_first((base_x, base_y), (x, y), 1, self.shape.filter)
         if query:
-            return -self.sensor_half_height + distance_between_points(base_x, base_y, query.point.x, query.point.y)
+            distance = distance_between_points(base_x, base_y, query.point.x, query.point.y) / self.robot.scale
+            return distance - self.sensor_half_height
         return None
 
-    def _calc_ray_cast_point(self, from_x: float, from_y: float) -> Point:
+    def _calc_ray_cast_point(self, from_x: float, from_y: float) -> Tuple[float, float]:
         """
-        Calculate the coordinates of the point to perform a ray-cast towards
-        which covers the entire playing field of the simulator.
+        Calculate the coordinates of the point to perform a ray-cast towards,
+        which lies as far in front of the sensor as the max distance it measures.
         :return: a Point object representing the coordinates of the ray-cast point.
         """
-        rad = math.radians(self.sprite.angle)
+        rad = math.radians(self.angle)
+        length = (MAX_DISTANCE + self.sensor_half_height) * self.robot.scale
 
-        x = 1000 * math.sin(-rad) + from_x
-        y = 1000 * math.cos(-rad) + from_y
+        x = length * math.sin(-rad) + from_x
+        y = length * math.cos(-rad) + from_y
 
         return x, y
 
-    def _calc_eye_center(self, angle: float) -> Point:
+    def _calc_eye_center(self, angle: float) -> Tuple[float, float]:
         """
         Calculate the center point of a location at the given angle relative to this objects center.
         :param angle: at which the new point is relative to this objects center.
         :return: a Point object representing the coordinates of the new location.
         """
         rad = math.radians(angle)
-        eye_offset = 18
-        x = eye_offset * math.sin(-rad) + self.sprite.center_x
-        y = eye_offset * math.cos(-rad) + self.sprite.center_y
+        eye_offset = EYE_OFFSET * self.robot.scale
+        x = eye_offset * math.sin(-rad) + self.center_x
+        y = eye_offset * math.cos(-rad) + self.center_y
 
         return x, y
 
     def get_default_value(self):
         """
-        1 pixel == 1mm so measurement values this sensor returns are one to one mappable to millimeters.
         Max distance real world robot ultrasonic sensor returns is 2550mm.
-        :return: default value in pixels.
+        :return: default value in millimeters.
         """
-        return 2550
+        return MAX_DISTANCE
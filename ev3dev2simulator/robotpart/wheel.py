@@ -26,8 +26,11 @@ class Wheel(BodyPart):
         Check if this Wheel is 'falling' of the playing field.
         :return: boolean value representing the outcome.
         """
+        if self.color_map is not None:
+            return self.color_map.is_falling(self.center_x, self.center_y)
+
         for obstacle in self.sensible_obstacles:
-            if obstacle.collided_with(self.sprite.center_x, self.sprite.center_y):
+            if obstacle.collided_with(self.center_x, self.center_y):
                 return True
 
         return self.get_default_value()
@@ -1,6 +1,9 @@
 """
 Main module of the ev3dev2simulator. Starts the server thread listening for incoming connections and
 starts the simulator itself. The simulator and server threads are started based on the arguments given.
+With --headless the simulation runs without a window, so arcade and pyglet are never imported.
+With --lockstep a headless simulation only advances when all connected clients are done with the current frame.
+Only lock-step runs are reproducible, with --speed the simulation runs on without waiting for the clients.
 """
 
 import argparse
@@ -8,8 +11,8 @@ import sys
 import os
 
 from ev3dev2simulator.config.config import load_config, get_world_config
-from ev3dev2simulator.visualisation.visualiser import Visualiser
 from ev3dev2simulator.connection.server_sockets import ServerSockets
+from ev3dev2simulator.state.headless_runner import HeadlessRunner
 from ev3dev2simulator.state.world_simulator import WorldSimulator
 from ev3dev2simulator.state.world_state import WorldState
 from ev3dev2simulator import version as sim_version
@@ -40,6 +43,23 @@ def parse_args(args):
     parser.add_argument("-m", "--maximized",
                         action='store_true',
                         help="Show simulator maximized")
+    parser.add_argument("--headless",
+                        action='store_true',
+                        help="Run the simulation without a window, for machines without a display")
+    parser.add_argument("--speed",
+                        default=1.0,
+                        help="Speed of a headless simulation compared to real time. 0 runs as fast as possible. "
+                             "The simulation does not wait for the program, use --lockstep for reproducible runs",
+                        required=False,
+                        type=float)
+    parser.add_argument("--lockstep",
+                        action='store_true',
+                        help="Run a headless simulation in lock-step with the connected clients, for deterministic "
+                             "runs. Implies --headless")
+    parser.add_argument("--allow-multiple",
+                        action='store_true',
+                        help="Open a window even if another simulator window is open, instead of bringing that one "
+                             "to the front")
     return parser.parse_args(args)
 
 
@@ -64,8 +84,22 @@ def main(orig_path):
 
     world_simulator = WorldSimulator(world_state)
 
+    if args['headless'] or args['lockstep']:
+        runner = HeadlessRunner(world_simulator, args['speed'], args['lockstep'])
+
+        server_thread = ServerSockets(world_simulator)
+        server_thread.setDaemon(True)
+        server_thread.start()
+
+        runner.run()
+        return
+
+    # pylint: disable=import-outside-toplevel
+    from ev3dev2simulator.visualisation.visualiser import Visualiser
+    # pylint: enable=import-outside-toplevel
+
     visualiser = Visualiser(world_simulator.update, world_state, show_fullscreen, show_maximized,
-                            use_second_screen_to_show_simulator)
+                            use_second_screen_to_show_simulator, allow_multiple=args['allow_multiple'])
 
     server_thread = ServerSockets(world_simulator)
     server_thread.setDaemon(True)
@@ -0,0 +1,127 @@
+"""
+The actuator_timeline module contains the class ActuatorTimeline and the segments it is made of.
+A segment describes what an actuator does during a range of frames, so a command takes the same amount of
+memory and work regardless of how long it runs.
+"""
+
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any
+
+
+class Segment(ABC):
+    """
+    Base class of all segments. A segment lasts a number of frames and can be evaluated for any of them.
+    The timeline the segment is added to decides at which frame it starts.
+    """
+
+    def __init__(self, frames: int):
+        self.frames = frames
+        self.start_frame = 0
+
+    @property
+    def end_frame(self) -> int:
+        """
+        The first frame after this segment.
+        """
+        return self.start_frame + self.frames
+
+    @abstractmethod
+    def value_at(self, frame: int) -> Any:
+        """
+        Evaluate the segment for the given frame.
+        :param frame: between the start and end frame of this segment.
+        :return: the job of the actuator during the given frame.
+        """
+
+
+class ConstantVelocitySegment(Segment):
+    """
+    Segment of a motor moving the same distance (or number of degrees) every frame.
+    """
+
+    def __init__(self, frames: int, distance_per_frame: float):
+        super().__init__(frames)
+        self.distance_per_frame = distance_per_frame
+
+    def value_at(self, frame: int) -> float:
+        return self.distance_per_frame
+
+
+class CoastSegment(Segment):
+    """
+    Segment of a motor coasting to a halt. The speed decreases linearly, starting one step below the given speed.
+    """
+
+    def __init__(self, frames: int, distance_per_frame: float, coasting_sub: float):
+        super().__init__(frames)
+        self.distance_per_frame = distance_per_frame
+        self.coasting_sub = coasting_sub
+
+    def value_at(self, frame: int) -> float:
+        subtraction = (frame - self.start_frame + 1) * self.coasting_sub
+        if self.distance_per_frame > 0:
+            return max(self.distance_per_frame - subtraction, 0)
+        return min(self.distance_per_frame + subtraction, 0)
+
+
+class MessageSegment(Segment):
+    """
+    Segment of a speaker showing the same message every frame.
+    """
+
+    def __init__(self, frames: int, message: str):
+        super().__init__(frames)
+        self.message = message
+
+    def value_at(self, frame: int) -> str:
+        return self.message
+
+
+class ActuatorTimeline:
+    """
+    Ordered segments of a single actuator. Every call to next_job evaluates the timeline for one frame.
+    Segments are played one after another, a new segment starts when the previous one has ended.
+    """
+
+    def __init__(self):
+        self.segments = deque()
+        self.frame = 0
+        self.end_frame = 0
+
+    def add(self, segment: Segment):
+        """
+        Add the given segment at the end of this timeline.
+        :param segment: to add.
+        """
+        segment.start_frame = max(self.frame, self.end_frame)
+        self.end_frame = segment.end_frame
+        self.segments.append(segment)
+
+    def clear(self):
+        """
+        Remove all segments that have not ended yet.
+        """
+        self.segments.clear()
+        self.end_frame = self.frame
+
+    def is_idle(self) -> bool:
+        """
+        Check if all segments of this timeline have been played.
+        """
+        return self.end_frame <= self.frame
+
+    def next_job(self) -> Any:
+        """
+        Evaluate the timeline for the next frame.
+        :return: the job of the actuator or None if it has nothing to do.
+        """
+        while self.segments and self.segments[0].end_frame <= self.frame:
+            self.segments.popleft()
+
+        job = None
+        if self.segments and self.segments[0].start_frame <= self.frame:
+            job = self.segments[0].value_at(self.frame)
+
+        self.frame += 1
+        return job
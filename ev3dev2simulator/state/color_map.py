@@ -0,0 +1,121 @@
+"""
+The color_map module contains the class ColorMap, a raster of the static obstacles robots sense below them.
+"""
+
+import math
+from typing import Optional
+
+import numpy as np
+
+from ev3dev2simulator.state.obstacle_grid import ObstacleGrid
+
+# Value of the cells which are not covered by a color obstacle
+NO_COLOR = -1
+
+
+class ColorMap:
+    """
+    Raster of the board with a cell per millimeter, containing the color code of the color obstacle covering each
+    cell and whether a robot falls when driving onto the cell. The obstacles are drawn into the raster once,
+    so looking up a point is a single array index instead of checking every obstacle.
+    Points outside of the board are checked against the obstacles near them.
+    """
+
+    def __init__(self, width: int, height: int, scale: float, color_grid: ObstacleGrid, falling_grid: ObstacleGrid):
+        self.scale = scale
+        self.color_grid = color_grid
+        self.falling_grid = falling_grid
+
+        shape = (math.ceil(height), math.ceil(width))
+        self.colors = np.full(shape, NO_COLOR, dtype=np.int8)
+        for obstacle in reversed(color_grid.obstacles):  # the first obstacle sensed wins, so it is drawn last
+            obstacle.fill_raster(self.colors, obstacle.color_code, scale)
+
+        self.falling = np.zeros(shape, dtype=bool)
+        for obstacle in falling_grid.obstacles:
+            obstacle.fill_raster(self.falling, True, scale)
+
+    def get_color(self, x: float, y: float) -> Optional[int]:
+        """
+        Get the color code of the color obstacle at the given point.
+        :param x: coordinate of the point in pixels.
+        :param y: coordinate of the point in pixels.
+        :return: the color code, or None if there is no color obstacle at the point.
+        """
+        cell = self._get_cell(x, y)
+        if cell is None:
+            for obstacle in self.color_grid.get_candidates(x / self.scale, y / self.scale):
+                if obstacle.collided_with(x, y):
+                    return obstacle.color_code
+            return None
+
+        color = self.colors.item(cell)
+        return None if color == NO_COLOR else color
+
+    def is_falling(self, x: float, y: float) -> bool:
+        """
+        Check if a robot falls at the given point, because it lies in a hole or over the edge of the board.
+        :param x: coordinate of the point in pixels.
+        :param y: coordinate of the point in pixels.
+        :return: True if the point lies inside a falling obstacle.
+        """
+        cell = self._get_cell(x, y)
+        if cell is None:
+            return any(obstacle.collided_with(x, y)
+                       for obstacle in self.falling_grid.get_candidates(x / self.scale, y / self.scale))
+        return self.falling.item(cell)
+
+    def get_colors(self, x_values: np.ndarray, y_values: np.ndarray) -> np.ndarray:
+        """
+        Get the color codes of the color obstacles at the given points.
+        :param x_values: x coordinates of the points in pixels.
+        :param y_values: y coordinates of the points in pixels.
+        :return: an array with the color code per point, NO_COLOR where there is no color obstacle.
+        """
+        rows, columns, inside = self._get_cells(x_values, y_values)
+        colors = np.full(len(x_values), NO_COLOR, dtype=self.colors.dtype)
+        colors[inside] = self.colors[rows[inside], columns[inside]]
+        for index in np.flatnonzero(~inside):
+            color = self.get_color(x_values[index], y_values[index])
+            colors[index] = NO_COLOR if color is None else color
+        return colors
+
+    def are_falling(self, x_values: np.ndarray, y_values: np.ndarray) -> np.ndarray:
+        """
+        Check for each of the given points if a robot falls there.
+        :param x_values: x coordinates of the points in pixels.
+        :param y_values: y coordinates of the points in pixels.
+        :return: an array with True for the points inside a falling obstacle.
+        """
+        rows, columns, inside = self._get_cells(x_values, y_values)
+        falling = np.zeros(len(x_values), dtype=bool)
+        falling[inside] = self.falling[rows[inside], columns[inside]]
+        for index in np.flatnonzero(~inside):
+            falling[index] = self.is_falling(x_values[index], y_values[index])
+        return falling
+
+    def _get_cells(self, x_values: np.ndarray, y_values: np.ndarray) -> (np.ndarray, np.ndarray, np.ndarray):
+        """
+        Get the indices of the cells containing the given points.
+        :param x_values: x coordinates of the points in pixels.
+        :param y_values: y coordinates of the points in pixels.
+        :return: a tuple with the rows, the columns and whether each point lies inside the raster.
+        """
+        rows = np.floor(y_values / self.scale).astype(int)
+        columns = np.floor(x_values / self.scale).astype(int)
+        height, width = self.colors.shape
+        return rows, columns, (rows >= 0) & (rows < height) & (columns >= 0) & (columns < width)
+
+    def _get_cell(self, x: float, y: float) -> Optional[tuple]:
+        """
+        Get the index of the cell containing the given point.
+        :param x: coordinate of the point in pixels.
+        :param y: coordinate of the point in pixels.
+        :return: the row and column of the cell, or None if the point is outside of the raster.
+        """
+        row = math.floor(y / self.scale)
+        column = math.floor(x / self.scale)
+        height, width = self.colors.shape
+        if 0 <= row < height and 0 <= column < width:
+            return row, column
+        return None
@@ -0,0 +1,108 @@
+"""
+The headless_runner module contains the class HeadlessRunner, which drives the simulation without a window.
+It is the counterpart of the Visualiser for machines without a display, such as CI runners and grading farms.
+"""
+
+import time
+
+from ev3dev2simulator.config.config import get_simulation_settings
+from ev3dev2simulator.state.world_simulator import WorldSimulator
+from ev3dev2simulator.state.world_state import WORLD_SCALE
+
+# Time in seconds after which a lock-step simulation without active clients checks if it should stop or reset.
+LOCK_STEP_POLL_INTERVAL = 0.1
+
+# Number of frames a paced simulation catches up on after it fell behind, before it gives up and slows down.
+MAX_FRAMES_BEHIND = 5
+
+
+class HeadlessRunner:
+    """
+    Steps the world simulation at the configured frame rate, multiplied by the given speed.
+    A speed of 0 steps the simulation as fast as possible. No arcade or pyglet modules are loaded.
+    Every frame simulates the same amount of time. Frames which could not be simulated in time are caught up on,
+    so a short hiccup of the machine does not slow down the simulated time.
+
+    In lock-step mode the speed is ignored. A frame is simulated as soon as all connected clients are done with
+    the previous one, so the outcome of a run does not depend on the load of the machine.
+    """
+
+    def __init__(self, world_simulator: WorldSimulator, speed: float = 1.0, lock_step: bool = False):
+        self.world_simulator = world_simulator
+        self.world_state = world_simulator.world_state
+        self.world_simulator.clock.speed = speed
+        self.world_simulator.clock.lock_step = lock_step
+        self.lock_step = lock_step
+        if speed > 0:
+            self.frame_time = 1.0 / (float(get_simulation_settings()['exec_settings']['frames_per_second']) * speed)
+        else:
+            self.frame_time = 0
+        self.falling_robots = set()
+        self.is_running = False
+
+        # nobody looks at sensors which are not read by a program, so they are only evaluated when needed
+        for robot_sim in self.world_simulator.robot_simulators:
+            robot_sim.evaluate_all_sensors = False
+
+        self.world_state.setup_pymunk_shapes(WORLD_SCALE)
+
+    def run(self):
+        """
+        Run the simulation until stop is called or the process is interrupted.
+        """
+        self.is_running = True
+
+        try:
+            if self.lock_step:
+                self._run_lock_step()
+            else:
+                self._run_paced()
+        except KeyboardInterrupt:
+            self.is_running = False
+
+    def _run_paced(self):
+        """
+        Simulate frames at the configured speed.
+        """
+        next_frame = time.perf_counter()
+
+        while self.is_running:
+            self.step()
+
+            next_frame += self.frame_time
+            delay = next_frame - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif -delay > MAX_FRAMES_BEHIND * self.frame_time:
+                # the simulation is running too far behind, do not try to catch up on all missed frames
+                next_frame = time.perf_counter()
+
+    def _run_lock_step(self):
+        """
+        Simulate a frame each time all connected clients are done with the current one.
+        A requested reset is done right away, so the next run starts from the same state as the first.
+        """
+        while self.is_running:
+            if self.world_simulator.should_reset or self.world_simulator.clock.wait_for_step(LOCK_STEP_POLL_INTERVAL):
+                self.step()
+
+    def step(self):
+        """
+        Simulate a single frame and report robots that started falling of the playing field.
+        """
+        self.world_simulator.update()
+
+        falling = self.world_simulator.sensor_batch.get_falling_robots(self.world_state.color_map)
+        for robot in self.world_state.get_robots():
+            if robot in falling:
+                if robot.name not in self.falling_robots:
+                    self.falling_robots.add(robot.name)
+                    print(f'{robot.name}: ' + get_simulation_settings()['screen_settings']['falling_message'])
+            else:
+                self.falling_robots.discard(robot.name)
+
+    def stop(self):
+        """
+        Stop the simulation loop after the current frame.
+        """
+        self.is_running = False
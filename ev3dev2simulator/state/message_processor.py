@@ -4,14 +4,20 @@ This class takes the commands given and converts them into jobs the robot simula
 """
 
 
-from typing import Any, Tuple
+from typing import Any, Dict, List, Tuple
 # noinspection PyProtectedMember
 from ev3dev2._platform.ev3 import LEDS
 from ev3dev2simulator.config.config import get_simulation_settings
 from ev3dev2simulator.connection.message.config_request import ConfigRequest
+from ev3dev2simulator.state.actuator_timeline import Segment, ConstantVelocitySegment, CoastSegment, MessageSegment
 from ev3dev2simulator.state.motor_command_processor import MotorCommandProcessor
 from ev3dev2simulator.connection.message import rotate_command, stop_command, sound_command, data_request, led_command
+from ev3dev2simulator.connection.message import sleep_request, subscribe_request, motor_state_request
+from ev3dev2simulator.connection.message import multi_rotate_command, watch_request, bulk_data_request
+from ev3dev2simulator.connection.message.rotate_command import RotateCommand
+from ev3dev2simulator.connection.message.subscribe_request import POSITION_SUFFIX, SPEED_SUFFIX
 from ev3dev2simulator.state import robot_simulator
+from ev3dev2simulator.state.simulation_clock import PendingResult
 
 LED_COLORS = dict()
 LED_COLORS[(1, 1)] = 0  # Amber
@@ -41,26 +47,39 @@ class MessageProcessor:
         self.command_processor = MotorCommandProcessor()
         self.led_cache = {k: None for k in LEDS.values()}
 
+        # replaced instead of changed, because the simulation thread iterates over it to collect the updates
+        self.subscriptions = frozenset()
+        self.sent_values = {}
+        self.watched_sensors = set()
+
     def process_rotate_command(self, command: rotate_command) -> float:
         """
-        Process the given RotateCommand by creating the appropriate motor jobs in the RobotState.
+        Process the given RotateCommand by replacing the jobs of the motor with a constant velocity segment,
+        followed by a coast segment when the motor coasts to a halt.
         The type of jobs created  depends on the motor called.
         The command for the arm motor is processed for degrees, while the other motors are processed for distance.
         :param command: to process.
         :return: a floating point value representing the time in seconds the given command will take to execute.
         """
 
+        full_address, segments, run_time = self._rotate_segments(command)
+        self.robot_sim.set_actuator_segments(full_address, segments)
+        return run_time
+
+    def _rotate_segments(self, command: rotate_command) -> Tuple[Tuple[int, str], List[Segment], float]:
+        """
+        Create the segments of the motor of the given RotateCommand.
+        :param command: to process.
+        :return: a Tuple with the full address of the motor, its segments and the time in seconds they take.
+        """
+
         full_address = self._to_full_address(command.address)
         motor = self.robot_sim.robot.get_actuator(full_address)
         spf, frames, coast_frames, run_time = self._process_rotate_command_values(command, motor)
 
-        self.robot_sim.clear_actuator_jobs(full_address)
-
-        for _ in range(frames):
-            self.robot_sim.put_actuator_job(full_address, spf)
-
-        self._process_coast(coast_frames, spf, motor)
-        return run_time
+        segments = [ConstantVelocitySegment(frames, spf)]
+        segments.extend(self._coast_segments(coast_frames, spf, motor))
+        return full_address, segments, run_time
 
     def _process_rotate_command_values(self, command: rotate_command, motor: any) -> Tuple[float, int, int, float]:
         """
@@ -77,22 +96,51 @@ class MessageProcessor:
 
     def process_stop_command(self, command: stop_command) -> float:
         """
-        Process the given stop command by clearing the current motor job queue
-        and creating motor coast jobs in the RobotState. The type of jobs created
+        Process the given stop command by replacing the jobs of the motor
+        with a coast segment. The type of jobs created
         depends on the motor called. The command for the center motor is processed for degrees, while the other motors
         are processed for distance.
         :param command: to process.
         :return: a floating point value representing the time in seconds the given command will take to execute.
         """
 
+        full_address, segments, run_time = self._stop_segments(command)
+        self.robot_sim.set_actuator_segments(full_address, segments)
+        return run_time
+
+    def _stop_segments(self, command: stop_command) -> Tuple[Tuple[int, str], List[Segment], float]:
+        """
+        Create the segments of the motor of the given StopCommand.
+        :param command: to process.
+        :return: a Tuple with the full address of the motor, its segments and the time in seconds they take.
+        """
+
         full_address = self._to_full_address(command.address)
         motor = self.robot_sim.robot.get_actuator(full_address)
 
         spf, frames, run_time = self._process_stop_command_values(command, motor)
+        return full_address, self._coast_segments(frames, spf, motor), run_time
 
-        self.robot_sim.clear_actuator_jobs(full_address)
-        self._process_coast(frames, spf, motor)
-        return run_time
+    def process_multi_rotate_command(self, command: multi_rotate_command) -> List[float]:
+        """
+        Process the given MultiRotateCommand by replacing the jobs of all its motors at once,
+        so they start in the same frame.
+        :param command: to process.
+        :return: a list with the time in seconds each of the commands will take to execute.
+        """
+
+        timelines = {}
+        run_times = []
+        for motor_command in command.commands:
+            if isinstance(motor_command, RotateCommand):
+                full_address, segments, run_time = self._rotate_segments(motor_command)
+            else:
+                full_address, segments, run_time = self._stop_segments(motor_command)
+            timelines[full_address] = segments
+            run_times.append(run_time)
+
+        self.robot_sim.set_multiple_actuator_segments(timelines)
+        return run_times
 
     def _process_stop_command_values(self, command: stop_command, motor: any) -> Tuple[float, int, float]:
         """
@@ -107,23 +155,19 @@ class MessageProcessor:
             return -dpf, frames, run_time
         return self.command_processor.process_stop_command_distance(command)
 
-    def _process_coast(self, frames, ppf, motor):
+    def _coast_segments(self, frames: int, ppf: float, motor: any) -> List[Segment]:
         """
-        Process coasting by creating move jobs decreasing in speed in the RobotState.
+        Create the segment of a motor coasting to a halt.
         :param frames: to coast before coming to a halt.
         :param ppf: speed of motor when the coasting starts.
         :param motor: the motor in the RobotState.
+        :return: a list with the coast segment, empty if there is nothing to coast.
         """
 
+        if frames <= 0:
+            return []
         coasting_sub = self.degree_coasting_sub if motor.ev3type == 'arm' else self.distance_coasting_sub
-        og_ppf = ppf
-
-        for _ in range(frames):
-            if og_ppf > 0:
-                ppf = max(ppf - coasting_sub, 0)
-            else:
-                ppf = min(ppf + coasting_sub, 0)
-            self.robot_sim.put_actuator_job(self._to_full_address(motor.address), ppf)
+        return [CoastSegment(frames, ppf, coasting_sub)]
 
     def process_led_command(self, command: led_command):
         """
@@ -142,23 +186,59 @@ class MessageProcessor:
 
     def process_sound_command(self, command: sound_command):
         """
-        Process the given sound command by creating a sound job with a message which can be put on the simulator screen.
+        Process the given sound command by adding a message segment which can be put on the simulator screen.
         :param command: to process.
         """
         frames = int(round(self.frames_per_second * command.duration))
         msg_len = len(command.message)
         message = '\n'.join(command.message[i:i + 10] for i in range(0, msg_len, 10))
-        for i in range(frames):
-            self.robot_sim.put_actuator_job(self._to_full_address('speaker'), message)
+        self.robot_sim.put_actuator_segment(self._to_full_address('speaker'), MessageSegment(frames, message))
 
     def process_data_request(self, request: data_request) -> Any:
         """
-        Process the given data request by retrieving the requested value from the RobotState and returning this.
+        Process the given data request by retrieving the requested value from the RobotSimulator and returning this.
         :param request: to process.
-        :return: a dictionary containing the requested value.
+        :return: a dictionary with the requested value and its frame, or a PendingResult if it can only be read
+        after the next frame.
         """
         full_address = self._to_full_address(request.address)
-        return self.robot_sim.get_value(full_address)
+        return self.robot_sim.get_value(full_address, request.newer_than)
+
+    def process_bulk_data_request(self, request: bulk_data_request) -> Any:
+        """
+        Process the given bulk data request by retrieving the values of the requested sensors, all belonging to
+        the same frame, from the RobotSimulator.
+        :param request: to process.
+        :return: a dictionary with the values by address and the frame they belong to, or a PendingResult if they
+        can only be read after the next frame.
+        """
+        addresses = request.addresses
+        if addresses is None:
+            addresses = [address for brick, address in self.robot_sim.robot.sensors if brick == self.brick_id]
+
+        result = self.robot_sim.get_values([self._to_full_address(address) for address in addresses],
+                                           request.newer_than)
+        return self._to_brick_values(result)
+
+    def _to_brick_values(self, result: Any) -> Any:
+        """
+        Replace the full addresses of the values retrieved from the RobotSimulator by the addresses of this brick.
+        :param result: a dictionary with the values by full address and their frame, or a PendingResult of it.
+        """
+        if isinstance(result, PendingResult):
+            return result.then(self._to_brick_values)
+        return {'values': {address: value for (_, address), value in result['values'].items()},
+                'frame': result['frame']}
+
+    def process_motor_state_request(self, request: motor_state_request) -> Dict[str, dict]:
+        """
+        Process the given motor state request by retrieving the tacho counts and speeds from the RobotSimulator.
+        :param request: to process.
+        :return: a dictionary containing the position and speed per address of the requested motors.
+        """
+        return {address: self.robot_sim.get_motor_state((brick, address))
+                for brick, address in self.robot_sim.tacho_counts
+                if brick == self.brick_id and request.address in (None, address)}
 
     def process_config_request(self, request: ConfigRequest) -> Any:
         """
@@ -168,5 +248,100 @@ class MessageProcessor:
         """
         return self.robot_sim.determine_port(self.brick_id, request.kwargs, request.class_name)
 
+    def process_time_request(self) -> dict:
+        """
+        Process a time request by retrieving the simulated time from the clock of the simulation.
+        :return: a dictionary containing the simulated time and the speed of the simulation.
+        """
+        return self.robot_sim.clock.get_status()
+
+    def process_sleep_request(self, request: sleep_request) -> PendingResult:
+        """
+        Process the given sleep request by answering once the requested simulated time has passed.
+        The client is done with its work until then, which lets a simulation in lock-step continue.
+        :param request: to process.
+        :return: a PendingResult giving the status of the clock after sleeping.
+        """
+        clock = self.robot_sim.clock
+        return PendingResult(clock.frame + clock.frames_for(request.seconds), clock.get_status)
+
+    def process_subscribe_request(self, request: subscribe_request) -> dict:
+        """
+        Process the given subscribe request by remembering the subscribed sensors and motors, their changes are
+        collected after every frame by collect_sensor_updates. The value of a motor is the number of its commands
+        it finished, so it changes when the motor becomes idle. Its position and speed are pushed as well.
+        :param request: to process.
+        :return: a dictionary containing the current frame and the current values of the subscribed devices.
+        """
+        devices = list(self.robot_sim.robot.sensors) + list(self.robot_sim.actuator_idle)
+        addresses = [address for brick, address in devices
+                     if brick == self.brick_id and request.address in (None, address)]
+        self.subscriptions = self.subscriptions.union(addresses)
+        for address in addresses:
+            self._watch_sensor(address)
+
+        values = {}
+        for address in addresses:
+            values.update(self._get_subscribed_values(address))
+        self.sent_values.update(values)
+        return {'frame': self.robot_sim.clock.frame, 'values': values}
+
+    def process_watch_request(self, request: watch_request):
+        """
+        Process the given watch request by letting the robot simulator evaluate the sensor every frame,
+        because the client reads its value from the sensor snapshot.
+        :param request: to process.
+        """
+        self._watch_sensor(request.address)
+
+    def collect_sensor_updates(self) -> Dict[str, Any]:
+        """
+        Collect the values of the subscribed sensors and motors that changed since they were last collected.
+        Called by the simulation thread once the sensors of a frame have been processed.
+        :return: the changed values by address.
+        """
+        changes = {}
+        for address in self.subscriptions:
+            for key, value in self._get_subscribed_values(address).items():
+                if value != self.sent_values.get(key):
+                    self.sent_values[key] = value
+                    changes[key] = value
+        return changes
+
+    def clear_subscriptions(self):
+        """
+        Forget all subscriptions and watched sensors, for example because the client disconnected.
+        """
+        self.subscriptions = frozenset()
+        self.sent_values = {}
+        for address in self.watched_sensors:
+            self.robot_sim.unwatch_sensor(self._to_full_address(address))
+        self.watched_sensors = set()
+
+    def _watch_sensor(self, address: str):
+        """
+        Let the robot simulator evaluate the given sensor every frame, until the subscriptions are cleared.
+        :param address: of the sensor, motors are ignored.
+        """
+        full_address = self._to_full_address(address)
+        if address not in self.watched_sensors and full_address in self.robot_sim.robot.sensors:
+            self.watched_sensors.add(address)
+            self.robot_sim.watch_sensor(full_address)
+
+    def _get_subscribed_values(self, address: str) -> Dict[str, Any]:
+        """
+        Get the value of a subscribed sensor, or the number of finished commands, the position and the speed of a
+        subscribed motor.
+        :param address: of the sensor or motor.
+        :return: the values by the key they are pushed under.
+        """
+        full_address = self._to_full_address(address)
+        if full_address in self.robot_sim.actuator_idle:
+            state = self.robot_sim.get_motor_state(full_address)
+            return {address: self.robot_sim.actuator_idle[full_address],
+                    address + POSITION_SUFFIX: state['position'],
+                    address + SPEED_SUFFIX: state['speed']}
+        return {address: self.robot_sim.robot.values.get(full_address)}
+
     def _to_full_address(self, address: str):
         return self.brick_id, address
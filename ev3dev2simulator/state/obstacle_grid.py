@@ -0,0 +1,46 @@
+"""
+The obstacle_grid module contains the class ObstacleGrid, a spatial index of obstacles which do not move.
+"""
+
+import math
+from typing import Dict, Tuple
+
+# Size in millimeters of a cell of the grid
+CELL_SIZE = 50
+
+
+class ObstacleGrid:  # pylint: disable=too-few-public-methods
+    """
+    Uniform grid dividing the world into square cells. Every cell knows which obstacles have a bounding box
+    overlapping it, so checking a point only has to check the few obstacles near it instead of all of them.
+    The grid works in millimeters, so it does not depend on the scale of the screen.
+    """
+
+    def __init__(self, obstacles: list, cell_size: float = CELL_SIZE):
+        self.obstacles = obstacles
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], list] = {}
+
+        for obstacle in obstacles:
+            for min_x, min_y, max_x, max_y in obstacle.get_bounding_boxes():
+                for column in range(self._to_cell(min_x), self._to_cell(max_x) + 1):
+                    for row in range(self._to_cell(min_y), self._to_cell(max_y) + 1):
+                        cell = self.cells.setdefault((column, row), [])
+                        if not cell or cell[-1] is not obstacle:
+                            cell.append(obstacle)
+
+    def get_candidates(self, x: float, y: float) -> list:
+        """
+        Get the obstacles which might contain the given point, in the order they were given.
+        :param x: coordinate of the point in millimeters.
+        :param y: coordinate of the point in millimeters.
+        :return: the obstacles of which the bounding box overlaps the cell containing the point.
+        """
+        return self.cells.get((self._to_cell(x), self._to_cell(y)), [])
+
+    def _to_cell(self, coordinate: float) -> int:
+        """
+        Get the index of the column or row containing the given coordinate.
+        :param coordinate: in millimeters.
+        """
+        return math.floor(coordinate / self.cell_size)
@@ -5,12 +5,20 @@ The robot_simulator module contains the RobotSimulator class which handles how t
 
 import math
 import threading
-from queue import Queue, Empty
-from typing import Any
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
 # noinspection PyProtectedMember
 from pymunk import Vec2d
 
+from ev3dev2simulator.config.config import get_simulation_settings
+from ev3dev2simulator.connection.device_table import DeviceTable, NOT_CONNECTED
+from ev3dev2simulator.state.actuator_timeline import ActuatorTimeline, Segment
 from ev3dev2simulator.state.robot_state import RobotState
+from ev3dev2simulator.state.simulation_clock import SimulationClock, PendingResult
+
+# simulated time a sensor keeps being evaluated after it was read, so a program reading it regularly gets the value
+# of the current frame
+READ_WINDOW_SECONDS = 1.0
 
 
 class RobotSimulator:
@@ -20,24 +28,63 @@ class RobotSimulator:
     of the simulated robot.
     """
 
-    def __init__(self, robot: RobotState):
+    def __init__(self, robot: RobotState, clock: SimulationClock = None):
         self.robot = robot
+        if clock is None:
+            clock = SimulationClock(int(get_simulation_settings()['exec_settings']['frames_per_second']))
+        self.clock = clock
+
+        self.actuator_timelines = {}
+        self.timeline_info = {}
 
-        self.actuator_queues = {}
-        self.queue_info = {}
+        # rotation of the motors in tacho counts (degrees) and their speed in tacho counts per second
+        self.wheel_circumference = float(get_simulation_settings()['wheel_settings']['circumference'])
+        self.tacho_counts = {}
+        self.tacho_speeds = {}
+
+        # number of commands that replaced the jobs of each motor and how many of them the motor finished,
+        # clients are told the latter when it changes, which is the event that the motor became idle
+        self.actuator_commands = {}
+        self.actuator_idle = {}
 
         for actuator in self.robot.get_actuators():
             if actuator.ev3type in ['arm', 'motor', 'speaker']:
-                self.queue_info[(actuator.brick, actuator.address)] = actuator
-                self.actuator_queues[(actuator.brick, actuator.address)] = Queue()
+                self.timeline_info[(actuator.brick, actuator.address)] = actuator
+                self.actuator_timelines[(actuator.brick, actuator.address)] = ActuatorTimeline()
+            if actuator.ev3type in ['arm', 'motor']:
+                self.tacho_counts[(actuator.brick, actuator.address)] = 0.0
+                self.tacho_speeds[(actuator.brick, actuator.address)] = 0.0
+                self.actuator_commands[(actuator.brick, actuator.address)] = 0
+                self.actuator_idle[(actuator.brick, actuator.address)] = 0
 
         self.should_reset = False
-        self.locks = {}
+
+        # sensors of which the values are put in the state by a SensorBatch of the world simulator
+        self.batched_sensors = set()
+
+        # unless all sensors are evaluated every frame, a sensor is only evaluated when it has been read in the last
+        # READ_WINDOW_SECONDS or when a client watches it. Per read sensor the last frame to evaluate it in is kept.
+        # The frame of every evaluated value is remembered.
+        self.evaluate_all_sensors = True
+        self.requested_sensors = {}
+        self.watched_sensors = Counter()
+        self.sensor_frames = {}
+
+        # values and frames of the sensors as they were after the last update. The simulation writes the values in
+        # the robot state while clients read this copy, which is replaced as a whole once an update is complete.
+        self.published_values = ({}, {})
 
         self.motor_lock = threading.Lock()
 
         for sensor in self.robot.get_sensors():
             self.load_sensor(sensor)
+        self.publish_values()
+
+        # the devices of every brick, which are sent to its client when it connects
+        parts_by_brick = {}
+        for part in [*self.robot.get_sensors(), *self.robot.get_actuators()]:
+            parts_by_brick.setdefault(part.brick, []).append(part)
+        self.device_tables = {brick: DeviceTable.from_parts(parts) for brick, parts in parts_by_brick.items()}
 
     def update(self):
         """
@@ -52,41 +99,68 @@ class RobotSimulator:
             self._process_sensors()
             self._sync_physics_sprites()
 
-        self.release_locks()
+        self.publish_values()
 
-    def put_actuator_job(self, address: (int, str), job: float):
+    def put_actuator_segment(self, address: (int, str), segment: Segment):
         """
-        Add a new move job to the queue for the center motor.
+        Add a new segment at the end of the timeline of the given actuator.
         :param address: Address of the actuator
-        :param job: to add.
+        :param segment: to add.
         """
-        self.actuator_queues[address].put_nowait(job)
+        self.motor_lock.acquire()
+        self.actuator_timelines[address].add(segment)
+        self.motor_lock.release()
+
+    def set_actuator_segments(self, address: (int, str), segments: List[Segment]):
+        """
+        Replace the timeline of the given actuator by the given segments.
+        :param address: Address of the actuator
+        :param segments: to play from the next frame on.
+        """
+        self.set_multiple_actuator_segments({address: segments})
+
+    def set_multiple_actuator_segments(self, timelines: Dict[Tuple[int, str], List[Segment]]):
+        """
+        Replace the timelines of several actuators at once, so they all start playing in the same frame.
+        For motors this counts as a command, which is finished when the motor becomes idle again.
+        :param timelines: the segments to play from the next frame on per address of the actuator.
+        """
+        self.motor_lock.acquire()
+        for address, segments in timelines.items():
+            timeline = self.actuator_timelines[address]
+            timeline.clear()
+            for segment in segments:
+                timeline.add(segment)
+            if address in self.actuator_commands:
+                self.actuator_commands[address] += 1
+        self.motor_lock.release()
 
     def next_actuator_jobs(self) -> any:
         """
-        Get the next move jobs for the left and right motor from the queues.
-        :return: a floating point numbers representing the job move distances.
+        Get the next jobs of all actuators by evaluating their timelines for the next frame.
+        Motors of which the timeline has been played completely are marked idle.
+        :return: a list of tuples with the address of the actuator and its job, None if it has nothing to do.
         """
 
         self.motor_lock.acquire()
 
         motor_jobs = []
-        for actuator, jobs in self.actuator_queues.items():
-            try:
-                job = jobs.get_nowait()
-            except Empty:
-                job = None
-            motor_jobs.append((actuator, job))
+        for actuator, timeline in self.actuator_timelines.items():
+            motor_jobs.append((actuator, timeline.next_job()))
+            if actuator in self.actuator_idle and timeline.is_idle():
+                self.actuator_idle[actuator] = self.actuator_commands[actuator]
 
         self.motor_lock.release()
         return motor_jobs
 
     def clear_actuator_jobs(self, address: (int, str)):
         """
-        Clears all current jobs of the robot
+        Clears all current jobs of the actuator, which makes a motor idle.
         """
         self.motor_lock.acquire()
-        self.actuator_queues[address] = Queue()
+        self.actuator_timelines[address].clear()
+        if address in self.actuator_idle:
+            self.actuator_idle[address] = self.actuator_commands[address]
         self.motor_lock.release()
 
     def set_led_color(self, brick_id, led_id, color):
@@ -97,52 +171,140 @@ class RobotSimulator:
 
     def reset_queues_of_brick(self, brick_id: int):
         """
-        Reset queues if bricks disconnect.
+        Clear the jobs of all actuators of a brick if it disconnects. The commands of its motors are counted
+        from zero again, as the next client of the brick starts counting from zero.
         :param brick_id: identifier of brick you want to reset the queues of.
         """
-        for key in self.actuator_queues:
+        for key in self.actuator_timelines:
             if key[0] == brick_id:
                 self.clear_actuator_jobs(key)
 
+        self.motor_lock.acquire()
+        for key in self.actuator_commands:
+            if key[0] == brick_id:
+                self.actuator_commands[key] = 0
+                self.actuator_idle[key] = 0
+        self.motor_lock.release()
+
     def reset(self):
         """
         Reset the data of this State
         :return:
         """
-        for key in self.actuator_queues:
+        for key in self.actuator_timelines:
             self.clear_actuator_jobs(key)
+        for key in self.tacho_counts:
+            self.tacho_counts[key] = 0.0
+            self.tacho_speeds[key] = 0.0
 
         self.robot.reset()
+        self.sensor_frames.clear()
         self.should_reset = False
 
     def load_sensor(self, sensor):
         """
         Load the given sensor adding its default value to this state.
-        Also create a lock for the given sensor.
         :param sensor: to load.
         """
         address = (sensor.brick, sensor.address)
         self.robot.values[address] = sensor.get_default_value()
-        self.locks[address] = threading.Lock()
 
-    def release_locks(self):
+    def publish_values(self):
         """
-        Release all the locked sensor locks. This re-allows for reading
-        the sensor values.
+        Make the sensor values of the update that just completed available to clients. Readers never see the values
+        of an update that is still running, so they do not have to wait for it.
         """
-        for lock in self.locks.values():
-            if lock.locked():
-                lock.release()
+        self.published_values = (dict(self.robot.values), dict(self.sensor_frames))
 
-    def get_value(self, address: (int, str)) -> Any:
+    def get_value(self, address: (int, str), newer_than: Optional[int] = None) -> Any:
         """
-        Get the value of a sensor by its address. Blocks if the lock of
-        the requested sensor is not available.
+        Get the value of a sensor by its address, as published after the last completed update, without waiting.
+        The sensor is evaluated during the next READ_WINDOW_SECONDS, so the value may be older than the current frame
+        when the sensor was not read for a while. Only a sensor that was never evaluated, or of which a newer value
+        is asked for, is read after the next frame.
         :param address: of the sensor to get the value from.
-        :return: the value of the sensor.
+        :param newer_than: if given, the value has to belong to a later frame than this one.
+        :return: a dictionary with the value of the sensor and the frame it belongs to, or a PendingResult when it
+        is only available after the next frame.
+        """
+        values, frames = self.published_values
+        frame = self._get_frame(address, frames)
+        self._request_sensors([address])
+        if self._is_outdated(frame, newer_than):
+            return PendingResult(self._next_frame(newer_than), lambda: self.get_value(address, newer_than))
+        return {'value': values.get(address), 'frame': frame}
+
+    def get_values(self, addresses: List[Tuple[int, str]], newer_than: Optional[int] = None) -> Any:
+        """
+        Get the values of several sensors, all published after the same update. Like get_value, if any of them was
+        never evaluated, or is not newer than asked for, all of them are read after the next frame.
+        :param addresses: of the sensors to get the values from.
+        :param newer_than: if given, the values have to belong to a later frame than this one.
+        :return: a dictionary with the values by address and the frame they belong to, or a PendingResult when they
+        are only available after the next frame.
+        """
+        values, frames = self.published_values
+        self._request_sensors(addresses)
+        if any(self._is_outdated(self._get_frame(address, frames), newer_than) for address in addresses):
+            return PendingResult(self._next_frame(newer_than), lambda: self.get_values(addresses, newer_than))
+
+        frame = min((self._get_frame(address, frames) for address in addresses), default=self.clock.frame)
+        return {'values': {address: values.get(address) for address in addresses}, 'frame': frame}
+
+    def watch_sensor(self, address: (int, str)):
         """
-        self.locks[address].acquire()
-        return self.robot.values[address]
+        Evaluate the given sensor every frame, until it is unwatched as often as it was watched.
+        :param address: of the sensor.
+        """
+        self.watched_sensors[address] += 1
+
+    def unwatch_sensor(self, address: (int, str)):
+        """
+        Stop evaluating the given sensor every frame for one of the clients watching it.
+        :param address: of the sensor.
+        """
+        self.watched_sensors[address] -= 1
+        if self.watched_sensors[address] <= 0:
+            del self.watched_sensors[address]
+
+    def _get_frame(self, address: (int, str), frames: Dict[Tuple[int, str], int]) -> Optional[int]:
+        """
+        Get the frame the published value of the given sensor belongs to.
+        :param address: of the sensor.
+        :param frames: published with the values.
+        :return: the frame, None if the sensor has not been evaluated since the last reset.
+        """
+        frame = frames.get(address)
+        if frame is None and self.evaluate_all_sensors:
+            return self.clock.frame  # the default value, until the sensor is evaluated for the first time
+        return frame
+
+    def _request_sensors(self, addresses: List[Tuple[int, str]]):
+        """
+        Evaluate the given sensors in every frame of the next READ_WINDOW_SECONDS, because they are being read.
+        :param addresses: of the sensors.
+        """
+        last_frame = self.clock.frame + self.clock.frames_for(READ_WINDOW_SECONDS)
+        for address in addresses:
+            self.requested_sensors[address] = last_frame
+
+    @staticmethod
+    def _is_outdated(frame: Optional[int], newer_than: Optional[int]) -> bool:
+        """
+        Check if a sensor has no published value yet, or not one newer than asked for.
+        :param frame: the value belongs to, None if the sensor has not been evaluated since the last reset.
+        :param newer_than: frame the value has to be newer than, None if any frame will do.
+        """
+        if frame is None:
+            return True
+        return newer_than is not None and frame <= newer_than
+
+    def _next_frame(self, newer_than: Optional[int]) -> int:
+        """
+        Get the frame after which outdated sensor values are read again.
+        :param newer_than: frame the values have to be newer than, None if any frame will do.
+        """
+        return max(self.clock.frame, -1 if newer_than is None else newer_than) + 1
 
     def determine_port(self, brick_id: int, kwargs: dict, class_name: str):
         """
@@ -152,30 +314,11 @@ class RobotSimulator:
         :param class_name: some devices do not have a driver_name such as leds, for these, we use class_name
         :return: returns 'dev_not_connected' or the port as string.
         """
-        devices = {**self.robot.sensors, **self.robot.actuators}
-        if class_name is not None and class_name == 'leds':
-            return 'leds_addr'
-        if class_name is not None and 'driver_name' not in kwargs and class_name == 'tacho-motor':
-            kwargs['driver_name'] = 'lego-ev3-m-motor'
-        if kwargs.get('driver_name') is not None:
-            driver_names_pre = kwargs.get('driver_name')
-            driver_names = driver_names_pre if isinstance(driver_names_pre, list) else [driver_names_pre]
-
-            if kwargs.get('address') is not None:
-                device = devices.get((brick_id, kwargs.get('address')))
-                if device:
-                    if devices.get((brick_id, kwargs.get('address'))).driver_name in driver_names:
-                        return kwargs.get('address')
-                else:
-                    print('device not found on brick', brick_id, ' with address', kwargs.get('address'))
-            else:
-                found_devices = list(filter(lambda dev: dev.driver_name in driver_names, devices.values()))
-                if len(found_devices) == 1:
-                    return found_devices[0].address
-
-        print(f'Could not find device with classname {class_name} and driver name {kwargs.get("driver_name")} on '
-              f'address {kwargs.get("address")} of {self.robot.name}, brick {brick_id}')
-        return 'dev_not_connected'
+        port = self.device_tables.get(brick_id, DeviceTable([])).determine_port(kwargs, class_name)
+        if port == NOT_CONNECTED:
+            print(f'Could not find device with classname {class_name} and driver name {kwargs.get("driver_name")} on '
+                  f'address {kwargs.get("address")} of {self.robot.name}, brick {brick_id}')
+        return port
 
     def _process_actuators(self):
         """
@@ -185,7 +328,10 @@ class RobotSimulator:
         job_per_actuator = self.next_actuator_jobs()
         left_ppf = right_ppf = None
         for (address, job_of_actuator) in job_per_actuator:
-            actuator = self.queue_info[address]
+            actuator = self.timeline_info[address]
+            if actuator.ev3type in ['arm', 'motor']:
+                self._update_tacho(address, actuator.ev3type, job_of_actuator)
+
             if actuator.ev3type == 'arm':
                 if job_of_actuator is not None:
                     self.robot.execute_arm_movement(address, job_of_actuator)
@@ -200,6 +346,32 @@ class RobotSimulator:
         if left_ppf is not None or right_ppf is not None:
             self.robot.execute_movement(left_ppf, right_ppf)
 
+    def _update_tacho(self, address: (int, str), ev3type: str, job: float):
+        """
+        Integrate the rotation of a motor during this frame into its tacho count and speed.
+        :param address: of the motor.
+        :param ev3type: 'motor' for wheels, of which the job is in millimeters, or 'arm', of which the job is
+        in (inverted) degrees.
+        :param job: of the motor this frame, None if it does not move.
+        """
+        if job is None:
+            degrees = 0.0
+        elif ev3type == 'arm':
+            degrees = -job
+        else:
+            degrees = job / self.wheel_circumference * 360
+
+        self.tacho_counts[address] += degrees
+        self.tacho_speeds[address] = degrees * self.clock.frames_per_second
+
+    def get_motor_state(self, address: (int, str)) -> dict:
+        """
+        Get the rotation of a motor as its encoder would measure it.
+        :param address: of the motor.
+        :return: a dictionary with the position in tacho counts and the speed in tacho counts per second.
+        """
+        return {'position': int(round(self.tacho_counts[address])), 'speed': int(round(self.tacho_speeds[address]))}
+
     def _process_leds(self):
         for address, led_color in self.robot.led_colors.items():
             self.robot.set_led_color(address, led_color)
@@ -207,10 +379,19 @@ class RobotSimulator:
     def _process_sensors(self):
         """
         Process the data of the robot sensors by retrieving the data and putting it
-        in the robot state.
+        in the robot state. Unless all sensors are evaluated, only recently read and watched sensors are.
         """
+        frame = self.clock.frame + 1
         for address, sensor in self.robot.sensors.items():
-            self.robot.values[address] = sensor.get_latest_value()
+            if address in self.batched_sensors:
+                self.sensor_frames[address] = frame
+                continue
+            is_requested = self.requested_sensors.get(address, -1) >= frame
+            if not is_requested:
+                self.requested_sensors.pop(address, None)
+            if self.evaluate_all_sensors or is_requested or address in self.watched_sensors:
+                self.robot.values[address] = sensor.get_latest_value()
+                self.sensor_frames[address] = frame
 
     def _sync_physics_sprites(self):
         self.robot.set_last_pos(self.robot.body.position)
@@ -218,6 +399,4 @@ class RobotSimulator:
         for part in self.robot.parts:
             rel = Vec2d(part.shape.center_of_gravity)
             x, y = rel.rotated(self.robot.body.angle) + self.robot.body.position
-            part.sprite.center_x = x
-            part.sprite.center_y = y
-            part.sprite.angle = math.degrees(part.shape.body.angle)
+            part.set_pose(x, y, math.degrees(part.shape.body.angle))
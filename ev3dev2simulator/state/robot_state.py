@@ -5,7 +5,6 @@ This class can be seen as a snapshot of the robot at some point in time.
 
 import math
 
-import arcade as _arcade
 import pymunk
 from pymunk.vec2d import Vec2d
 
@@ -23,7 +22,7 @@ from ev3dev2simulator.robotpart.wheel import Wheel
 from ev3dev2simulator.util.point import Point
 
 from ev3dev2simulator.util.util import calc_differential_steering_angle_x_y
-from ev3dev2simulator.config.config import DEBUG, get_robot_config
+from ev3dev2simulator.config.config import DEBUG, get_robot_config, get_simulation_settings
 
 
 class RobotState:
@@ -33,8 +32,8 @@ class RobotState:
     """
 
     def __init__(self, config):
-        self.sprite_list = _arcade.SpriteList()
-        self.side_bar_sprites = _arcade.SpriteList()
+        self.sprite_list = None
+        self.side_bar_sprites = []
 
         self.sensors = {}
         self.actuators = {}
@@ -46,6 +45,7 @@ class RobotState:
 
         self.body = None
         self.scale = None
+        self.frames_per_second = int(get_simulation_settings()['exec_settings']['frames_per_second'])
 
         if DEBUG:
             self.debug_shapes = []
@@ -110,7 +110,6 @@ class RobotState:
 
             elif part['type'] == 'arm':
                 arm = Arm(part, self)
-                self.side_bar_sprites.append(arm.side_bar_arm)
                 self.actuators[(arm.brick, arm.address)] = arm
             else:
                 print("Unknown robot part in config")
@@ -192,16 +191,24 @@ class RobotState:
         """
         Creates the sprite list based on all the parts of the robot.
         """
+        # pylint: disable=import-outside-toplevel
+        from arcade import SpriteList
+        # pylint: enable=import-outside-toplevel
+
+        self.sprite_list = SpriteList()
+        self.side_bar_sprites = SpriteList()
         for part in self.parts:
             part.setup_visuals(scale)
             self.sprite_list.append(part.sprite)
+            if isinstance(part, Arm):
+                self.side_bar_sprites.append(part.side_bar_arm)
 
     def _move_position(self, distance: Vec2d):
         """
-        Move all parts of this robot by the given distance vector.
+        Move all parts of this robot by the given distance vector during the next simulated frame.
         :param distance: to move
         """
-        self.body.velocity = distance * 30.0
+        self.body.velocity = distance * self.frames_per_second
 
     def _rotate(self, radians: float):
         """
@@ -242,27 +249,32 @@ class RobotState:
         """
         self.actuators[address].set_color_texture(color)
 
-    def set_color_obstacles(self, obstacles: [color_obstacle]):
+    def set_color_obstacles(self, obstacles: [color_obstacle], color_map=None):
         """
         Set the obstacles which can be detected by the color sensors of this robot.
         :param obstacles: to be detected.
+        :param color_map: raster of the obstacles, looked up instead of checking every obstacle.
         """
         for part in self.sensors.values():
             if part.get_ev3type() == 'color_sensor':
                 part.set_sensible_obstacles(obstacles)
+                part.set_color_map(color_map)
 
-    def set_falling_obstacles(self, obstacles):
+    def set_falling_obstacles(self, obstacles, color_map=None):
         """
         Set the obstacles which can be detected by the wheel of this robot. This simulates
         the entering of a wheel in a 'hole'. Meaning it is stuck or falling.
         :param obstacles: to be detected.
+        :param color_map: raster of the obstacles, looked up instead of checking every obstacle.
         """
         for part in self.actuators.values():
             if part.get_ev3type() == 'motor':
                 part.set_sensible_obstacles(obstacles)
+                part.set_color_map(color_map)
         for part in self.sensors.values():
             if isinstance(part, UltrasonicSensorBottom):
                 part.set_sensible_obstacles(obstacles)
+                part.set_color_map(color_map)
 
     def get_sensor(self, address):
         """
@@ -298,7 +310,7 @@ class RobotState:
                 wheels.append(part)
         return wheels
 
-    def get_sprites(self) -> _arcade.SpriteList:
+    def get_sprites(self):
         """
         Gets the sprite list that has all robot part sprites in it.
         """
@@ -0,0 +1,89 @@
+"""
+The sensor_batch module contains the class SensorBatch, which evaluates the ground sensors of all robots at once.
+"""
+
+import numpy as np
+
+from ev3dev2simulator.robotpart.color_sensor import ColorSensor
+from ev3dev2simulator.robotpart.ultrasonic_sensor_bottom import UltrasonicSensorBottom, GROUND_DISTANCE
+from ev3dev2simulator.state.color_map import NO_COLOR
+
+
+class SensorBatch:
+    """
+    Evaluates the sensors which only look at the ground below them, the color sensors and the bottom ultrasonic
+    sensors, of all robots together. Their positions are gathered into arrays and looked up in the color map
+    in one vectorized call per kind of sensor, instead of a method call and a lookup per sensor.
+    The robot simulators skip these sensors when processing their own sensors.
+    The wheels, which tell whether a robot falls of the playing field, are checked the same way.
+    """
+
+    def __init__(self, robot_simulators: list):
+        self.color_sensors = []
+        self.ground_sensors = []
+        self.wheels = []
+
+        for robot_sim in robot_simulators:
+            self.wheels.extend((robot_sim, None, wheel) for wheel in robot_sim.robot.get_wheels())
+            for address, sensor in robot_sim.robot.sensors.items():
+                if isinstance(sensor, ColorSensor):
+                    self.color_sensors.append((robot_sim, address, sensor))
+                elif isinstance(sensor, UltrasonicSensorBottom):
+                    self.ground_sensors.append((robot_sim, address, sensor))
+                else:
+                    continue
+                robot_sim.batched_sensors.add(address)
+
+    def process(self, color_map):
+        """
+        Put the values of all sensors of the batch in the state of their robot.
+        Robots which are about to be reset are skipped, like they skip their own sensors.
+        :param color_map: of the world, or None if it has not been created yet.
+        """
+        if color_map is None:
+            for robot_sim, address, sensor in self.color_sensors + self.ground_sensors:
+                if not robot_sim.should_reset:
+                    robot_sim.robot.values[address] = sensor.get_latest_value()
+            return
+
+        if self.color_sensors:
+            colors = color_map.get_colors(*self._get_positions(self.color_sensors))
+            for (robot_sim, address, sensor), color in zip(self.color_sensors, colors.tolist()):
+                if not robot_sim.should_reset:
+                    color = sensor.get_default_value() if color == NO_COLOR else color
+                    sensor.set_color_texture(color)
+                    robot_sim.robot.values[address] = color
+
+        if self.ground_sensors:
+            falling = color_map.are_falling(*self._get_positions(self.ground_sensors))
+            for (robot_sim, address, sensor), is_falling in zip(self.ground_sensors, falling.tolist()):
+                if not robot_sim.should_reset:
+                    robot_sim.robot.values[address] = sensor.get_default_value() if is_falling else GROUND_DISTANCE
+
+    def get_falling_robots(self, color_map) -> list:
+        """
+        Get the robots of which a wheel is in a hole or over the edge of the playing field.
+        :param color_map: of the world, or None if it has not been created yet.
+        :return: the states of the falling robots.
+        """
+        if color_map is None or not self.wheels:
+            falling = [wheel.is_falling() for _, _, wheel in self.wheels]
+        else:
+            falling = color_map.are_falling(*self._get_positions(self.wheels)).tolist()
+
+        robots = []
+        for (robot_sim, _, _), is_falling in zip(self.wheels, falling):
+            if is_falling and robot_sim.robot not in robots:
+                robots.append(robot_sim.robot)
+        return robots
+
+    @staticmethod
+    def _get_positions(sensors: list) -> (np.ndarray, np.ndarray):
+        """
+        Gather the world positions of the given sensors, which are kept up to date by the robot simulators.
+        :param sensors: tuples of robot simulator, address and sensor or wheel.
+        :return: a tuple with an array of x coordinates and an array of y coordinates in pixels.
+        """
+        x_values = np.fromiter((sensor.center_x for _, _, sensor in sensors), dtype=float, count=len(sensors))
+        y_values = np.fromiter((sensor.center_y for _, _, sensor in sensors), dtype=float, count=len(sensors))
+        return x_values, y_values
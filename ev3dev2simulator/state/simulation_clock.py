@@ -0,0 +1,164 @@
+"""
+The simulation_clock module contains the class SimulationClock, which keeps the simulated time.
+"""
+
+import math
+import threading
+from typing import Any, Callable
+
+
+class SimulationClock:
+    """
+    Class keeping the time of the simulation. Simulated time only advances when a frame has been simulated,
+    so it is independent of how fast or slow the simulator runs compared to the wall clock.
+
+    In lock-step mode the clock also keeps track of the connected clients, the participants. A frame is only
+    simulated when every participant has declared it is done with the current frame by waiting for a later one.
+    """
+
+    def __init__(self, frames_per_second: int, speed: float = 1.0, lock_step: bool = False):
+        self.frames_per_second = frames_per_second
+        self.speed = speed
+        self.lock_step = lock_step
+        self.frame = 0
+
+        self.condition = threading.Condition()
+        self.participants = set()
+        self.waiting = {}
+        self.tick_listeners = []
+        self.early_tick_listeners = []
+
+    def tick(self):
+        """
+        Advance the clock by a single frame and tell everyone waiting for it.
+        """
+        frame = self.frame + 1
+        for listener in self.early_tick_listeners:
+            listener(frame)
+
+        with self.condition:
+            self.frame = frame
+            self.condition.notify_all()
+
+        for listener in self.tick_listeners:
+            listener(frame)
+
+    def add_tick_listener(self, listener: Callable[[int], None], early: bool = False):
+        """
+        Add a function called with the new frame number every time the clock advances.
+        The function is called by the simulation thread, so it should return quickly.
+        :param listener: to call.
+        :param early: call the function before the clock advances, so nobody can see the new frame before
+        the function returns.
+        """
+        if early:
+            self.early_tick_listeners.append(listener)
+        else:
+            self.tick_listeners.append(listener)
+
+    @property
+    def time(self) -> float:
+        """
+        The simulated time in seconds since the simulation started.
+        """
+        return self.frame / self.frames_per_second
+
+    def get_status(self) -> dict:
+        """
+        Get the information clients need to follow the simulated time.
+        :return: a dictionary with the simulated time, the speed of the simulation compared to real time and
+        whether the simulation runs in lock-step. A speed of 0 means the simulation runs as fast as possible.
+        """
+        return {'time': self.time, 'speed': 0 if self.lock_step else self.speed, 'lock_step': self.lock_step}
+
+    def frames_for(self, seconds: float) -> int:
+        """
+        Get the number of frames needed for at least the given amount of simulated time to pass.
+        :param seconds: to convert.
+        :return: the number of frames, at least one.
+        """
+        return max(1, math.ceil(round(seconds * self.frames_per_second, 6)))
+
+    def add_participant(self, participant):
+        """
+        Add a client which should be done with the current frame before the next frame can be simulated.
+        :param participant: identifier of the client.
+        """
+        with self.condition:
+            self.participants.add(participant)
+
+    def remove_participant(self, participant):
+        """
+        Remove a client, for example because it disconnected.
+        :param participant: identifier of the client.
+        """
+        with self.condition:
+            self.participants.discard(participant)
+            self.waiting.pop(participant, None)
+            self.condition.notify_all()
+
+    def set_waiting(self, participant, frame: int):
+        """
+        Mark the given participant as done with its work until the given frame has been simulated.
+        :param participant: identifier of the client that is waiting.
+        :param frame: the client waits for.
+        """
+        with self.condition:
+            self.waiting[participant] = frame
+            self.condition.notify_all()
+
+    def clear_waiting(self, participant):
+        """
+        Mark the given participant as busy again, the next frame is not simulated until it waits again.
+        :param participant: identifier of the client.
+        """
+        with self.condition:
+            self.waiting.pop(participant, None)
+
+    def wait_for_step(self, timeout: float = None) -> bool:
+        """
+        Block until all participants are done with the current frame, so the next frame can be simulated.
+        :param timeout: maximum time in seconds to wait.
+        :return: True if the next frame can be simulated, False if the timeout expired.
+        """
+        with self.condition:
+            return self.condition.wait_for(self._participants_done, timeout)
+
+    def _participants_done(self) -> bool:
+        """
+        Check if there are participants and all of them wait for a frame later than the current one.
+        """
+        return len(self.participants) > 0 and \
+            all(self.waiting.get(participant, self.frame) > self.frame for participant in self.participants)
+
+
+class PendingResult:
+    """
+    Result of a request that can only be answered once the given frame has been simulated.
+    Resuming it gives the result, or another PendingResult when the request has to wait longer.
+    """
+
+    def __init__(self, frame: int, resume: Callable[[], Any]):
+        self.frame = frame
+        self.resume = resume
+
+    def is_ready(self, frame: int) -> bool:
+        """
+        Check if the result can be resumed.
+        :param frame: the current frame of the simulation.
+        """
+        return frame >= self.frame
+
+    def then(self, function: Callable[[Any], Any]) -> 'PendingResult':
+        """
+        Create a PendingResult which applies the given function to the result of this one.
+        :param function: to apply once the result is available.
+        :return: the new PendingResult.
+        """
+        def resume():
+            result = self.resume()
+            if isinstance(result, PendingResult):
+                return result.then(function)
+            return function(result)
+
+        return PendingResult(self.frame, resume)
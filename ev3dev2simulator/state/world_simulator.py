@@ -4,6 +4,8 @@ The world simulator module contains the WoldSimulator class which simulates the
 import math
 
 from ev3dev2simulator.state.robot_simulator import RobotSimulator
+from ev3dev2simulator.state.sensor_batch import SensorBatch
+from ev3dev2simulator.state.simulation_clock import SimulationClock
 from ev3dev2simulator.state.world_state import WorldState
 from ev3dev2simulator.config.config import get_simulation_settings
 
@@ -15,16 +17,20 @@ class WorldSimulator:
     """
     def __init__(self, world_state: WorldState):
         self.world_state = world_state
+        exec_settings = get_simulation_settings()['exec_settings']
+        self.space_step_size = float(exec_settings['frames_per_second'])
+        self.physics_substeps = int(exec_settings.get('physics_substeps', 1))
+        self.clock = SimulationClock(int(self.space_step_size))
+
         self.robot_simulators = []
         self.should_reset = False
         for robot in world_state.robots:
-            robot_sim = RobotSimulator(robot)
+            robot_sim = RobotSimulator(robot, self.clock)
             self.robot_simulators.append(robot_sim)
+        self.sensor_batch = SensorBatch(self.robot_simulators)
 
         self.world_state.space.add_default_collision_handler()
 
-        self.space_step_size = float(get_simulation_settings()['exec_settings']['frames_per_second'])
-
     def request_reset(self):
         """
         Used to request a reset, which will be handled in the update function
@@ -35,22 +41,29 @@ class WorldSimulator:
 
     def update(self):
         """
-        Resets the model of the world.
+        Simulates a single frame of the world, or resets the model of the world when requested.
+        Either way the simulated time advances by one frame.
+        The physics of a frame are simulated in the configured number of equal substeps.
         """
         if self.should_reset:
             self.world_state.reset()
             self.should_reset = False
         else:
             self.sync_physics_sprites()
-            self.world_state.space.step(1.0 / self.space_step_size)
+            step_size = 1.0 / (self.space_step_size * self.physics_substeps)
+            for _ in range(self.physics_substeps):
+                self.world_state.space.step(step_size)
+            self.sensor_batch.process(self.world_state.color_map)
             for robot in self.robot_simulators:
                 robot.update()
+        self.clock.tick()
 
     def sync_physics_sprites(self):
         """ Move sprites to where physics objects are """
         for obstacle in self.world_state.obstacles:
-            obstacle.sprite.center_x = obstacle.body.position.x
-            obstacle.sprite.center_y = obstacle.body.position.y
-            obstacle.sprite.angle = math.degrees(obstacle.body.angle)
+            if obstacle.sprite is not None:
+                obstacle.sprite.center_x = obstacle.body.position.x
+                obstacle.sprite.center_y = obstacle.body.position.y
+                obstacle.sprite.angle = math.degrees(obstacle.body.angle)
             obstacle.set_new_pos(obstacle.body.position)
-            obstacle.new_angle = obstacle.sprite.angle
+            obstacle.new_angle = math.degrees(obstacle.body.angle)
@@ -4,11 +4,12 @@ The world state module contains the state of the world, which includes the robot
 
 from math import radians
 
-import arcade as _arcade
 import pymunk
 from pymunk import Space
 
 from ev3dev2simulator.obstacle.board import Board
+from ev3dev2simulator.state.color_map import ColorMap
+from ev3dev2simulator.state.obstacle_grid import ObstacleGrid
 from ev3dev2simulator.state.robot_state import RobotState
 
 from ev3dev2simulator.obstacle.border import Border
@@ -17,17 +18,22 @@ from ev3dev2simulator.obstacle.edge import Edge
 from ev3dev2simulator.obstacle.lake import Lake
 from ev3dev2simulator.obstacle.rock import Rock
 
+# The world is simulated in millimeters, a window only scales it to the screen when drawing it.
+WORLD_SCALE = 1
+
 
 class WorldState:
     """
     Contains the objects, the robots and the surrounding space of the 'world'
     """
     def __init__(self, config):
-        self.sprite_list = _arcade.SpriteList()
+        self.sprite_list = None
+        self.static_shape_lists = []
         self.obstacles = []
         self.static_obstacles = []
         self.falling_obstacles = []
         self.color_obstacles = []
+        self.color_map = None
 
         self.robots = []
         self.space = Space()
@@ -69,6 +75,9 @@ class WorldState:
 
         self.color_obstacles.append(board)
 
+        self.color_grid = ObstacleGrid(self.color_obstacles)
+        self.falling_grid = ObstacleGrid(self.falling_obstacles)
+
         self.selected_object = None
 
     def reset(self):
@@ -80,8 +89,10 @@ class WorldState:
 
     def setup_pymunk_shapes(self, scale):
         """
-        Setup the shapes that are added to the pymunk space.
+        Setup the shapes that are added to the pymunk space and the geometry of the static obstacles.
         The robot get a shape filter so it does not interact with itself.
+        The static obstacles do not move, so they are drawn into the color map once.
+        :param scale: pixels per millimeter, WORLD_SCALE to simulate the world in millimeters.
         """
         for idx, robot in enumerate(self.robots):
             robot_shapes = robot.setup_pymunk_shapes(scale)
@@ -95,38 +106,60 @@ class WorldState:
             self.space.add(obstacle.body)
             self.space.add(obstacle.shape)
 
-    def rescale(self, new_scale):
-        """
-        On screen rescale, rescale all sprites.
-        """
-        for robot in self.robots:
-            robot.shapes = []
-        for obstacle in self.obstacles:
-            obstacle.shape = None
-        self.space.remove(self.space.shapes)
-        self.space.remove(self.space.bodies)
+        for obstacle in self.static_obstacles:
+            obstacle.create_points(scale)
+
+        self.color_map = ColorMap(self.board_width, self.board_height, scale, self.color_grid, self.falling_grid)
 
         for robot in self.robots:
-            robot.sprite_list = _arcade.SpriteList()
-        self.sprite_list = _arcade.SpriteList()
-        self.setup_pymunk_shapes(new_scale)
-        self.setup_visuals(new_scale)
+            robot.set_color_obstacles(self.color_obstacles, self.color_map)
+            robot.set_falling_obstacles(self.falling_obstacles, self.color_map)
 
     def setup_visuals(self, scale):
         """
         Setup all sprites.
+        The static obstacles do not move, so their shapes are baked into shape element lists once.
+        The sprites of the obstacles and of the parts of all robots are put in a single sprite list, so they are
+        drawn at once from a single texture atlas instead of a batch and an atlas per robot.
+        :param scale: pixels per millimeter, the same as the physics were set up with.
         """
+        # pylint: disable=import-outside-toplevel
+        from arcade import SpriteList
+        # pylint: enable=import-outside-toplevel
+
         for obstacle in self.static_obstacles:
             obstacle.create_shape(scale)
+        self.static_shape_lists = self._create_static_shape_lists()
 
+        self.sprite_list = SpriteList()
         for obstacle in self.obstacles:
             obstacle.create_sprite(scale)
             self.sprite_list.append(obstacle.sprite)
 
         for robot in self.robots:
             robot.setup_visuals(scale)
-            robot.set_color_obstacles(self.color_obstacles)
-            robot.set_falling_obstacles(self.falling_obstacles)
+            self.sprite_list.extend(robot.get_sprites())
+
+    def _create_static_shape_lists(self) -> list:
+        """
+        Put the shapes of the static obstacles in shape element lists, which draw all shapes of the same kind at once.
+        A new list is started when a shape would otherwise be drawn before the shapes of the obstacles preceding it.
+        :return: the lists, to be drawn in order.
+        """
+        # pylint: disable=import-outside-toplevel
+        from arcade import ShapeElementList
+        # pylint: enable=import-outside-toplevel
+
+        shape_lists = []
+        previous_kind = None
+        for obstacle in self.static_obstacles:
+            for shape in obstacle.get_shapes():
+                kind = (shape.mode, shape.line_width)
+                if not shape_lists or (kind != previous_kind and kind in shape_lists[-1].batches):
+                    shape_lists.append(ShapeElementList())
+                shape_lists[-1].append(shape)
+                previous_kind = kind
+        return shape_lists
 
     def set_object_at_position_as_selected(self, pos):
         """
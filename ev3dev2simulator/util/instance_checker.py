@@ -3,7 +3,6 @@ Module containing the class InstanceChecker.
 """
 
 import os
-import time
 import tempfile
 import sys
 import platform
@@ -13,36 +12,52 @@ from pyglet import clock
 class InstanceChecker:
     """
     Class used to detect whether another instance is already running.
+    The running instance holds an exclusive lock on a lock file, so a new instance knows right away whether
+    it is the only one. The pid file is used to ask the running instance to activate its window.
     """
     def __init__(self, visualiser):
         self.visualiser = visualiser
-        self.pid_file = None
-        self.pid = None
+        self.pid_file = os.path.join(tempfile.gettempdir(), "ev3dev2simulator.pid")
+        self.lock_file = None
+        self.pid = str(os.getpid())
 
     def check_for_unique_instance(self):
         """ Detect whether an other instance is already running. If so then trigger the
             activation for the other instance and terminate this instance.
         """
 
-        tmpdir = tempfile.gettempdir()
-        self.pid_file = os.path.join(tmpdir, "ev3dev2simulator.pid")
+        self.lock_file = open(os.path.join(tempfile.gettempdir(), "ev3dev2simulator.lock"), 'w')
+        try:
+            self._lock()
+        except OSError:
+            # other process already running, writing our pid makes it activate its window
+            self._write_pid()
+            sys.exit()
 
-        self.pid = str(os.getpid())
+        self._write_pid()
+
+    def _lock(self):
+        """
+        Take the lock on the lock file without waiting for it. The lock is held until this process exits.
+        :raises OSError: if another process holds the lock.
+        """
+        # pylint: disable=import-outside-toplevel
+        if platform.system().lower().startswith('win'):
+            import msvcrt  # pylint: disable=import-error
+            msvcrt.locking(self.lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        # pylint: enable=import-outside-toplevel
+
+    def _write_pid(self):
+        """
+        Write the pid of this process to the pid file.
+        """
         pid_file = open(self.pid_file, 'w')
         pid_file.write(self.pid)
-        pid_file.flush()
         pid_file.close()
 
-        time.sleep(2)
-
-        file = open(self.pid_file, 'r')
-        line = file.readline()
-        file.close()
-        read_pid = line.rstrip()
-        if read_pid != self.pid:
-            # other process already running
-            sys.exit()
-
     def check_for_activation(self):
         """ checks each interval whether the simulator windows must be activated (bring to front)
 
@@ -60,9 +75,7 @@ class InstanceChecker:
 
                 # other simulator tries to start running
                 # write pid to pid_file to notify this simulator is already running
-                pid_file = open(self.pid_file, 'w')
-                pid_file.write(self.pid)
-                pid_file.close()
+                self._write_pid()
 
                 if platform.system().lower().startswith('win'):
                     self.visualiser.windows_activate()
@@ -0,0 +1,88 @@
+"""
+Module containing the functions used to draw shapes into a raster, a NumPy array with a cell per millimeter.
+The shapes are given in pixels, so a cell is part of a shape when its center, scaled to pixels, lies inside the shape.
+"""
+
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+
+from ev3dev2simulator.util.util import PointList
+
+
+def fill_polygon(raster: np.ndarray, polygon: PointList, value, scale: float):
+    """
+    Set the cells of the raster of which the center lies inside the given polygon.
+    The same ray-tracing rules as is_point_in_polygon are used, so both agree on which points are inside.
+    :param raster: to fill, indexed by row (y) and column (x).
+    :param polygon: the points of the polygon outline in pixels.
+    :param value: to give the cells inside the polygon.
+    :param scale: pixels per millimeter.
+    """
+    window = _window(raster, (min(x for x, _ in polygon), min(y for _, y in polygon),
+                              max(x for x, _ in polygon), max(y for _, y in polygon)), scale)
+    if window is None:
+        return
+
+    region, cell_xs, cell_ys = window
+    inside = np.zeros(cell_xs.shape, dtype=bool)
+    for i, (p1x, p1y) in enumerate(polygon):
+        p2x, p2y = polygon[(i + 1) % len(polygon)]
+        if p1y == p2y:
+            continue  # a horizontal edge is never crossed
+
+        crossed = (min(p1y, p2y) < cell_ys) & (cell_ys <= max(p1y, p2y)) & (cell_xs <= max(p1x, p2x))
+        if p1x != p2x:
+            crossed &= cell_xs <= (cell_ys - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
+        inside ^= crossed
+
+    raster[region][inside] = value
+
+
+def fill_circle(raster: np.ndarray, center_x: float, center_y: float, radius: float, value, scale: float,
+                inner_radius: Optional[float] = None):
+    """
+    Set the cells of the raster of which the center lies closer than the radius to the center of the circle.
+    :param raster: to fill, indexed by row (y) and column (x).
+    :param center_x: x coordinate of the circle center in pixels.
+    :param center_y: y coordinate of the circle center in pixels.
+    :param radius: of the circle in pixels.
+    :param value: to give the cells inside the circle.
+    :param scale: pixels per millimeter.
+    :param inner_radius: if given, only cells further than this radius from the center are set, forming a ring.
+    """
+    window = _window(raster, (center_x - radius, center_y - radius, center_x + radius, center_y + radius), scale)
+    if window is None:
+        return
+
+    region, cell_xs, cell_ys = window
+    distances = np.hypot(cell_xs - center_x, cell_ys - center_y)
+    inside = distances < radius
+    if inner_radius is not None:
+        inside &= distances > inner_radius
+
+    raster[region][inside] = value
+
+
+def _window(raster: np.ndarray, bounds: Tuple[float, float, float, float], scale: float):
+    """
+    Get the part of the raster covering the given bounds.
+    :param raster: containing the cells.
+    :param bounds: minimum x, minimum y, maximum x and maximum y in pixels.
+    :param scale: pixels per millimeter.
+    :return: a tuple with the slices selecting the part of the raster and the coordinates of the centers of its
+    cells in pixels, or None if the bounds are outside of the raster.
+    """
+    min_x, min_y, max_x, max_y = bounds
+    height, width = raster.shape
+    first_column = max(0, math.floor(min_x / scale))
+    first_row = max(0, math.floor(min_y / scale))
+    end_column = min(width, math.ceil(max_x / scale) + 1)
+    end_row = min(height, math.ceil(max_y / scale) + 1)
+    if first_column >= end_column or first_row >= end_row:
+        return None
+
+    cell_xs, cell_ys = np.meshgrid((np.arange(first_column, end_column) + 0.5) * scale,
+                                   (np.arange(first_row, end_row) + 0.5) * scale)
+    return (slice(first_row, end_row), slice(first_column, end_column)), cell_xs, cell_ys
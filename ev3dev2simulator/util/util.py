@@ -3,10 +3,11 @@ Module containing various utility function, mostly concerning mathematical 2D ca
 """
 
 import math
-from typing import Tuple
+from typing import List, Sequence, Tuple, Union
 
-import arcade as _arcade
-from arcade import PointList
+Point = Union[Tuple[float, float], List[float]]
+PointList = Sequence[Point]
+Color = Union[Tuple[int, int, int], Tuple[int, int, int, int]]
 
 
 def get_circle_points(center_x: float,
@@ -40,6 +41,62 @@ def get_circle_points(center_x: float,
     return points
 
 
+def get_rectangle_points(center_x: float,
+                         center_y: float,
+                         width: float,
+                         height: float,
+                         tilt_angle: float = 0) -> PointList:
+    """
+    Determine the four corner points of a rectangle of given center, size and rotation.
+
+    :param center_x: the x coordinate of the rectangle center.
+    :param center_y: the y coordinate of the rectangle center.
+    :param width: the width of the rectangle.
+    :param height: the height of the rectangle.
+    :param tilt_angle: the rotation of the rectangle around its center in degrees.
+    :return: a PointList object containing the four corners of the rectangle.
+    """
+
+    points = [(center_x - width / 2, center_y - height / 2),
+              (center_x - width / 2, center_y + height / 2),
+              (center_x + width / 2, center_y + height / 2),
+              (center_x + width / 2, center_y - height / 2)]
+
+    if tilt_angle:
+        cos = math.cos(math.radians(tilt_angle))
+        sin = math.sin(math.radians(tilt_angle))
+        points = [(center_x + (x - center_x) * cos - (y - center_y) * sin,
+                   center_y + (x - center_x) * sin + (y - center_y) * cos) for x, y in points]
+
+    return points
+
+
+def is_point_in_polygon(x: float, y: float, polygon: PointList) -> bool:
+    """
+    Check if the given point lies inside a polygon, using ray-tracing.
+
+    :param x: coordinate of the point.
+    :param y: coordinate of the point.
+    :param polygon: the points of the polygon outline.
+    :return: True if the point is inside the polygon.
+    """
+
+    num_points = len(polygon)
+    inside = False
+    if num_points == 0:
+        return False
+
+    p1x, p1y = polygon[0]
+    for i in range(num_points + 1):
+        p2x, p2y = polygon[i % num_points]
+        if min(p1y, p2y) < y <= max(p1y, p2y) and x <= max(p1x, p2x):
+            if p1x == p2x or x <= (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x:
+                inside = not inside
+        p1x, p1y = p2x, p2y
+
+    return inside
+
+
 def distance_between_points(x_of_point1: float, y_of_point1: float, x_of_point2: float, y_of_point2: float) -> float:
     """
     Calculate the distance between two points in 2D space.
@@ -93,7 +150,7 @@ def get_inch_multiplier() -> float:
     return 0.254
 
 
-def to_color_code(color: _arcade.Color) -> int:
+def to_color_code(color: Color) -> int:
     """
     Convert rgb tuple to ev3dev color
     """
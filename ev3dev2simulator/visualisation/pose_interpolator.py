@@ -0,0 +1,53 @@
+"""
+The pose_interpolator module contains the class PoseInterpolator, which lets sprites move smoothly when the window
+is drawn at a different rate than the simulation runs.
+"""
+
+from typing import Dict, Iterable
+
+
+class PoseInterpolator:
+    """
+    Remembers the poses the sprites got from the last two simulated frames. Before drawing, the sprites are put at
+    a pose between those two frames, depending on how much time has passed since the last one. The drawn poses lag
+    at most one frame behind the simulation, but sprites no longer move in jerks when the simulated frame rate
+    and the render rate differ.
+    """
+
+    def __init__(self):
+        self.previous: Dict[int, tuple] = {}
+        self.current: Dict[int, tuple] = {}
+
+    def capture(self, sprites: Iterable):
+        """
+        Remember the poses the given sprites got from the last simulated frame.
+        :param sprites: moved by the simulation.
+        """
+        self.previous = self.current
+        self.current = {id(sprite): (sprite, sprite.center_x, sprite.center_y, sprite.angle) for sprite in sprites}
+
+    def restore(self):
+        """
+        Put the sprites back at the pose of the last simulated frame, before the next frames are simulated.
+        """
+        for sprite, center_x, center_y, angle in self.current.values():
+            sprite.center_x = center_x
+            sprite.center_y = center_y
+            sprite.angle = angle
+
+    def apply(self, fraction: float):
+        """
+        Put the sprites at a pose between the two last simulated frames.
+        Sprites which did not exist during the previous frame stay at their last pose.
+        :param fraction: of the time between the two frames that has passed, 0 gives the previous pose.
+        """
+        fraction = min(max(fraction, 0.0), 1.0)
+        for key, (sprite, center_x, center_y, angle) in self.current.items():
+            previous = self.previous.get(key)
+            if previous is None or previous[0] is not sprite:
+                continue
+
+            _, previous_x, previous_y, previous_angle = previous
+            sprite.center_x = previous_x + (center_x - previous_x) * fraction
+            sprite.center_y = previous_y + (center_y - previous_y) * fraction
+            sprite.angle = previous_angle + ((angle - previous_angle + 180) % 360 - 180) * fraction
@@ -2,17 +2,24 @@
 This module contains the Sidebar class that is used to display information about the current playing field.
 It is displayed to the right of the playing field.
 """
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
+from itertools import chain
 
 import arcade as _arcade
+from PIL import Image
 
 from ev3dev2simulator.util.dimensions import Dimensions
 from ev3dev2simulator.util.point import Point
 
+# Number of rendered lines of text kept, so values that keep changing do not fill the memory
+TEXT_CACHE_SIZE = 256
+
 
 class Sidebar:
     """
-    The Sidebar class is used to display information about the playing fields and its objects
+    The Sidebar class is used to display information about the playing fields and its objects.
+    All text is put in a single texture, which is only created again when a value changed. The image of each line
+    is kept in a cache, so only lines with a new value are rendered again.
     """
     def __init__(self, start_point: Point, dimensions: Dimensions):
         self.start = start_point
@@ -27,6 +34,11 @@ class Sidebar:
 
         self.sprites = _arcade.SpriteList()
 
+        self.text_cache = OrderedDict()
+        self.text_sprites = None
+        self.text_version = 0
+        self.is_dirty = True
+
     def init_robot(self, name, sensors, bricks, side_bar_sprites):
         """
         Initialized a single robot for the sidebar. Creates the sprite for the arm as seen from above.
@@ -43,33 +55,90 @@ class Sidebar:
 
         for brick in bricks:
             self.robot_info[name][(brick.brick, 'speaker')] = {'name': f'{brick.name} sound', 'value': None}
+        self.is_dirty = True
 
     def add_robot_info(self, name, values, sounds):
         """
-        Adds the current values of the robot to the sidebar.
+        Adds the current values of the robot to the sidebar. The text is only drawn again when a value changed.
         """
         robot = self.robot_info[name]
-        for address, value in values.items():
-            robot[address]['value'] = value
-        for address, sound in sounds.items():
-            robot[address]['value'] = sound
+        for address, value in chain(values.items(), sounds.items()):
+            sensor = robot[address]
+            if sensor['value'] != value or type(sensor['value']) is not type(value):
+                sensor['value'] = value
+                self.is_dirty = True
 
     def draw(self):
         """
         draws the sidebar based on the information given by ``add_robot_info``
         """
-        height = self.sprites_total_height
         for sprite in self.sprites:
             sprite.draw()
+
+        if self.is_dirty:
+            self._update_text()
+        self.text_sprites.draw()
+
+    def _get_lines(self):
+        """
+        Get the lines of text of the sidebar.
+        :return: tuples with the text, the font size and the x and y coordinates of the start of the baseline.
+        """
+        height = self.sprites_total_height
         for robot_name, sensor_dict in self.robot_info.items():
-            _arcade.draw_text(robot_name, self.start.x + self.styling.left_text_padding, self.start.y - height,
-                              self.styling.text_color, self.styling.text_size + 2, bold=True)
+            yield robot_name, self.styling.text_size + 2, self.start.x + self.styling.left_text_padding, \
+                self.start.y - height
             height += (self.styling.text_size + self.styling.text_spacing)
             for _, sensor in sensor_dict.items():
                 value = f"{sensor['value']:.2f}" if isinstance(sensor['value'], float) else str(sensor['value'])
                 lines = value.count('\n')
                 height += (self.styling.text_size * lines)
-                _arcade.draw_text(f"{sensor['name']}: {value}", self.start.x + 2 * self.styling.left_text_padding,
-                                  self.start.y - height, self.styling.text_color, self.styling.text_size)
+                yield f"{sensor['name']}: {value}", self.styling.text_size, \
+                    self.start.x + 2 * self.styling.left_text_padding, self.start.y - height
                 height += (self.styling.text_size + self.styling.text_spacing)
             height += (self.styling.text_size + self.styling.text_spacing)
+
+    def _get_text_image(self, text: str, font_size: int) -> Image.Image:
+        """
+        Get the image of the given line of text, rendering it only if it is not in the cache.
+        :param text: of the line.
+        :param font_size: of the line.
+        :return: the image.
+        """
+        key = (text, font_size)
+        image = self.text_cache.get(key)
+        if image is None:
+            image = _arcade.get_text_image(text, self.styling.text_color, font_size)
+            self.text_cache[key] = image
+            if len(self.text_cache) > TEXT_CACHE_SIZE:
+                self.text_cache.popitem(last=False)
+        else:
+            self.text_cache.move_to_end(key)
+        return image
+
+    def _update_text(self):
+        """
+        Put the images of all lines of text in a single texture, covering the part of the sidebar with text.
+        """
+        lines = [(self._get_text_image(text, font_size), int(x - self.start.x), int(y))
+                 for text, font_size, x, y in self._get_lines()]
+        # every version gets its own sprite list, a sprite list keeps all textures it has shown
+        self.text_sprites = _arcade.SpriteList()
+        self.is_dirty = False
+
+        width = int(self.dims.width)
+        top = min(max((y + image.height for image, _, y in lines), default=0), int(self.dims.height))
+        bottom = max(min((y for _, _, y in lines), default=0), 0)
+        if top <= bottom:
+            return
+
+        canvas = Image.new('RGBA', (width, top - bottom))
+        for image, x, y in lines:
+            if 0 <= x < width and bottom <= y and y + image.height <= top:
+                canvas.alpha_composite(image, (x, top - y - image.height))
+
+        self.text_version += 1
+        sprite = _arcade.Sprite(center_x=self.start.x + width / 2, center_y=(top + bottom) / 2)
+        sprite.texture = _arcade.Texture(f'sidebar-text-{id(self)}-{self.text_version}', canvas,
+                                         hit_box_algorithm='None')
+        self.text_sprites.append(sprite)
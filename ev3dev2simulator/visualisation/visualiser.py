@@ -11,27 +11,38 @@ import pyglet
 
 from arcade.color import RED
 
-from ev3dev2simulator.state.world_state import WorldState
+from ev3dev2simulator.state.world_state import WorldState, WORLD_SCALE
 from ev3dev2simulator.util.dimensions import Dimensions
 from ev3dev2simulator.util.instance_checker import InstanceChecker
 from ev3dev2simulator.util.point import Point
+from ev3dev2simulator.visualisation.pose_interpolator import PoseInterpolator
 from ev3dev2simulator.visualisation.sidebar import Sidebar
 from ev3dev2simulator.config.config import get_simulation_settings, DEBUG
 from ev3dev2simulator.version import __version__ as sim_version
 from ev3dev2.version import __version__ as api_version
 
+# Maximum number of frames simulated before the window is drawn again, so a slow machine does not fall further and
+# further behind when it cannot keep up with the simulation.
+MAX_FRAMES_PER_UPDATE = 5
+
 
 class Visualiser(_arcade.Window):
     """
     Main simulator class.
     This class extends from arcade.Window and manages the updates and rendering of the simulator window.
+    The world is simulated in frames of a fixed length, independent of how often the window is drawn. Each update
+    simulates the frames that fit in the time passed since the previous one. Sprites are drawn between the poses
+    of the last two frames.
+    The world is simulated and set up in millimeters. Only drawing it scales it to the size of the window, so
+    resizing the window does not touch the physics.
     """
 
     def __init__(self, update_world_cb, world_state: WorldState, show_fullscreen: bool,
-                 show_maximized: bool, use_second_screen_to_show_simulator: bool):
+                 show_maximized: bool, use_second_screen_to_show_simulator: bool, allow_multiple: bool = False):
 
-        instance_checker = InstanceChecker(self)
-        instance_checker.check_for_unique_instance()
+        instance_checker = None if allow_multiple else InstanceChecker(self)
+        if instance_checker is not None:
+            instance_checker.check_for_unique_instance()
 
         self.update_callback = update_world_cb
         self.world_state = world_state
@@ -44,30 +55,38 @@ class Visualiser(_arcade.Window):
 
         self.msg_counter = 0
 
+        exec_settings = get_simulation_settings()['exec_settings']
+        self.frame_time = 1 / int(exec_settings['frames_per_second'])
+        self.accumulated_time = 0.0
+        self.pose_interpolator = PoseInterpolator()
+        self.render_frames_per_second = int(exec_settings.get('render_frames_per_second',
+                                                              exec_settings['frames_per_second']))
+
         screen_title = get_simulation_settings()['screen_settings']['screen_title']
         screen_info = screen_title + f'          version: {sim_version}      ev3dev2 api: {api_version}'
 
-        scale = self.determine_scale(self.size.width, self.size.height)
+        self.scale = self.determine_scale(self.size.width, self.size.height)
         if DEBUG:
-            print('starting simulation with scaling', scale)
+            print('starting simulation with scaling', self.scale)
             print('arcade version: ', _arcade.version.VERSION)
 
-        super(Visualiser, self).__init__(self.size.width, self.size.height, screen_info, update_rate=1 / 30,
-                                         fullscreen=show_fullscreen,
+        super(Visualiser, self).__init__(self.size.width, self.size.height, screen_info,
+                                         update_rate=1 / self.render_frames_per_second, fullscreen=show_fullscreen,
                                          resizable=True, screen=_arcade.get_screens()[self.current_screen_index])
 
         icon1 = pyglet.image.load(r'assets/images/body.png')
         self.set_icon(icon1)
         _arcade.set_background_color(get_simulation_settings()['screen_settings']['background_color'])
 
+        self.world_state.setup_pymunk_shapes(WORLD_SCALE)
+        self.world_state.setup_visuals(WORLD_SCALE)
         self.sidebar = self._setup_sidebar()
-        self.world_state.setup_pymunk_shapes(scale)
-        self.world_state.setup_visuals(scale)
 
         if show_maximized:
             self.maximize()
 
-        instance_checker.check_for_activation()
+        if instance_checker is not None:
+            instance_checker.check_for_activation()
 
     @staticmethod
     def run():
@@ -93,8 +112,7 @@ class Visualiser(_arcade.Window):
         return scale
 
     def _change_scale(self, new_screen_width, new_screen_height):
-        scale = self.determine_scale(new_screen_width, new_screen_height)
-        self.world_state.rescale(scale)
+        self.scale = self.determine_scale(new_screen_width, new_screen_height)
 
     def _setup_sidebar(self):
         sidebar_width = get_simulation_settings()['screen_settings']['side_bar_width']
@@ -120,18 +138,14 @@ class Visualiser(_arcade.Window):
         """
 
         _arcade.start_render()
+        self.pose_interpolator.apply(self.accumulated_time / self.frame_time)
+        self.set_viewport(0, self.width / self.scale, 0, self.height / self.scale)
 
-        for obstacle_list in self.world_state.static_obstacles:
-            for shape in obstacle_list.get_shapes():
-                if shape.line_width == 1:
-                    shape.draw()
-                else:
-                    print(shape)
+        for shape_list in self.world_state.static_shape_lists:
+            shape_list.draw()
         self.world_state.sprite_list.draw()
 
         for robot in self.world_state.get_robots():
-            robot.get_sprites().draw()
-
             if DEBUG:
                 for sprite in robot.get_sprites():
                     sprite.draw_hit_box(color=RED, line_thickness=5)
@@ -141,8 +155,9 @@ class Visualiser(_arcade.Window):
                     robot.debug_shapes.clear()
 
             if robot.is_falling() and self.msg_counter <= 0:
-                self.msg_counter = get_simulation_settings()['exec_settings']['frames_per_second'] * 3
+                self.msg_counter = self.render_frames_per_second * 3
 
+        self.set_viewport(0, self.width, 0, self.height)
         for robot in self.world_state.get_robots():
             self.sidebar.add_robot_info(robot.name, robot.values, robot.sounds)
 
@@ -155,12 +170,31 @@ class Visualiser(_arcade.Window):
     def update(self, delta_time):
         """
         All the logic to move the robot. Collision detection is also performed.
-        Callback to WorldSimulator.update is called
+        Callback to WorldSimulator.update is called once for every frame that fits in the time passed.
+        """
+        self.accumulated_time += delta_time
+        frames = min(int(self.accumulated_time / self.frame_time), MAX_FRAMES_PER_UPDATE)
+        if frames == 0:
+            return
+
+        self.pose_interpolator.restore()
+        for _ in range(frames):
+            self.update_callback()
+        self.pose_interpolator.capture(self._get_simulated_sprites())
+
+        self.accumulated_time -= frames * self.frame_time
+        if self.accumulated_time >= self.frame_time:
+            # the simulation could not keep up, drop the frames it is behind
+            self.accumulated_time %= self.frame_time
+
+    def _get_simulated_sprites(self):
+        """
+        Get the sprites of the robots and obstacles, which are moved by the simulation.
         """
-        self.update_callback()
+        return self.world_state.sprite_list
 
     def on_mouse_press(self, x: float, y: float, button: int, modifiers: int):
-        self.world_state.set_object_at_position_as_selected((x, y))
+        self.world_state.set_object_at_position_as_selected((x / self.scale, y / self.scale))
 
     def on_mouse_release(self, x: float, y: float, button: int,
                          modifiers: int):
@@ -168,7 +202,7 @@ class Visualiser(_arcade.Window):
 
     def on_mouse_drag(self, x: float, y: float, dx: float, dy: float, buttons: int, modifiers: int):
         if buttons == _arcade.MOUSE_BUTTON_LEFT:
-            self.world_state.move_selected_object(dx, dy)
+            self.world_state.move_selected_object(dx / self.scale, dy / self.scale)
         if buttons == _arcade.MOUSE_BUTTON_RIGHT:
             self.world_state.rotate_selected_object(dy)
 
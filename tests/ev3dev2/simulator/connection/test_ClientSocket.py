@@ -5,6 +5,8 @@ import unittest
 
 from ev3dev2simulator.config.config import get_simulation_settings, load_config
 from ev3dev2simulator.connection.message.rotate_command import RotateCommand
+from ev3dev2simulator.connection.protocol import CODECS
+from ev3dev2simulator.connection.transport import StreamConnection
 
 
 class TestClientSocket(unittest.TestCase):
@@ -13,7 +15,7 @@ class TestClientSocket(unittest.TestCase):
         load_config(None)
 
     def run_fake_server(self):
-        # Run a server to listen for a connection and then close it
+        # Run a server to listen for a connection, agree on the codec and then close it
         port = get_simulation_settings()['exec_settings']['socket_port']
         server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
@@ -22,13 +24,14 @@ class TestClientSocket(unittest.TestCase):
             server_sock.bind(('localhost', port))
             server_sock.listen(5)
             (client, address) = server_sock.accept()
+            client = StreamConnection(client)
+            client.send(client.receive_frame())
             while True:
-                data = client.recv(128)
-                if data:
-                    if data == b'close_test_server':
-                        client.close()
-                        server_sock.close()
-                        return
+                data = client.receive_frame()
+                if data is None or data == b'close_test_server':
+                    client.close()
+                    server_sock.close()
+                    return
         except:
             server_sock.close()
 
@@ -37,25 +40,27 @@ class TestClientSocket(unittest.TestCase):
         server_thread = threading.Thread(target=self.run_fake_server)
         server_thread.start()
 
-        msg_length = get_simulation_settings()['exec_settings']['message_size']
         from ev3dev2simulator.connection.client_socket import get_client_socket
         sock = get_client_socket()
+        self.assertEqual(sock.codec.name, get_simulation_settings()['exec_settings']['codec'])
 
         command = RotateCommand('test_port', 500.0, 100.0, 'hold')
         sock.send_command(command)
 
         ser = sock.serialize(command)
-        unpadded = (b'{"type": "RotateCommand", "address": "test_port", "speed": 500.0, "distance": 100.0, '
-                    b'"stop_action": "hold"}')
+        self.assertDictEqual(sock.codec.decode_message(ser), command.serialize())
 
-        expected = unpadded.ljust(msg_length, b'#')
+        sock.codec = CODECS['json']
+        ser = sock.serialize(command)
+        expected = (b'{"type": "RotateCommand", "address": "test_port", "speed": 500.0, "distance": 100.0, '
+                    b'"stop_action": "hold"}')
         self.assertEqual(ser, expected)
 
         ser = b'{"value": 15}'
         deser = sock.deserialize(ser)
         self.assertEqual(deser, 15)
 
-        sock.client.send(str.encode('close_test_server'))
+        sock.client.send(b'close_test_server')
         sock.client.close()
         server_thread.join()
 
@@ -0,0 +1,35 @@
+import unittest
+
+from ev3dev2simulator.connection.device_table import DeviceTable, LEDS_ADDRESS, NOT_CONNECTED
+
+
+class TestDeviceTable(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.table = DeviceTable([
+            {'address': 'ev3-ports:in1', 'driver_name': 'lego-ev3-color', 'class': 'color_sensor'},
+            {'address': 'ev3-ports:in2', 'driver_name': 'lego-ev3-color', 'class': 'color_sensor'},
+            {'address': 'ev3-ports:in3', 'driver_name': 'lego-ev3-us', 'class': 'ultrasonic_sensor'},
+            {'address': 'ev3-ports:outB', 'driver_name': 'lego-ev3-m-motor', 'class': 'arm'}])
+
+    def test_index(self):
+        self.assertEqual(self.table.by_driver_name['lego-ev3-color'], ['ev3-ports:in1', 'ev3-ports:in2'])
+        self.assertEqual(self.table.by_address['ev3-ports:in3']['class'], 'ultrasonic_sensor')
+
+    def test_determine_port(self):
+        kwargs = {'driver_name': ['lego-ev3-us', 'lego-nxt-us']}
+        self.assertEqual(self.table.determine_port(kwargs, 'lego-sensor'), 'ev3-ports:in3')
+        self.assertDictEqual(kwargs, {'driver_name': ['lego-ev3-us', 'lego-nxt-us']})
+
+        # two color sensors, so the address has to be given
+        self.assertEqual(self.table.determine_port({'driver_name': 'lego-ev3-color'}, 'lego-sensor'), NOT_CONNECTED)
+        self.assertEqual(self.table.determine_port({'address': 'ev3-ports:in2', 'driver_name': 'lego-ev3-color'},
+                                                   'lego-sensor'), 'ev3-ports:in2')
+
+        # a tacho motor without driver name is a medium motor
+        self.assertEqual(self.table.determine_port({'address': None}, 'tacho-motor'), 'ev3-ports:outB')
+        self.assertEqual(self.table.determine_port({}, 'leds'), LEDS_ADDRESS)
+
+
+if __name__ == '__main__':
+    unittest.main()
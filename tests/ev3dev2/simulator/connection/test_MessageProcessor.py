@@ -1,14 +1,23 @@
-import threading
 import unittest
 
 from ev3dev2simulator.config.config import get_simulation_settings, load_config
 from ev3dev2simulator.state.message_processor import MessageProcessor
+from ev3dev2simulator.connection.message.bulk_data_request import BulkDataRequest
 from ev3dev2simulator.connection.message.data_request import DataRequest
 from ev3dev2simulator.connection.message.led_command import LedCommand
+from ev3dev2simulator.connection.message.multi_rotate_command import MultiRotateCommand
 from ev3dev2simulator.connection.message.rotate_command import RotateCommand
+from ev3dev2simulator.connection.message.stop_command import StopCommand
 from ev3dev2simulator.connection.message.sound_command import SoundCommand
+from ev3dev2simulator.connection.message.motor_state_request import MotorStateRequest
+from ev3dev2simulator.connection.message.subscribe_request import SubscribeRequest
+from ev3dev2simulator.connection.message.watch_request import WatchRequest
+from ev3dev2simulator.state.robot_simulator import RobotSimulator
+from ev3dev2simulator.state.robot_state import RobotState
+from ev3dev2simulator.state.simulation_clock import PendingResult
 
 from tests.ev3dev2.simulator.connection.test_ServerSocket import create_robot_sim
+from tests.ev3dev2.simulator.state.test_RobotState import TestRobotState
 
 wheel_circumference = 175.92918860
 
@@ -73,6 +82,26 @@ class MessageProcessorTest(unittest.TestCase):
         jobs = robot_sim.next_actuator_jobs()
         self.assertEqual((jobs[0][1], jobs[1][1], jobs[2][1], jobs[3][1]), (None, None, None, None))
 
+    def test_create_jobs_multi_rotate(self):
+        robot_sim = create_robot_sim()
+        robot_sim.next_actuator_jobs()
+
+        message_processor = MessageProcessor(0, robot_sim)
+        run_times = message_processor.process_multi_rotate_command(MultiRotateCommand([
+            RotateCommand('ev3-ports:outA', 360, 360, 'hold'),
+            RotateCommand('ev3-ports:outD', 180, 180, 'hold'),
+            StopCommand('ev3-ports:outB', 0, 'hold')]))
+        self.assertListEqual(run_times, [1.0, 1.0, 0.0])
+
+        # both wheels start in the same frame and stop in the same frame
+        for i in range(30):
+            jobs = robot_sim.next_actuator_jobs()
+            self.assertAlmostEqual(jobs[1][1], wheel_circumference / 30, 3)
+            self.assertAlmostEqual(jobs[2][1], wheel_circumference / 60, 3)
+        jobs = robot_sim.next_actuator_jobs()
+        self.assertEqual((jobs[1][1], jobs[2][1]), (None, None))
+        self.assertEqual(robot_sim.actuator_idle[(0, 'ev3-ports:outB')], 1)
+
     def test_create_jobs_coast_center(self):
         coasting_sub = get_simulation_settings()['motor_settings']['degree_coasting_subtraction']
         robot_sim = create_robot_sim()
@@ -173,12 +202,105 @@ class MessageProcessorTest(unittest.TestCase):
     def test_process_data_request(self):
         robot_sim = create_robot_sim()
         robot_sim.robot.values[(1, 'ev3-ports:in4')] = 10
-        robot_sim.locks[(1, 'ev3-ports:in4')] = threading.Lock()
+        robot_sim.publish_values()
 
         message_processor = MessageProcessor(1, robot_sim)
         value = message_processor.process_data_request(DataRequest('ev3-ports:in4'))
+        self.assertDictEqual(value, {'value': 10, 'frame': 0})
+
+        pending = message_processor.process_data_request(DataRequest('ev3-ports:in4', 4))
+        self.assertEqual(pending.frame, 5)
+
+    def test_process_subscribe_request(self):
+        robot_sim = create_robot_sim()
+        for address, value in [('ev3-ports:in1', False), ('ev3-ports:in4', 10)]:
+            robot_sim.robot.sensors[(1, address)] = None
+            robot_sim.robot.values[(1, address)] = value
+        robot_sim.robot.sensors[(0, 'ev3-ports:in1')] = None
+
+        message_processor = MessageProcessor(1, robot_sim)
+        response = message_processor.process_subscribe_request(SubscribeRequest('ev3-ports:in4'))
+        self.assertDictEqual(response, {'frame': 0, 'values': {'ev3-ports:in4': 10}})
+        self.assertDictEqual(message_processor.collect_sensor_updates(), {})
+
+        robot_sim.robot.values[(1, 'ev3-ports:in1')] = True
+        robot_sim.robot.values[(1, 'ev3-ports:in4')] = 12
+        self.assertDictEqual(message_processor.collect_sensor_updates(), {'ev3-ports:in4': 12})
+        self.assertDictEqual(message_processor.collect_sensor_updates(), {})
+
+        response = message_processor.process_subscribe_request(SubscribeRequest())
+        self.assertDictEqual(response['values'], {'ev3-ports:in1': True, 'ev3-ports:in4': 12})
+
+        message_processor.clear_subscriptions()
+        robot_sim.robot.values[(1, 'ev3-ports:in4')] = 13
+        self.assertDictEqual(message_processor.collect_sensor_updates(), {})
+
+    def test_subscribe_to_motor(self):
+        robot_sim = create_robot_sim()
+        message_processor = MessageProcessor(0, robot_sim)
+        response = message_processor.process_subscribe_request(SubscribeRequest('ev3-ports:outA'))
+        self.assertDictEqual(response, {'frame': 0, 'values': {'ev3-ports:outA': 0, 'ev3-ports:outA/position': 0,
+                                                               'ev3-ports:outA/speed': 0}})
+
+        robot_sim.actuator_idle[(0, 'ev3-ports:outA')] = 1
+        self.assertDictEqual(message_processor.collect_sensor_updates(), {'ev3-ports:outA': 1})
+
+        robot_sim.tacho_counts[(0, 'ev3-ports:outA')] = 12.4
+        robot_sim.tacho_speeds[(0, 'ev3-ports:outA')] = 300.0
+        self.assertDictEqual(message_processor.collect_sensor_updates(),
+                             {'ev3-ports:outA/position': 12, 'ev3-ports:outA/speed': 300})
+
+    def test_watch_sensors(self):
+        robot_sim = RobotSimulator(RobotState(TestRobotState.default_config()))
+        message_processor = MessageProcessor(0, robot_sim)
+        other_processor = MessageProcessor(0, robot_sim)
+
+        message_processor.process_watch_request(WatchRequest('ev3-ports:in4'))
+        message_processor.process_subscribe_request(SubscribeRequest('ev3-ports:in4'))
+        message_processor.process_watch_request(WatchRequest('ev3-ports:outA'))
+        self.assertEqual(robot_sim.watched_sensors, {(0, 'ev3-ports:in4'): 1})
+
+        other_processor.process_subscribe_request(SubscribeRequest())
+        self.assertEqual(robot_sim.watched_sensors, {(0, 'ev3-ports:in4'): 2})
+
+        message_processor.clear_subscriptions()
+        self.assertEqual(robot_sim.watched_sensors, {(0, 'ev3-ports:in4'): 1})
+        other_processor.clear_subscriptions()
+        self.assertEqual(robot_sim.watched_sensors, {})
+
+    def test_process_bulk_data_request(self):
+        robot_sim = RobotSimulator(RobotState(TestRobotState.default_config()))
+        robot_sim.robot.values[(0, 'ev3-ports:in1')] = 3
+        robot_sim.publish_values()
+        message_processor = MessageProcessor(0, robot_sim)
+
+        response = message_processor.process_bulk_data_request(BulkDataRequest(['ev3-ports:in1', 'ev3-ports:in4']))
+        self.assertDictEqual(response, {'values': {'ev3-ports:in1': 3, 'ev3-ports:in4': 2550}, 'frame': 0})
+        response = message_processor.process_bulk_data_request(BulkDataRequest())
+        self.assertDictEqual(response, {'values': {'ev3-ports:in4': 2550}, 'frame': 0})
+
+        pending = message_processor.process_bulk_data_request(BulkDataRequest(newer_than=0))
+        self.assertIsInstance(pending, PendingResult)
+        self.assertEqual(pending.frame, 1)
+        self.assertIn((0, 'ev3-ports:in4'), robot_sim.requested_sensors)
+
+        robot_sim.sensor_frames[(0, 'ev3-ports:in4')] = 1
+        robot_sim.publish_values()
+        robot_sim.clock.tick()
+        self.assertDictEqual(pending.resume(), {'values': {'ev3-ports:in4': 2550}, 'frame': 1})
+
+    def test_process_motor_state_request(self):
+        robot_sim = create_robot_sim()
+        robot_sim.tacho_counts[(0, 'ev3-ports:outA')] = 359.6
+        robot_sim.tacho_speeds[(0, 'ev3-ports:outA')] = -90.0
+
+        message_processor = MessageProcessor(0, robot_sim)
+        response = message_processor.process_motor_state_request(MotorStateRequest('ev3-ports:outA'))
+        self.assertDictEqual(response, {'ev3-ports:outA': {'position': 360, 'speed': -90}})
 
-        self.assertEqual(value, 10)
+        response = message_processor.process_motor_state_request(MotorStateRequest())
+        self.assertDictEqual(response['ev3-ports:outD'], {'position': 0, 'speed': 0})
+        self.assertDictEqual(MessageProcessor(1, robot_sim).process_motor_state_request(MotorStateRequest()), {})
 
 
 if __name__ == '__main__':
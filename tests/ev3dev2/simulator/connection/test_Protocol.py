@@ -0,0 +1,95 @@
+import socket
+import unittest
+
+from ev3dev2simulator.connection.message.bulk_data_request import BulkDataRequest
+from ev3dev2simulator.connection.message.config_request import ConfigRequest
+from ev3dev2simulator.connection.message.data_request import DataRequest
+from ev3dev2simulator.connection.message.multi_rotate_command import MultiRotateCommand
+from ev3dev2simulator.connection.message.rotate_command import RotateCommand
+from ev3dev2simulator.connection.message.sleep_request import SleepRequest
+from ev3dev2simulator.connection.message.motor_state_request import MotorStateRequest
+from ev3dev2simulator.connection.message.watch_request import WatchRequest
+from ev3dev2simulator.connection.message.stop_command import StopCommand
+from ev3dev2simulator.connection.message.subscribe_request import SubscribeRequest
+from ev3dev2simulator.connection.message.time_request import TimeRequest
+from ev3dev2simulator.connection.protocol import BinaryCodec, JsonCodec, get_codec, send_frame
+from ev3dev2simulator.connection.transport import StreamConnection
+
+
+class TestProtocol(unittest.TestCase):
+
+    def test_frames(self):
+        first, second = socket.socketpair()
+        send_frame(first, b'one')
+        send_frame(first, b'')
+        send_frame(first, b'x' * 5000)
+        first.close()
+
+        connection = StreamConnection(second)
+        self.assertEqual(connection.receive_frame(), b'one')
+        self.assertEqual(connection.receive_frame(), b'')
+        self.assertEqual(connection.receive_frame(), b'x' * 5000)
+        self.assertIsNone(connection.receive_frame())
+        connection.close()
+
+    def test_binary_messages(self):
+        codec = BinaryCodec()
+        commands = [RotateCommand('ev3-ports:outA', 500.0, 100.0, 'hold'),
+                    RotateCommand('ev3-ports:outD', 500.0, 100.0, None),
+                    ConfigRequest({'driver_name': ['lego-ev3-us'], 'address': 'ev3-ports:in2'}, None),
+                    SleepRequest(0.25),
+                    DataRequest('ev3-ports:in1'),
+                    DataRequest('ev3-ports:in1', 42),
+                    BulkDataRequest(['ev3-ports:in1', 'ev3-ports:in2']),
+                    BulkDataRequest(newer_than=42),
+                    SubscribeRequest('ev3-ports:in1'),
+                    SubscribeRequest(),
+                    MotorStateRequest('ev3-ports:outA'),
+                    WatchRequest('ev3-ports:in2'),
+                    MultiRotateCommand([RotateCommand('ev3-ports:outA', 100, 360, 'hold'),
+                                        StopCommand('ev3-ports:outD', 0, 'coast')]),
+                    TimeRequest()]
+
+        for command in commands:
+            self.assertDictEqual(codec.decode_message(codec.encode_message(command.serialize())),
+                                 command.serialize())
+
+    def test_binary_responses(self):
+        codec = BinaryCodec()
+        for value in [None, True, 12, 0.5, 'dev_not_connected', {'time': 1.5, 'speed': 0, 'lock_step': True}]:
+            self.assertEqual(codec.decode_response(codec.encode_response(value)), value)
+
+    def test_binary_long_strings(self):
+        codec = BinaryCodec()
+        for length in [0xFFFF, 0x10000, 100000]:
+            value = 'x' * length
+            self.assertEqual(codec.decode_response(codec.encode_response(value)), value)
+            command = ConfigRequest({'driver_name': ['lego-ev3-us'], 'text': value}, 'SoundConnector')
+            self.assertDictEqual(codec.decode_message(codec.encode_message(command.serialize())),
+                                 command.serialize())
+
+    def test_json_responses(self):
+        codec = JsonCodec()
+        self.assertEqual(codec.encode_response(15), b'{"value": 15}')
+        self.assertEqual(codec.decode_response(b'{"value": 15}'), 15)
+
+    def test_push(self):
+        for codec in [BinaryCodec(), JsonCodec()]:
+            push = codec.encode_push(12, {'ev3-ports:in1': True, 'ev3-ports:in2': 3, 'ev3-ports:in3': None})
+            self.assertEqual(codec.decode_push(push), (12, {'ev3-ports:in1': 1, 'ev3-ports:in2': 3,
+                                                            'ev3-ports:in3': None}))
+            self.assertIsNone(codec.decode_push(codec.encode_response({'push': 1})))
+
+    def test_json_push_key_order(self):
+        codec = JsonCodec()
+        push = b'{ "push": {"values": {"ev3-ports:in1": 2}, "frame": 4}}'
+        self.assertEqual(codec.decode_push(push), (4, {'ev3-ports:in1': 2}))
+        self.assertIsNone(codec.decode_push(b'{"value": {"push": 1}}'))
+
+    def test_get_codec(self):
+        self.assertEqual(get_codec('binary').name, 'binary')
+        self.assertEqual(get_codec('unknown').name, 'json')
+
+
+if __name__ == '__main__':
+    unittest.main()
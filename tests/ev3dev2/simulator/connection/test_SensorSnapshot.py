@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+from ev3dev2simulator.connection.sensor_snapshot import SensorSnapshot, SnapshotPublisher
+from tests.ev3dev2.simulator.connection.test_ServerSocket import create_robot_sim
+
+
+class SensorSnapshotTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        descriptor, self.path = tempfile.mkstemp(prefix='ev3dev2simulator-test-')
+        os.close(descriptor)
+
+    def tearDown(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_publish_and_read(self):
+        writer = SensorSnapshot(self.path, 3)
+        reader = SensorSnapshot(self.path)
+
+        writer.publish(12, {'time': 0.4, 'speed': 2.0, 'lock_step': False}, [True, 3, None])
+
+        self.assertEqual(reader.read_value(0), (1.0, 12))
+        self.assertEqual(reader.read_value(1), (3.0, 12))
+        self.assertEqual(reader.read_value(2), (None, 12))
+        self.assertDictEqual(reader.read_status(), {'frame': 12, 'time': 0.4, 'speed': 2.0, 'lock_step': False})
+
+        writer.publish(13, {'time': 13 / 30, 'speed': 0, 'lock_step': True}, [False, 5, 255.5])
+        self.assertEqual(reader.read_value(2), (255.5, 13))
+        self.assertTrue(reader.read_status()['lock_step'])
+
+        reader.close()
+        writer.close()
+
+    def test_publisher_assigns_indices(self):
+        robot_sim = create_robot_sim()
+        robot_sim.robot.sensors[(0, 'ev3-ports:in1')] = None
+        robot_sim.robot.sensors[(0, 'ev3-ports:in2')] = None
+        robot_sim.robot.values[(0, 'ev3-ports:in1')] = True
+        robot_sim.robot.values[(0, 'ev3-ports:in2')] = 6
+
+        publisher = SnapshotPublisher([robot_sim], self.path)
+        indices = publisher.get_indices('test_bot', 0)
+        self.assertDictEqual(indices, {'ev3-ports:in1': 0, 'ev3-ports:in2': 1})
+        self.assertDictEqual(publisher.get_indices('test_bot', 1), {})
+
+        reader = SensorSnapshot(self.path)
+        self.assertEqual(reader.read_value(indices['ev3-ports:in2']), (6.0, 0))
+
+        robot_sim.robot.values[(0, 'ev3-ports:in2')] = 2
+        robot_sim.clock.add_tick_listener(publisher.publish, early=True)
+        robot_sim.clock.tick()
+        self.assertEqual(reader.read_value(indices['ev3-ports:in2']), (2.0, 1))
+        self.assertAlmostEqual(reader.read_status()['time'], 1 / 30)
+        reader.close()
+
+    def test_publisher_assigns_motor_indices(self):
+        robot_sim = create_robot_sim()
+        robot_sim.robot.sensors[(0, 'ev3-ports:in1')] = None
+        robot_sim.robot.values[(0, 'ev3-ports:in1')] = True
+
+        publisher = SnapshotPublisher([robot_sim], self.path)
+        indices = publisher.get_motor_indices('test_bot', 0)
+        self.assertListEqual(indices['ev3-ports:outA'], [1, 2])
+
+        robot_sim.tacho_counts[(0, 'ev3-ports:outA')] = 42.0
+        robot_sim.tacho_speeds[(0, 'ev3-ports:outA')] = 1260.0
+        publisher.publish(1)
+
+        reader = SensorSnapshot(self.path)
+        self.assertEqual(reader.read_values(indices['ev3-ports:outA']), ([42.0, 1260.0], 1))
+        reader.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,12 @@
 import json
-import threading
+import socket
 import unittest
 # based on scaling_multiplier: 0.60
 from typing import Any
 
 from ev3dev2simulator.config.config import get_simulation_settings, load_config
 from ev3dev2simulator.connection.client_socket_handler import ClientSocketHandler
+from ev3dev2simulator.connection.transport import StreamConnection
 from ev3dev2simulator.state.robot_simulator import RobotState, RobotSimulator
 
 load_config(None)
@@ -133,11 +134,61 @@ class ServerSocketTest(unittest.TestCase):
 
         server = create_client_socket_handler()
         server.robot_sim.robot.values[(0, 'ev3-ports:in4')] = 10
-        server.robot_sim.locks[(0, 'ev3-ports:in4')] = threading.Lock()
+        server.robot_sim.publish_values()
         data = server.message_handler._process_data_request(d)
         val = self._deserialize(data)
 
-        self.assertEqual(val, 10)
+        self.assertDictEqual(val, {'value': 10, 'frame': 0})
+
+    def test_process_time_request(self):
+        server = create_client_socket_handler()
+        server.robot_sim.clock.frame = 45
+        server.robot_sim.clock.speed = 20.0
+        data = server.message_handler.process(b'{"type": "TimeRequest"}')
+        val = self._deserialize(data)
+
+        self.assertDictEqual(val, {'time': 1.5, 'speed': 20.0, 'lock_step': False})
+
+    def test_process_sleep_request(self):
+        server = create_client_socket_handler()
+        clock = server.robot_sim.clock
+        clock.lock_step = True
+
+        pending = server.message_handler.process(b'{"type": "SleepRequest", "seconds": 0.1}')
+        self.assertEqual(pending.frame, 3)
+
+        for _ in range(3):
+            clock.tick()
+        val = self._deserialize(pending.resume())
+
+        self.assertDictEqual(val, {'time': 0.1, 'speed': 0, 'lock_step': True})
+
+    def test_pending_data_request(self):
+        server = create_client_socket_handler()
+        client, server_end = socket.socketpair()
+        client = StreamConnection(client)
+        server.client = StreamConnection(server_end)
+        server.robot_sim.robot.values[(0, 'ev3-ports:in4')] = 10
+        server.robot_sim.publish_values()
+        server.robot_sim.clock.add_participant(server.participant)
+
+        request = b'{"type": "DataRequest", "address": "ev3-ports:in4"}'
+        newer_request = b'{"type": "DataRequest", "address": "ev3-ports:in4", "newer_than": 0}'
+        server.receive([request, newer_request])
+        self.assertDictEqual(self._deserialize(client.receive_frame()), {'value': 10, 'frame': 0})
+        self.assertEqual(server.pending.frame, 1)
+        self.assertFalse(server.is_resumable())
+        self.assertTrue(server.robot_sim.clock.wait_for_step(0))
+
+        server.robot_sim.robot.values[(0, 'ev3-ports:in4')] = 11
+        server.robot_sim.sensor_frames[(0, 'ev3-ports:in4')] = 1
+        server.robot_sim.publish_values()
+        server.robot_sim.clock.tick()
+        self.assertTrue(server.is_resumable())
+        server.resume()
+        self.assertDictEqual(self._deserialize(client.receive_frame()), {'value': 11, 'frame': 1})
+        self.assertIsNone(server.pending)
+        client.close()
 
     @staticmethod
     def _deserialize(data: bytes) -> Any:
@@ -1,9 +1,161 @@
+import json
+import socket
+import threading
+import time
 import unittest
+from unittest.mock import MagicMock
 
+from ev3dev2simulator.connection.protocol import get_codec
+from ev3dev2simulator.connection.server_sockets import ServerSockets
+from ev3dev2simulator.connection.transport import StreamConnection
+from tests.ev3dev2.simulator.connection.test_ServerSocket import create_robot_sim
 
-class ServerSockets(unittest.TestCase):
-    def test_something(self):
-        self.assertEqual(True, True)
+# more responses than fit in the buffers of the sockets
+REQUESTS = 120000
+
+
+class ServerSocketsTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        robot_sim = create_robot_sim()
+        world_simulator = MagicMock()
+        world_simulator.robot_simulators = [robot_sim]
+        world_simulator.clock = robot_sim.clock
+        self.server_sockets = ServerSockets(world_simulator)
+
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(('localhost', 0))
+        server.listen(5)
+        self.address = server.getsockname()
+
+        self.loop = threading.Thread(target=self.server_sockets.handle_sockets, args=(server,), daemon=True)
+        self.loop.start()
+
+    def tearDown(self) -> None:
+        self.server_sockets.stop()
+        self.loop.join(1)
+
+    def connect(self, hello: dict):
+        client = StreamConnection(socket.create_connection(self.address))
+        client.send(str.encode(json.dumps(hello)))
+        return client, json.loads(client.receive_frame().decode())
+
+    def test_handshake_names_brick(self):
+        client, answer = self.connect({'robot': 'test_bot', 'brick': 'brick-left', 'codec': 'binary'})
+        snapshot = answer.pop('snapshot')
+        devices = answer.pop('devices')
+        self.assertDictEqual(answer, {'robot': 'test_bot', 'brick': 'brick-left', 'codec': 'binary'})
+        self.assertIn({'address': 'ev3-ports:outA', 'driver_name': 'lego-ev3-l-motor', 'class': 'motor'}, devices)
+        self.assertEqual(snapshot['path'], self.server_sockets.snapshot_publisher.snapshot.path)
+        self.assertDictEqual(snapshot['indices'], {})
+
+        codec = get_codec('binary')
+        client.send(codec.encode_message({'type': 'TimeRequest'}))
+        self.assertEqual(codec.decode_response(client.receive_frame())['time'], 0)
+        client.close()
+
+    def test_handshake_unknown_brick(self):
+        client, answer = self.connect({'robot': 'test_bot', 'brick': 'brick-right', 'codec': 'json'})
+        self.assertIn('error', answer)
+        self.assertIsNone(client.receive_frame())
+        client.close()
+
+    def test_handshake_malformed_hello(self):
+        for hello in (b'not json', b'["test_bot"]', b'{"robot": ["test_bot"]}', b'\xff'):
+            client = StreamConnection(socket.create_connection(self.address))
+            client.send(hello)
+            self.assertIsNone(client.receive_frame())
+            client.close()
+
+        # the server keeps accepting other connections
+        client, answer = self.connect({'robot': 'test_bot', 'brick': 'brick-left', 'codec': 'json'})
+        self.assertEqual(answer['brick'], 'brick-left')
+        client.close()
+
+    def test_client_not_reading(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        sock.connect(self.address)
+        client = StreamConnection(sock)
+        client.send(str.encode(json.dumps({'robot': 'test_bot', 'brick': 'brick-left', 'codec': 'binary'})))
+        client.receive_frame()
+        codec = get_codec('binary')
+
+        # the client sends requests without reading any response, until the simulator has queued a lot of them
+        request = codec.encode_message({'type': 'TimeRequest'})
+        client.sock.sendall(b''.join(len(request).to_bytes(4, 'big') + request for _ in range(REQUESTS)))
+        connection = self.server_sockets.brick_sockets[('test_bot', 'brick-left')].client
+        deadline = time.time() + 5
+        while not connection.wants_writable() and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(connection.wants_writable())
+
+        # the event loop is not blocked by it and still handles other connections
+        other = StreamConnection(socket.create_connection(self.address))
+        other.sock.settimeout(5)
+        other.send(str.encode(json.dumps({'robot': 'test_bot', 'brick': 'brick-left'})))
+        self.assertIn('error', json.loads(other.receive_frame().decode()))
+        other.close()
+
+        client.sock.settimeout(5)
+        for _ in range(REQUESTS):
+            self.assertEqual(codec.decode_response(client.receive_frame())['time'], 0)
+        client.close()
+
+    def test_brick_connects_once(self):
+        first, answer = self.connect({'robot': None, 'brick': None, 'codec': 'unknown'})
+        self.assertEqual(answer['brick'], 'brick-left')
+        self.assertEqual(answer['codec'], 'json')
+
+        second, answer = self.connect({'robot': None, 'brick': 'brick-left', 'codec': 'json'})
+        self.assertIn('error', answer)
+        first.close()
+        second.close()
+
+    def test_sleep_request_waits_for_frames(self):
+        client, _ = self.connect({'robot': 'test_bot', 'brick': 'brick-left', 'codec': 'json'})
+        client.send(b'{"type": "SleepRequest", "seconds": 0.05}')
+
+        clock = self.server_sockets.word_simulator.clock
+        client.sock.settimeout(0.1)
+        self.assertRaises(socket.timeout, client.receive_frame)
+
+        clock.tick()
+        clock.tick()
+        client.sock.settimeout(1)
+        self.assertEqual(json.loads(client.receive_frame().decode())['value']['time'], 2 / 30)
+        client.close()
+
+    def test_subscription_pushes_changes(self):
+        robot_sim = self.server_sockets.word_simulator.robot_simulators[0]
+        robot_sim.robot.sensors[(0, 'ev3-ports:in1')] = None
+        robot_sim.robot.values[(0, 'ev3-ports:in1')] = False
+
+        client, _ = self.connect({'robot': 'test_bot', 'brick': 'brick-left', 'codec': 'binary'})
+        codec = get_codec('binary')
+        client.send(codec.encode_message({'type': 'SubscribeRequest', 'address': None}))
+        self.assertDictEqual(codec.decode_response(client.receive_frame()),
+                             {'frame': 0, 'values': {'ev3-ports:in1': False, 'ev3-ports:outA': 0,
+                                                     'ev3-ports:outA/position': 0, 'ev3-ports:outA/speed': 0,
+                                                     'ev3-ports:outB': 0, 'ev3-ports:outB/position': 0,
+                                                     'ev3-ports:outB/speed': 0, 'ev3-ports:outD': 0,
+                                                     'ev3-ports:outD/position': 0, 'ev3-ports:outD/speed': 0}})
+
+        clock = self.server_sockets.word_simulator.clock
+        clock.tick()
+        robot_sim.robot.values[(0, 'ev3-ports:in1')] = True
+        clock.tick()
+        client.sock.settimeout(1)
+        self.assertEqual(codec.decode_push(client.receive_frame()), (2, {'ev3-ports:in1': 1}))
+
+        client.send(codec.encode_message({'type': 'SleepRequest', 'seconds': 0.01}))
+        while not clock.waiting:
+            time.sleep(0.001)
+        robot_sim.robot.values[(0, 'ev3-ports:in1')] = False
+        clock.tick()
+        self.assertEqual(codec.decode_push(client.receive_frame()), (3, {'ev3-ports:in1': 0}))
+        self.assertIsNone(codec.decode_push(client.receive_frame()))
+        client.close()
 
 
 if __name__ == '__main__':
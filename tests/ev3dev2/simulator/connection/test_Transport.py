@@ -0,0 +1,142 @@
+import os
+import select
+import tempfile
+import threading
+import unittest
+
+from ev3dev2simulator.connection.transport import RingBuffer, SharedMemoryTransport, UnixTransport
+
+
+class TestTransport(unittest.TestCase):
+
+    def test_ring_buffer_wraps(self):
+        descriptor, path = tempfile.mkstemp()
+        os.close(descriptor)
+        writer = RingBuffer(path, 16)
+        reader = RingBuffer(path)
+        os.remove(path)
+
+        for i in range(5):
+            data = bytes(range(i, i + 12))
+            self.assertEqual(writer.write(data), 12)
+            self.assertEqual(reader.read(12), data)
+
+        # only what fits is written
+        self.assertEqual(writer.write(bytes(20)), 16)
+        self.assertEqual(reader.available(), 16)
+
+        writer.close()
+        reader.close()
+
+    def check_transport(self, transport):
+        server = transport.listen()
+        client = transport.connect()
+        accepted = transport.accept(server)
+
+        client.send(b'request')
+        client.send(b'second request')
+        self.assertEqual(accepted.receive_frame(), b'request')
+        self.assertEqual(accepted.receive_frame(), b'second request')
+
+        accepted.send(b'response')
+        self.assertEqual(client.receive_frame(), b'response')
+
+        client.close()
+        self.assertIsNone(accepted.receive())
+        accepted.close()
+        server.close()
+        os.remove(transport.path)
+
+    def test_unix(self):
+        self.check_transport(UnixTransport({'socket_path': f'ev3dev2simulator-test-{os.getpid()}.sock'}))
+
+    def test_shared_memory(self):
+        self.check_transport(SharedMemoryTransport({'socket_path': f'ev3dev2simulator-test-{os.getpid()}.sock'}))
+
+    def test_shared_memory_frames_before_accept(self):
+        transport = SharedMemoryTransport({'socket_path': f'ev3dev2simulator-test-{os.getpid()}.sock'})
+        server = transport.listen()
+        client = transport.connect()
+        client.send(b'hello')
+        client.send(b'request')
+
+        # the paths of the buffers and the wake ups of both frames arrive together
+        accepted = transport.accept(server)
+        self.assertEqual(accepted.receive(), [b'hello', b'request'])
+
+        client.close()
+        accepted.close()
+        server.close()
+        os.remove(transport.path)
+
+    def test_shared_memory_large_frame(self):
+        transport = SharedMemoryTransport({'socket_path': f'ev3dev2simulator-test-{os.getpid()}.sock'})
+        server = transport.listen()
+        client = transport.connect()
+        accepted = transport.accept(server)
+
+        # the frames do not fit in the ring buffers, so they are written while the receiver reads them
+        payload = bytes(range(256)) * 1024
+        sender = threading.Thread(target=client.send, args=(payload,))
+        sender.start()
+        self.assertEqual(accepted.receive_frame(), payload)
+        sender.join(1)
+
+        # the simulator does not block, it writes the rest when the client tells it emptied the buffer
+        accepted.send(payload * 2)
+        self.assertTrue(accepted.queued)
+        flusher = threading.Thread(target=self.flush_until_sent, args=(accepted,))
+        flusher.start()
+        self.assertEqual(client.receive_frame(), payload * 2)
+        flusher.join(1)
+        self.assertFalse(accepted.queued)
+
+        client.close()
+        accepted.close()
+        server.close()
+        os.remove(transport.path)
+
+    @staticmethod
+    def flush_until_sent(connection):
+        """
+        Flush the given connection of the simulator whenever it is woken up, like the event loop does.
+        """
+        while connection.queued:
+            select.select([connection], [connection] if connection.wants_writable() else [], [], 1)
+            connection.receive()
+            connection.flush()
+
+    def test_stream_send_does_not_block(self):
+        transport = UnixTransport({'socket_path': f'ev3dev2simulator-test-{os.getpid()}.sock'})
+        server = transport.listen()
+        client = transport.connect()
+        accepted = transport.accept(server)
+
+        # the client does not read, so most of the frame is queued instead of blocking the simulator
+        payload = bytes(range(256)) * 8192
+        accepted.send(payload)
+        self.assertTrue(accepted.wants_writable())
+
+        flusher = threading.Thread(target=self.flush_until_sent, args=(accepted,))
+        flusher.start()
+        self.assertEqual(client.receive_frame(), payload)
+        flusher.join(1)
+        self.assertFalse(accepted.wants_writable())
+
+        client.close()
+        accepted.close()
+        server.close()
+        os.remove(transport.path)
+
+    def test_shared_memory_connect_fails(self):
+        transport = SharedMemoryTransport({'socket_path': f'ev3dev2simulator-test-{os.getpid()}.sock'})
+        directory = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+        before = set(os.listdir(directory))
+
+        # nobody listens, the ring buffers created for the connection are removed again
+        self.assertRaises(OSError, transport.connect)
+        self.assertSetEqual(set(os.listdir(directory)) - before, set())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from ev3dev2simulator.connector.clock_connector import ClockConnector
+
+
+class ClockConnectorTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.get_client_socketPatcher = patch('ev3dev2simulator.connector.clock_connector.get_client_socket')
+        self.get_client_socketMock = self.get_client_socketPatcher.start()
+        self.addCleanup(self.get_client_socketPatcher.stop)
+
+        self.clientSocketMock = MagicMock()
+        self.clientSocketMock.snapshot = None
+        self.get_client_socketMock.return_value = self.clientSocketMock
+
+    def test_time(self):
+        self.clientSocketMock.send_command.return_value = {'time': 2.5, 'speed': 1.0}
+
+        clock = ClockConnector()
+        self.assertEqual(clock.time(), 2.5)
+
+        fn_name, args, kwargs = self.clientSocketMock.mock_calls[0]
+        self.assertEqual(fn_name, 'send_command')
+        self.assertDictEqual(args[0].serialize(), {'type': 'TimeRequest'})
+
+    @patch('ev3dev2simulator.connector.clock_connector.time')
+    def test_sleep_follows_simulated_time(self, time_mock):
+        statuses = [{'time': 1.0, 'speed': 20.0}, {'time': 1.4, 'speed': 20.0}, {'time': 2.0, 'speed': 20.0}]
+        self.clientSocketMock.send_command.side_effect = statuses
+
+        clock = ClockConnector()
+        clock.sleep(1)
+
+        self.assertEqual(self.clientSocketMock.send_command.call_count, 3)
+        self.assertAlmostEqual(time_mock.sleep.call_args_list[0][0][0], 1 / 20)
+        self.assertAlmostEqual(time_mock.sleep.call_args_list[1][0][0], 0.6 / 20)
+
+    @patch('ev3dev2simulator.connector.clock_connector.time')
+    def test_sleep_lock_step(self, time_mock):
+        statuses = [{'time': 1.0, 'speed': 0, 'lock_step': True}, {'time': 1.5, 'speed': 0, 'lock_step': True}]
+        self.clientSocketMock.send_command.side_effect = statuses
+
+        clock = ClockConnector()
+        clock.sleep(0.5)
+
+        self.assertEqual(self.clientSocketMock.send_command.call_count, 2)
+        fn_name, args, kwargs = self.clientSocketMock.mock_calls[1]
+        self.assertDictEqual(args[0].serialize(), {'type': 'SleepRequest', 'seconds': 0.5})
+        time_mock.sleep.assert_not_called()
+
+    def test_time_from_snapshot(self):
+        self.clientSocketMock.snapshot = MagicMock()
+        self.clientSocketMock.snapshot.read_status.return_value = {'frame': 45, 'time': 1.5, 'speed': 1.0,
+                                                                   'lock_step': False}
+
+        clock = ClockConnector()
+        self.assertEqual(clock.time(), 1.5)
+        self.assertEqual(self.clientSocketMock.send_command.call_count, 0)
+
+    def test_sleep_nothing(self):
+        clock = ClockConnector()
+        clock.sleep(0)
+        self.assertEqual(self.clientSocketMock.send_command.call_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,7 @@ from unittest.mock import patch, MagicMock
 from ev3dev2 import auto as ev3, DeviceNotFound
 from ev3dev2.sensor.lego import UltrasonicSensor
 from ev3dev2simulator.config.config import load_config
+from ev3dev2simulator.connection.device_table import DeviceTable
 
 load_config(None)
 
@@ -15,6 +16,7 @@ class TestDeviceConnector(unittest.TestCase):
             with patch('ev3dev2simulator.connector.sensor_connector.get_client_socket') as get_client_socketMock:
                 mock_instance = MagicMock()
                 Device_get_client_socketMock.return_value = mock_instance
+                mock_instance.devices = None
                 mock_instance.send_command.return_value = 'ev3-ports:in3'
 
                 us = UltrasonicSensor(ev3.INPUT_1)
@@ -25,6 +27,7 @@ class TestDeviceConnector(unittest.TestCase):
             with patch('ev3dev2simulator.connector.sensor_connector.get_client_socket') as get_client_socketMock:
                 mock_instance = MagicMock()
                 Device_get_client_socketMock.return_value = mock_instance
+                mock_instance.devices = None
                 mock_instance.send_command.return_value = 'dev_not_connected'
 
                 self.assertRaises(DeviceNotFound, UltrasonicSensor, ev3.INPUT_1)
@@ -34,6 +37,7 @@ class TestDeviceConnector(unittest.TestCase):
             with patch('ev3dev2simulator.connector.sensor_connector.get_client_socket') as get_client_socketMock:
                 mock_instance = MagicMock()
                 Device_get_client_socketMock.return_value = mock_instance
+                mock_instance.devices = None
                 mock_instance.send_command.return_value = 'ev3-ports:in1'
 
                 us = UltrasonicSensor()
@@ -45,9 +49,23 @@ class TestDeviceConnector(unittest.TestCase):
             with patch('ev3dev2simulator.connector.sensor_connector.get_client_socket') as get_client_socketMock:
                 mock_instance = MagicMock()
                 Device_get_client_socketMock.return_value = mock_instance
+                mock_instance.devices = None
                 mock_instance.send_command.return_value = 'dev_not_connected'
 
                 self.assertRaises(DeviceNotFound, UltrasonicSensor)
 
+    def test_determine_port_from_device_table(self):
+        with patch('ev3dev2simulator.connector.device_connector.get_client_socket') as Device_get_client_socketMock:
+            with patch('ev3dev2simulator.connector.sensor_connector.get_client_socket') as get_client_socketMock:
+                mock_instance = MagicMock()
+                Device_get_client_socketMock.return_value = mock_instance
+                mock_instance.devices = DeviceTable([
+                    {'address': 'ev3-ports:in2', 'driver_name': 'lego-ev3-us', 'class': 'ultrasonic_sensor'}])
+
+                us = UltrasonicSensor()
+                self.assertEqual(us.address, 'ev3-ports:in2')
+                self.assertRaises(DeviceNotFound, UltrasonicSensor, ev3.INPUT_1)
+                mock_instance.send_command.assert_not_called()
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,11 +1,12 @@
 import sys
 import unittest
-from time import sleep
+from time import sleep, time
 
 from unittest.mock import MagicMock, patch
 
 from ev3dev2._platform.ev3 import INPUT_2, INPUT_1
 from ev3dev2simulator.config.config import load_config
+from ev3dev2simulator.connector.sensor_connector import SensorConnector
 from ev3dev2.sensor.lego import ColorSensor, TouchSensor
 
 load_config(None)
@@ -24,14 +25,25 @@ class SensorConnectorTest(unittest.TestCase):
         self.addCleanup(self.get_client_socketPatcher.stop)
 
         self.deviceClientSocketMock = MagicMock()
+        self.deviceClientSocketMock.devices = None
         self.get_device_client_socketMock.return_value = self.deviceClientSocketMock
 
         self.clientSocketMock = MagicMock()
+        self.clientSocketMock.snapshot = None
         self.get_client_socketMock.return_value = self.clientSocketMock
 
+        self.get_clock_client_socketPatcher = patch('ev3dev2simulator.connector.clock_connector.get_client_socket')
+        self.get_clock_client_socketMock = self.get_clock_client_socketPatcher.start()
+        self.addCleanup(self.get_clock_client_socketPatcher.stop)
+
+        self.get_clock_client_socketMock.return_value.snapshot = None
+        # let the simulated time follow the wall clock
+        self.get_clock_client_socketMock.return_value.send_command.side_effect = \
+            lambda *args: {'time': time(), 'speed': 1.0}
+
     def test_color_sensor(self):
         self.deviceClientSocketMock.send_command.return_value = 'ev3-ports:in2'
-        self.clientSocketMock.send_command.return_value = 3
+        self.clientSocketMock.send_command.return_value = {'value': 3, 'frame': 7}
 
         sensor = ColorSensor(INPUT_2)
         val = sensor.color
@@ -40,22 +52,24 @@ class SensorConnectorTest(unittest.TestCase):
         fn_name, args, kwargs = self.clientSocketMock.mock_calls[0]
         self.assertEqual(fn_name, 'send_command')
         self.assertDictEqual(args[0].serialize(),
-                             {'type': 'DataRequest', 'address': 'ev3-ports:in2'})
+                             {'type': 'DataRequest', 'address': 'ev3-ports:in2', 'newer_than': None})
 
         val2 = sensor.value()
-        self.assertEqual(len(self.clientSocketMock.mock_calls), 1)
+        self.assertEqual(len(self.clientSocketMock.mock_calls), 2)
+        self.assertDictEqual(self.clientSocketMock.mock_calls[1][1][0].serialize(),
+                             {'type': 'DataRequest', 'address': 'ev3-ports:in2', 'newer_than': 7})
         self.assertEqual(val, val2)
 
         val = sensor.rgb
         self.assertEqual(val, (0, 216, 0))  # assumes 400 is max val, but we use 255 as max
-        self.clientSocketMock.send_command.return_value = 6
+        self.clientSocketMock.send_command.return_value = {'value': 6, 'frame': 8}
         sleep(0.1)  # sleep to wait for cache
 
         sensor.calibrate_white()
 
         sleep(0.1)  # sleep to wait for cache
 
-        self.clientSocketMock.send_command.return_value = 3
+        self.clientSocketMock.send_command.return_value = {'value': 3, 'frame': 9}
         sleep(0.1)  # sleep to wait for cache
         val = sensor.rgb
         self.assertEqual((0, 255, 0), val)  # Now calibrated to 255
@@ -64,7 +78,7 @@ class SensorConnectorTest(unittest.TestCase):
 
     def test_touch_sensor(self):
         self.deviceClientSocketMock.send_command.return_value = 'ev3-ports:in1'
-        self.clientSocketMock.send_command.return_value = True
+        self.clientSocketMock.send_command.return_value = {'value': True, 'frame': 2}
 
         sensor = TouchSensor(INPUT_1)
         val = sensor.value()
@@ -74,12 +88,99 @@ class SensorConnectorTest(unittest.TestCase):
         fn_name, args, kwargs = self.clientSocketMock.mock_calls[0]
         self.assertEqual(fn_name, 'send_command')
         self.assertDictEqual(args[0].serialize(),
-                             {'type': 'DataRequest', 'address': 'ev3-ports:in1'})
+                             {'type': 'DataRequest', 'address': 'ev3-ports:in1', 'newer_than': None})
 
         val2 = sensor.value()
-        self.assertEqual(len(self.clientSocketMock.mock_calls), 1)
+        self.assertEqual(len(self.clientSocketMock.mock_calls), 2)
+        self.assertEqual(self.clientSocketMock.mock_calls[1][1][0].newer_than, 2)
         self.assertEqual(val, val2)
 
+    def test_snapshot_touch_sensor(self):
+        self.deviceClientSocketMock.send_command.return_value = 'ev3-ports:in1'
+        self.clientSocketMock.snapshot = MagicMock()
+        self.clientSocketMock.read_sensor.return_value = (1.0, 5)
+        self.clientSocketMock.send_command.return_value = {'value': False, 'frame': 6}
+
+        sensor = TouchSensor(INPUT_1)
+        self.assertEqual(sensor.value(), 1)
+        self.clientSocketMock.send_command.assert_not_called()
+
+        # the snapshot still holds frame 5, so a value of a later frame is requested
+        self.assertEqual(sensor.value(), 0)
+        self.assertEqual(self.clientSocketMock.send_command.call_args[0][0].newer_than, 5)
+        self.assertEqual(sensor.connector.value_frame, 6)
+
+    def test_read_many(self):
+        self.deviceClientSocketMock.send_command.side_effect = ['ev3-ports:in1', 'ev3-ports:in2']
+        self.clientSocketMock.send_command.return_value = {'values': {'ev3-ports:in1': True, 'ev3-ports:in2': 5},
+                                                           'frame': 3}
+
+        touch_sensor = TouchSensor(INPUT_1)
+        color_sensor = ColorSensor(INPUT_2)
+        values = SensorConnector.read_many([touch_sensor.connector, color_sensor.connector])
+        self.assertDictEqual(values, {'ev3-ports:in1': True, 'ev3-ports:in2': 5})
+        self.assertEqual(self.clientSocketMock.send_command.call_count, 1)
+        self.assertDictEqual(self.clientSocketMock.send_command.call_args[0][0].serialize(),
+                             {'type': 'BulkDataRequest', 'addresses': ['ev3-ports:in1', 'ev3-ports:in2'],
+                              'newer_than': None})
+
+        clock_socket = self.get_clock_client_socketMock.return_value
+        clock_socket.send_command.reset_mock()
+        self.assertEqual(touch_sensor.value(), 1)
+        self.assertEqual(color_sensor.color, 5)
+        self.assertEqual(self.clientSocketMock.send_command.call_count, 1)
+        # prefetched values do not even need the simulated time
+        clock_socket.send_command.assert_not_called()
+        self.assertEqual(color_sensor.connector.value_frame, 3)
+
+        SensorConnector.read_many([touch_sensor.connector, color_sensor.connector])
+        self.assertEqual(self.clientSocketMock.send_command.call_args[0][0].newer_than, 3)
+
+    def test_first_read_at_start(self):
+        self.get_clock_client_socketMock.return_value.send_command.side_effect = \
+            lambda *args: {'time': 0.0, 'speed': 0, 'lock_step': True}
+        self.deviceClientSocketMock.send_command.return_value = 'ev3-ports:in1'
+        self.clientSocketMock.send_command.return_value = {'value': True, 'frame': 0}
+
+        sensor = TouchSensor(INPUT_1)
+        self.assertEqual(sensor.value(), 1)
+
+    def test_subscribed_touch_sensor(self):
+        self.deviceClientSocketMock.send_command.return_value = 'ev3-ports:in1'
+        self.clientSocketMock.get_sensor_value.return_value = True
+        self.clientSocketMock.get_change_frame.return_value = 4
+
+        sensor = TouchSensor(INPUT_1)
+        sensor.connector.subscribe()
+        self.clientSocketMock.subscribe.assert_called_once_with('ev3-ports:in1')
+
+        self.assertEqual(sensor.value(), 1)
+        self.clientSocketMock.send_command.assert_not_called()
+
+        # a value pushed right after the previous read is returned at once, without waiting for a later frame
+        self.clientSocketMock.get_sensor_value.return_value = False
+        self.get_clock_client_socketMock.return_value.send_command.reset_mock()
+        self.assertEqual(sensor.value(), 0)
+        self.get_clock_client_socketMock.return_value.send_command.assert_not_called()
+        self.assertEqual(sensor.connector.value_frame, 4)
+
+        sensor.connector.wait_for_change(sensor.connector.get_change_frame(), 0.5)
+        self.clientSocketMock.subscribe.assert_called_once()
+        address, frame, timeout = self.clientSocketMock.wait_for_change.call_args[0]
+        self.assertEqual((address, frame), ('ev3-ports:in1', 4))
+        self.assertAlmostEqual(timeout, 0.5)
+
+    def test_wait_for_pressed(self):
+        self.deviceClientSocketMock.send_command.return_value = 'ev3-ports:in1'
+        self.clientSocketMock.send_command.return_value = {'value': False, 'frame': 0}
+        values = [False, False, True]
+        self.clientSocketMock.get_sensor_value.side_effect = lambda address: values[0]
+        self.clientSocketMock.wait_for_change.side_effect = lambda *args: values.pop(0)
+
+        sensor = TouchSensor(INPUT_1)
+        self.assertTrue(sensor.wait_for_pressed())
+        self.assertEqual(self.clientSocketMock.wait_for_change.call_count, 2)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,11 +1,11 @@
 import sys
 import unittest
-from time import sleep
+from time import sleep, time
 
 from unittest.mock import MagicMock, patch
 
-from ev3dev2._platform.ev3 import OUTPUT_A
-from ev3dev2.motor import Motor
+from ev3dev2._platform.ev3 import OUTPUT_A, OUTPUT_D
+from ev3dev2.motor import Motor, MoveTank
 
 
 class MotorConnectorTest(unittest.TestCase):
@@ -22,14 +22,28 @@ class MotorConnectorTest(unittest.TestCase):
 
         self.clientSocketMock = MagicMock()
         self.get_client_socketMock.return_value = self.clientSocketMock
+        # the motor becomes idle once it is waited for
+        self.clientSocketMock.is_idle.side_effect = lambda address: self.clientSocketMock.wait_for_change.called
+
+        self.get_clock_client_socketPatcher = patch('ev3dev2simulator.connector.clock_connector.get_client_socket')
+        self.get_clock_client_socketMock = self.get_clock_client_socketPatcher.start()
+        self.addCleanup(self.get_clock_client_socketPatcher.stop)
+
+        self.get_clock_client_socketMock.return_value.snapshot = None
+        # let the simulated time follow the wall clock
+        self.get_clock_client_socketMock.return_value.send_command.side_effect = \
+            lambda *args: {'time': time(), 'speed': 1.0}
+
+    def send_command_calls(self):
+        return [mock_call for mock_call in self.clientSocketMock.mock_calls if mock_call[0] == 'send_command']
 
     def test_run_timed(self):
         self.clientSocketMock.send_command.return_value = 1
         motor = Motor(OUTPUT_A)
         motor.on_for_seconds(30, 1)
 
-        self.assertEqual(len(self.clientSocketMock.mock_calls), 1)
-        fn_name, args, kwargs = self.clientSocketMock.mock_calls[0]
+        self.assertEqual(len(self.send_command_calls()), 1)
+        fn_name, args, kwargs = self.send_command_calls()[0]
         self.assertEqual(fn_name, 'send_command')
         self.assertDictEqual(args[0].serialize(),
                              {'type': 'RotateCommand', 'address': 'ev3-ports:outA', 'stop_action': 'hold',
@@ -41,8 +55,8 @@ class MotorConnectorTest(unittest.TestCase):
         motor = Motor(OUTPUT_A)
         motor.on(10)
 
-        self.assertEqual(len(self.clientSocketMock.mock_calls), 1)
-        fn_name, args, kwargs = self.clientSocketMock.mock_calls[0]
+        self.assertEqual(len(self.send_command_calls()), 1)
+        fn_name, args, kwargs = self.send_command_calls()[0]
         self.assertEqual(fn_name, 'send_command')
         distance = 105 * 45
         self.assertDictEqual(args[0].serialize(),
@@ -50,8 +64,8 @@ class MotorConnectorTest(unittest.TestCase):
                               'speed': 105, 'distance': distance})
 
         motor.stop()
-        self.assertEqual(len(self.clientSocketMock.mock_calls), 2)
-        fn_name, args, kwargs = self.clientSocketMock.mock_calls[1]
+        self.assertEqual(len(self.send_command_calls()), 2)
+        fn_name, args, kwargs = self.send_command_calls()[1]
         self.assertEqual(fn_name, 'send_command')
         self.assertDictEqual(args[0].serialize(),
                              {'type': 'StopCommand', 'address': 'ev3-ports:outA', 'stop_action': 'hold',
@@ -62,7 +76,7 @@ class MotorConnectorTest(unittest.TestCase):
         self.clientSocketMock.send_command.return_value = 0
         motor.on(0, False)
         motor.stop()
-        self.assertEqual(len(self.clientSocketMock.mock_calls), 1)
+        self.assertEqual(len(self.send_command_calls()), 1)
         self.assertEqual(motor.speed_sp, 0)
 
     def test_stop_reverse(self):
@@ -70,8 +84,8 @@ class MotorConnectorTest(unittest.TestCase):
         self.clientSocketMock.send_command.return_value = 0
         motor.on(-10, False)
         motor.stop()
-        self.assertEqual(len(self.clientSocketMock.mock_calls), 2)
-        fn_name, args, kwargs = self.clientSocketMock.mock_calls[1]
+        self.assertEqual(len(self.send_command_calls()), 2)
+        fn_name, args, kwargs = self.send_command_calls()[1]
         self.assertEqual(fn_name, 'send_command')
         self.assertDictEqual(args[0].serialize(),
                              {'type': 'StopCommand', 'address': 'ev3-ports:outA', 'stop_action': 'coast',
@@ -83,8 +97,8 @@ class MotorConnectorTest(unittest.TestCase):
         motor = Motor(OUTPUT_A)
         motor.on_for_degrees(30, 30, False)
 
-        self.assertEqual(len(self.clientSocketMock.mock_calls), 1)
-        fn_name, args, kwargs = self.clientSocketMock.mock_calls[0]
+        self.assertEqual(len(self.send_command_calls()), 1)
+        fn_name, args, kwargs = self.send_command_calls()[0]
         self.assertEqual(fn_name, 'send_command')
         self.assertDictEqual(args[0].serialize(),
                              {'type': 'RotateCommand', 'address': 'ev3-ports:outA', 'stop_action': 'coast',
@@ -98,13 +112,95 @@ class MotorConnectorTest(unittest.TestCase):
         motor.stop_action = 'coast'
         motor.run_direct()
 
-        self.assertEqual(len(self.clientSocketMock.mock_calls), 1)
-        fn_name, args, kwargs = self.clientSocketMock.mock_calls[0]
+        self.assertEqual(len(self.send_command_calls()), 1)
+        fn_name, args, kwargs = self.send_command_calls()[0]
         self.assertEqual(fn_name, 'send_command')
         self.assertDictEqual(args[0].serialize(),
                              {'type': 'RotateCommand', 'address': 'ev3-ports:outA', 'stop_action': 'coast',
                               'speed': 315, 'distance': 14175.0})
 
+    def test_position_and_speed(self):
+        self.clientSocketMock.read_motor_state.return_value = None
+        self.clientSocketMock.get_motor_state.return_value = None
+        self.clientSocketMock.send_command.return_value = {'ev3-ports:outA': {'position': 90, 'speed': 450}}
+
+        motor = Motor(OUTPUT_A)
+        self.assertEqual(motor.position, 90)
+        self.assertEqual(motor.speed, 450)
+        fn_name, args, kwargs = self.send_command_calls()[-1]
+        self.assertDictEqual(args[0].serialize(), {'type': 'MotorStateRequest', 'address': 'ev3-ports:outA'})
+
+        # once the simulator pushes the state of the subscribed motor, it is read without a request
+        self.clientSocketMock.subscribe.assert_called_once_with('ev3-ports:outA')
+        self.clientSocketMock.get_motor_state.return_value = {'position': 95, 'speed': 400}
+        self.clientSocketMock.send_command.reset_mock()
+        self.assertEqual(motor.position, 95)
+        self.assertEqual(motor.speed, 400)
+        self.clientSocketMock.send_command.assert_not_called()
+
+        motor.position = 0
+        self.clientSocketMock.read_motor_state.return_value = {'position': 100, 'speed': 0}
+        self.assertEqual(motor.position, 5)
+
+    def test_run_to_abs_pos(self):
+        self.clientSocketMock.read_motor_state.return_value = {'position': 100, 'speed': 0}
+        self.clientSocketMock.send_command.return_value = 1
+
+        motor = Motor(OUTPUT_A)
+        motor.on_to_position(30, 40, True, False)
+
+        fn_name, args, kwargs = self.send_command_calls()[-1]
+        self.assertEqual(fn_name, 'send_command')
+        self.assertDictEqual(args[0].serialize(),
+                             {'type': 'RotateCommand', 'address': 'ev3-ports:outA', 'stop_action': 'hold',
+                              'speed': 315, 'distance': -60})
+
+    def test_wait_until_not_moving(self):
+        self.clientSocketMock.send_command.return_value = 1
+        motor = Motor(OUTPUT_A)
+        # the motor is only subscribed to once its state is needed
+        self.clientSocketMock.subscribe.assert_not_called()
+
+        motor.on_for_seconds(30, 1, block=False)
+        self.clientSocketMock.count_command.assert_called_once_with('ev3-ports:outA')
+        self.assertTrue(motor.is_running)
+        self.clientSocketMock.subscribe.assert_called_once_with('ev3-ports:outA')
+
+        self.clientSocketMock.get_change_frame.return_value = 7
+        self.assertTrue(motor.wait_until_not_moving(2000))
+        address, frame, timeout = self.clientSocketMock.wait_for_change.call_args[0]
+        self.assertEqual((address, frame), ('ev3-ports:outA', 7))
+        self.assertLessEqual(timeout, 2)
+        self.assertEqual(motor.state, 'holding')
+
+    def test_wait_takes_frame_before_state(self):
+        self.clientSocketMock.send_command.return_value = 1
+        motor = Motor(OUTPUT_A)
+        motor.on_for_seconds(30, 1, block=False)
+
+        # the motor finishes right after its state was checked, the wait must still see that change
+        frames = iter(range(7, 100))
+        self.clientSocketMock.get_change_frame.side_effect = lambda address: next(frames)
+        self.assertTrue(motor.wait_until_not_moving(2000))
+        address, frame, timeout = self.clientSocketMock.wait_for_change.call_args_list[0][0]
+        self.assertEqual(frame, 7)
+
+    def test_move_tank_sends_single_command(self):
+        self.clientSocketMock.send_command.side_effect = \
+            lambda command, wait: [1, 1] if command.serialize()['type'] == 'MultiRotateCommand' else 0
+        tank = MoveTank(OUTPUT_A, OUTPUT_D)
+        self.clientSocketMock.send_command.reset_mock()
+
+        tank.on_for_degrees(50, 25, 360, block=False)
+        self.assertEqual(len(self.send_command_calls()), 1)
+        fn_name, args, kwargs = self.send_command_calls()[0]
+        self.assertDictEqual(args[0].serialize(), {'type': 'MultiRotateCommand', 'commands': [
+            {'type': 'RotateCommand', 'address': 'ev3-ports:outA', 'stop_action': 'hold', 'speed': 525,
+             'distance': 360},
+            {'type': 'RotateCommand', 'address': 'ev3-ports:outD', 'stop_action': 'hold', 'speed': 262,
+             'distance': 180}]})
+        self.assertEqual(self.clientSocketMock.count_command.call_count, 2)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 from unittest.mock import MagicMock
 
-from pymunk import Space
+from pymunk import Segment, Space
 
 from ev3dev2simulator.config.config import load_config
 from ev3dev2simulator.robotpart.ultrasonic_sensor_top import UltrasonicSensor
@@ -20,6 +20,7 @@ class TestUltraSonicSensor(unittest.TestCase):
             'port': 'ev3-ports:in3'
         }
         robot = MagicMock()
+        robot.scale = 1
         us = UltrasonicSensor(config, robot)
         us.setup_pymunk_shape(1, None)
         us.sprite = MagicMock()
@@ -28,6 +29,32 @@ class TestUltraSonicSensor(unittest.TestCase):
         val = us.distance(space)
         self.assertEqual(val, 2550)
 
+    def test_distance_obstacle(self):
+        config = {
+            'name': 'ultrasonic-sensor-front',
+            'type': 'ultrasonic_sensor',
+            'x_offset': 0,
+            'y_offset': -91.5,
+            'brick': 0,
+            'port': 'ev3-ports:in3'
+        }
+        for scale in [1, 0.5]:
+            robot = MagicMock()
+            robot.scale = scale
+            us = UltrasonicSensor(config, robot)
+            us.setup_pymunk_shape(scale, None)
+            us.set_pose(500 * scale, 100 * scale, 0)
+
+            space = Space()
+            wall_y = (100 + us.sensor_half_height + 1500) * scale
+            space.add(Segment(space.static_body, (0, wall_y), (1000 * scale, wall_y), 0))
+            self.assertAlmostEqual(us.distance(space), 1500, delta=1)
+
+            space = Space()
+            wall_y = (100 + us.sensor_half_height + 2600) * scale
+            space.add(Segment(space.static_body, (0, wall_y), (1000 * scale, wall_y), 0))
+            self.assertEqual(us.distance(space), 2550)
+
 
 if __name__ == '__main__':
     unittest.main()
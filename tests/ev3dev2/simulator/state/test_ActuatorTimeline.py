@@ -0,0 +1,51 @@
+import unittest
+
+from ev3dev2simulator.state.actuator_timeline import ActuatorTimeline, ConstantVelocitySegment, CoastSegment, \
+    MessageSegment, Segment
+
+
+class TestActuatorTimeline(unittest.TestCase):
+
+    def test_segments_play_in_order(self):
+        timeline = ActuatorTimeline()
+        timeline.add(ConstantVelocitySegment(3, 2.0))
+        timeline.add(CoastSegment(3, 2.0, 0.5))
+
+        jobs = [timeline.next_job() for _ in range(7)]
+        self.assertEqual(jobs, [2.0, 2.0, 2.0, 1.5, 1.0, 0.5, None])
+        self.assertEqual(len(timeline.segments), 0)
+
+    def test_coast_backwards_stops_at_zero(self):
+        timeline = ActuatorTimeline()
+        timeline.add(CoastSegment(3, -1.0, 0.4))
+
+        jobs = [timeline.next_job() for _ in range(3)]
+        self.assertAlmostEqual(jobs[0], -0.6)
+        self.assertAlmostEqual(jobs[1], -0.2)
+        self.assertEqual(jobs[2], 0)
+
+    def test_add_after_idle_starts_next_frame(self):
+        timeline = ActuatorTimeline()
+        self.assertIsNone(timeline.next_job())
+        self.assertIsNone(timeline.next_job())
+
+        timeline.add(MessageSegment(2, 'beep'))
+        self.assertEqual([timeline.next_job() for _ in range(3)], ['beep', 'beep', None])
+
+    def test_segment_needs_value_at(self):
+        self.assertRaises(TypeError, Segment, 3)
+
+    def test_clear(self):
+        timeline = ActuatorTimeline()
+        timeline.add(ConstantVelocitySegment(30 * 45, 1.0))
+        timeline.next_job()
+
+        timeline.clear()
+        self.assertIsNone(timeline.next_job())
+
+        timeline.add(ConstantVelocitySegment(1, 3.0))
+        self.assertEqual(timeline.next_job(), 3.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from ev3dev2simulator.config.config import load_config
+from ev3dev2simulator.state.world_state import WorldState
+
+load_config(None)
+
+
+class TestColorMap(unittest.TestCase):
+
+    def create_world(self, scale):
+        world_state = WorldState({
+            'board_height': 841,
+            'board_width': 1189,
+            'board_color': [235, 235, 235],
+            'robots': [],
+            'obstacles': [
+                {'type': 'lake', 'border_width': 29, 'inner_radius': 38, 'color': [201, 45, 57], 'x': 397, 'y': 232},
+                {'type': 'lake', 'border_width': 29, 'inner_radius': 38, 'color': [58, 166, 221], 'x': 700,
+                 'y': 500, 'hole': False},
+                {'type': 'border', 'depth': 20, 'color': [59, 60, 54], 'outer_spacing': 5},
+            ]
+        })
+        world_state.setup_pymunk_shapes(scale)
+        return world_state
+
+    def assert_matches_obstacles(self, world_state, x, y):
+        color_map = world_state.color_map
+        expected_color = next((obstacle.color_code for obstacle in world_state.color_obstacles
+                               if obstacle.collided_with(x, y)), None)
+        expected_falling = any(obstacle.collided_with(x, y) for obstacle in world_state.falling_obstacles)
+        self.assertEqual(color_map.get_color(x, y), expected_color, (x, y))
+        self.assertEqual(color_map.is_falling(x, y), expected_falling, (x, y))
+
+    def test_matches_obstacles(self):
+        for scale in [1, 0.5]:
+            world_state = self.create_world(scale)
+            for x_mm in range(0, 1189, 7):
+                for y_mm in range(0, 841, 7):
+                    self.assert_matches_obstacles(world_state, (x_mm + 0.5) * scale, (y_mm + 0.5) * scale)
+
+    def test_colors(self):
+        world_state = self.create_world(1)
+        color_map = world_state.color_map
+        self.assertEqual(color_map.get_color(397, 232), 6)  # inside the hole the board is seen
+        self.assertEqual(color_map.get_color(397 + 50, 232), 5)
+        self.assertTrue(color_map.is_falling(397, 232))
+        self.assertEqual(color_map.get_color(700, 500), 2)
+        self.assertFalse(color_map.is_falling(700, 500))
+        self.assertEqual(color_map.get_color(600, 2), 6)
+        self.assertTrue(color_map.is_falling(600, 2))
+
+    def test_outside_of_board(self):
+        world_state = self.create_world(1)
+        for x, y in [(-10, 400), (1200, 400), (600, -0.5), (600, 900)]:
+            self.assert_matches_obstacles(world_state, x, y)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from ev3dev2simulator.config.config import load_config
+from ev3dev2simulator.state.obstacle_grid import ObstacleGrid
+from ev3dev2simulator.state.world_state import WorldState
+
+load_config(None)
+
+
+class TestObstacleGrid(unittest.TestCase):
+
+    def create_world(self):
+        world_state = WorldState({
+            'board_height': 841,
+            'board_width': 1189,
+            'board_color': [235, 235, 235],
+            'robots': [],
+            'obstacles': [
+                {'type': 'lake', 'border_width': 29, 'inner_radius': 38, 'color': [201, 45, 57], 'x': 397, 'y': 232},
+                {'type': 'lake', 'border_width': 29, 'inner_radius': 38, 'color': [58, 166, 221], 'x': 700,
+                 'y': 500, 'hole': False},
+                {'type': 'border', 'depth': 20, 'color': [59, 60, 54], 'outer_spacing': 5},
+            ]
+        })
+        world_state.setup_pymunk_shapes(1)
+        return world_state
+
+    def test_candidates_contain_collisions(self):
+        world_state = self.create_world()
+        for grid in [world_state.color_grid, world_state.falling_grid]:
+            for x in range(-20, 1220, 9):
+                for y in range(-20, 870, 9):
+                    candidates = grid.get_candidates(x, y)
+                    collisions = [obstacle for obstacle in grid.obstacles if obstacle.collided_with(x, y)]
+                    self.assertEqual([obstacle for obstacle in candidates if obstacle in collisions], collisions)
+
+    def test_candidates_are_local(self):
+        world_state = self.create_world()
+        lake_red, lake_blue, border, board = world_state.color_obstacles
+
+        self.assertEqual(world_state.color_grid.get_candidates(397, 232), [lake_red, board])
+        self.assertEqual(world_state.color_grid.get_candidates(700, 500), [lake_blue, board])
+        self.assertEqual(world_state.color_grid.get_candidates(10, 400), [border, board])
+        self.assertEqual(world_state.color_grid.get_candidates(2000, 400), [])
+        self.assertEqual(world_state.falling_grid.get_candidates(600, 400), [])
+
+    def test_cell_size(self):
+        grid = ObstacleGrid([], cell_size=10)
+        self.assertEqual(grid.get_candidates(5, 5), [])
+        self.assertEqual(grid._to_cell(-0.5), -1)
+        self.assertEqual(grid._to_cell(25), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,10 @@
 import unittest
 from unittest.mock import MagicMock
 
-from ev3dev2simulator.state.robot_simulator import RobotSimulator
+from ev3dev2simulator.state.actuator_timeline import ConstantVelocitySegment
+from ev3dev2simulator.state.robot_simulator import RobotSimulator, READ_WINDOW_SECONDS
 from ev3dev2simulator.state.robot_state import RobotState
+from ev3dev2simulator.state.simulation_clock import PendingResult
 from tests.ev3dev2.simulator.state.test_RobotState import TestRobotState
 
 
@@ -23,9 +25,8 @@ class TestRobotSimulator(unittest.TestCase):
         self.assertEqual(sim.should_reset, True)
         sim.reset()
         self.assertEqual(sim.should_reset, False)
-        sim.release_locks()
 
-    def test_get_value_and_locks(self):
+    def test_get_value(self):
         conf = TestRobotState.default_config()
         state = RobotState(conf)
         state.setup_pymunk_shapes(1)
@@ -34,11 +35,152 @@ class TestRobotSimulator(unittest.TestCase):
             arm.rotate_y = 0  # this is set in setup visuals
         sim = RobotSimulator(state)
         sim._sync_physics_sprites = MagicMock()
-        val = sim.get_value((0, 'ev3-ports:in4'))
-        self.assertEqual(val, 2550)
-        self.assertEqual(sim.locks[(0, 'ev3-ports:in4')].locked(), True)
+        address = (0, 'ev3-ports:in4')
+        self.assertDictEqual(sim.get_value(address), {'value': 2550, 'frame': 0})
+        self.assertDictEqual(sim.get_value(address), {'value': 2550, 'frame': 0})
+
+        state.sensors[address].get_latest_value = MagicMock(return_value=20)
+        pending = sim.get_value(address, newer_than=0)
+        self.assertIsInstance(pending, PendingResult)
+        self.assertEqual(pending.frame, 1)
+
+        # values of an update are only read once it completed
+        sim.robot.values[address] = 30
+        self.assertDictEqual(sim.get_value(address), {'value': 2550, 'frame': 0})
+        sim.update()
+        sim.clock.tick()
+        self.assertDictEqual(pending.resume(), {'value': 20, 'frame': 1})
+
+    def test_lazy_sensors(self):
+        conf = TestRobotState.default_config()
+        state = RobotState(conf)
+        state.setup_pymunk_shapes(1)
+        for arm in state.side_bar_sprites:
+            arm.rotate_x = 0  # this is set in setup visuals
+            arm.rotate_y = 0  # this is set in setup visuals
+        sim = RobotSimulator(state)
+        sim._sync_physics_sprites = MagicMock()
+        sim.evaluate_all_sensors = False
+        address = (0, 'ev3-ports:in4')
+        state.sensors[address].get_latest_value = MagicMock(return_value=20)
+
+        sim.update()
+        state.sensors[address].get_latest_value.assert_not_called()
+
+        # a sensor that was never evaluated is read after the next frame
+        pending = sim.get_value(address)
+        self.assertIsInstance(pending, PendingResult)
+        self.assertEqual(pending.frame, 1)
+        sim.update()
+        sim.clock.tick()
+        self.assertDictEqual(pending.resume(), {'value': 20, 'frame': 1})
+
+        # a sensor that is read is kept up to date
+        state.sensors[address].get_latest_value.return_value = 30
+        sim.update()
+        sim.clock.tick()
+        self.assertDictEqual(sim.get_value(address), {'value': 30, 'frame': 2})
+
+        # once it was not read for a while it is no longer evaluated, but its last value is returned at once
+        for _ in range(sim.clock.frames_for(READ_WINDOW_SECONDS) + 1):
+            sim.update()
+            sim.clock.tick()
+        calls = state.sensors[address].get_latest_value.call_count
+        sim.update()
+        sim.clock.tick()
+        self.assertEqual(state.sensors[address].get_latest_value.call_count, calls)
+        value = sim.get_value(address)
+        self.assertEqual(value['value'], 30)
+        self.assertLess(value['frame'], sim.clock.frame)
+        sim.update()
+        sim.clock.tick()
+        self.assertEqual(state.sensors[address].get_latest_value.call_count, calls + 1)
+
+        sim.requested_sensors.clear()
+        sim.watch_sensor(address)
+        sim.update()
+        sim.clock.tick()
+        self.assertEqual(sim.get_value(address)['frame'], sim.clock.frame)
+        sim.unwatch_sensor(address)
+        sim.requested_sensors.clear()
+        sim.update()
+        sim.clock.tick()
+        self.assertEqual(state.sensors[address].get_latest_value.call_count, calls + 2)
+
+    def test_lazy_sensor_resumed_late(self):
+        conf = TestRobotState.default_config()
+        state = RobotState(conf)
+        state.setup_pymunk_shapes(1)
+        for arm in state.side_bar_sprites:
+            arm.rotate_x = 0  # this is set in setup visuals
+            arm.rotate_y = 0  # this is set in setup visuals
+        sim = RobotSimulator(state)
+        sim._sync_physics_sprites = MagicMock()
+        sim.evaluate_all_sensors = False
+        address = (0, 'ev3-ports:in4')
+        state.sensors[address].get_latest_value = MagicMock(return_value=20)
+
+        pending = sim.get_value(address)
+        pending_values = sim.get_values([address])
+        for _ in range(2):
+            sim.update()
+            sim.clock.tick()
+
+        # the clock has moved on since the frame waited for, the latest value is returned
+        self.assertDictEqual(pending.resume(), {'value': 20, 'frame': 2})
+        self.assertDictEqual(pending_values.resume(), {'values': {address: 20}, 'frame': 2})
+
+    def test_tacho_counts(self):
+        conf = TestRobotState.default_config()
+        state = RobotState(conf)
+        state.setup_pymunk_shapes(1)
+        for arm in state.side_bar_sprites:
+            arm.rotate_x = 0  # this is set in setup visuals
+            arm.rotate_y = 0  # this is set in setup visuals
+        sim = RobotSimulator(state)
+        sim._sync_physics_sprites = MagicMock()
+
+        # a wheel travelling its circumference per frame rotates a full turn each frame
+        sim.put_actuator_segment((0, 'ev3-ports:outA'), ConstantVelocitySegment(2, sim.wheel_circumference))
+        sim.put_actuator_segment((0, 'ev3-ports:outB'), ConstantVelocitySegment(1, -10))
+        sim.update()
+        self.assertDictEqual(sim.get_motor_state((0, 'ev3-ports:outA')), {'position': 360, 'speed': 360 * 30})
+        self.assertDictEqual(sim.get_motor_state((0, 'ev3-ports:outB')), {'position': 10, 'speed': 300})
+        self.assertDictEqual(sim.get_motor_state((0, 'ev3-ports:outD')), {'position': 0, 'speed': 0})
+
+        sim.update()
+        self.assertDictEqual(sim.get_motor_state((0, 'ev3-ports:outA')), {'position': 720, 'speed': 360 * 30})
+        self.assertDictEqual(sim.get_motor_state((0, 'ev3-ports:outB')), {'position': 10, 'speed': 0})
+
+        sim.reset()
+        self.assertDictEqual(sim.get_motor_state((0, 'ev3-ports:outA')), {'position': 0, 'speed': 0})
+
+    def test_actuator_idle(self):
+        conf = TestRobotState.default_config()
+        state = RobotState(conf)
+        state.setup_pymunk_shapes(1)
+        for arm in state.side_bar_sprites:
+            arm.rotate_x = 0  # this is set in setup visuals
+            arm.rotate_y = 0  # this is set in setup visuals
+        sim = RobotSimulator(state)
+        sim._sync_physics_sprites = MagicMock()
+        address = (0, 'ev3-ports:outA')
+
+        sim.set_actuator_segments(address, [ConstantVelocitySegment(2, 1)])
+        sim.set_actuator_segments(address, [ConstantVelocitySegment(2, 1)])
+        self.assertEqual((sim.actuator_commands[address], sim.actuator_idle[address]), (2, 0))
         sim.update()
-        self.assertEqual(sim.locks[(0, 'ev3-ports:in4')].locked(), False)
+        self.assertEqual(sim.actuator_idle[address], 0)
+        sim.update()
+        self.assertEqual(sim.actuator_idle[address], 2)
+
+        sim.set_actuator_segments(address, [ConstantVelocitySegment(10, 1)])
+        sim.update()
+        sim.clear_actuator_jobs(address)
+        self.assertEqual(sim.actuator_idle[address], 3)
+
+        sim.reset_queues_of_brick(0)
+        self.assertEqual((sim.actuator_commands[address], sim.actuator_idle[address]), (0, 0))
 
     def test_determine_port(self):
         conf = TestRobotState.default_config()
@@ -143,16 +143,20 @@ class TestRobotState(unittest.TestCase):
             'port': 'ev3-ports:outB'
         })
 
-        with patch('ev3dev2simulator.robotpart.arm.ArmLarge') as ArmLargeMock:
+        with patch('ev3dev2simulator.robotpart.arm_large.ArmLarge') as ArmLargeMock:
             arm_instance = ArmLargeMock.return_value
             state = RobotState(self.default_config())
             state.setup_pymunk_shapes(1)
 
+            arm = state.actuators[(0, 'ev3-ports:outB')]
+            with patch.object(arm, 'init_sprite'):
+                arm.setup_visuals(1)  # the arm in the sidebar only exists when there are visuals
+
             state.execute_arm_movement((0, 'ev3-ports:outB'), 15)
             state.actuators[(0, 'ev3-ports:outB')].side_bar_arm.degrees = 15
 
-            self.assertEqual(len(arm_instance.mock_calls), 3)  # first two have to do with a sprite list
-            fn_name, args, kwargs = arm_instance.mock_calls[2]
+            self.assertEqual(len(arm_instance.mock_calls), 1)
+            fn_name, args, kwargs = arm_instance.mock_calls[0]
             self.assertEqual(fn_name, 'rotate')
             self.assertEqual(args, (15,))
 
@@ -0,0 +1,67 @@
+import unittest
+
+from ev3dev2simulator.config.config import load_config, get_world_config
+from ev3dev2simulator.robotpart.ultrasonic_sensor_bottom import UltrasonicSensorBottom
+from ev3dev2simulator.state.robot_simulator import RobotSimulator
+from ev3dev2simulator.state.sensor_batch import SensorBatch
+from ev3dev2simulator.state.world_state import WorldState
+
+load_config('config_large')
+
+
+class TestSensorBatch(unittest.TestCase):
+
+    def create_batch(self):
+        world_state = WorldState(get_world_config())
+        world_state.setup_pymunk_shapes(1)
+        robot_sim = RobotSimulator(world_state.robots[0])
+        return world_state, robot_sim, SensorBatch([robot_sim])
+
+    def test_batched_sensors(self):
+        _, robot_sim, batch = self.create_batch()
+        self.assertEqual(len(batch.color_sensors), 3)
+        self.assertEqual(len(batch.ground_sensors), 1)
+        self.assertEqual(robot_sim.batched_sensors, {(0, 'ev3-ports:in1'), (0, 'ev3-ports:in2'), (0, 'ev3-ports:in3'),
+                                                     (0, 'ev3-ports:in4')})
+
+    def test_process_matches_sensors(self):
+        world_state, robot_sim, batch = self.create_batch()
+        sensors = [sensor for _, _, sensor in batch.color_sensors + batch.ground_sensors]
+        for x, y in [(100, 100), (20, 600), (-50, 300), (600, 25), (1250, 1250)]:
+            for index, sensor in enumerate(sensors):
+                sensor.set_pose(x + index * 40, y, 0)
+            batch.process(world_state.color_map)
+            for sensor in sensors:
+                self.assertEqual(robot_sim.robot.values[(sensor.brick, sensor.address)], sensor.get_latest_value())
+
+    def test_falling_robots(self):
+        world_state, robot_sim, batch = self.create_batch()
+        self.assertEqual(len(batch.wheels), 2)
+        for x, y in [(600, 600), (600, 5), (-50, 300), (1250, 1250)]:
+            robot_sim.robot.get_wheels()[0].set_pose(x, y, 0)
+            expected = [robot_sim.robot] if robot_sim.robot.is_falling() else []
+            self.assertEqual(batch.get_falling_robots(world_state.color_map), expected)
+            self.assertEqual(batch.get_falling_robots(None), expected)
+
+    def test_process_without_color_map(self):
+        _, robot_sim, batch = self.create_batch()
+        _, address, sensor = batch.ground_sensors[0]
+        self.assertIsInstance(sensor, UltrasonicSensorBottom)
+        sensor.set_pose(600, 5, 0)
+        batch.process(None)
+        self.assertEqual(robot_sim.robot.values[address], 2550)
+
+    def test_skips_robot_to_reset(self):
+        world_state, robot_sim, batch = self.create_batch()
+        _, address, sensor = batch.ground_sensors[0]
+        sensor.set_pose(600, 5, 0)
+        robot_sim.should_reset = True
+        batch.process(world_state.color_map)
+        self.assertEqual(robot_sim.robot.values[address], 2550)
+        robot_sim.robot.values[address] = 0
+        batch.process(world_state.color_map)
+        self.assertEqual(robot_sim.robot.values[address], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
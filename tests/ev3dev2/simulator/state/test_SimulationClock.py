@@ -0,0 +1,87 @@
+import threading
+import unittest
+
+from ev3dev2simulator.state.simulation_clock import SimulationClock, PendingResult
+
+
+class TestSimulationClock(unittest.TestCase):
+
+    def test_time(self):
+        clock = SimulationClock(30)
+        for _ in range(15):
+            clock.tick()
+
+        self.assertEqual(clock.frame, 15)
+        self.assertEqual(clock.time, 0.5)
+
+    def test_frames_for(self):
+        clock = SimulationClock(30)
+
+        self.assertEqual(clock.frames_for(0.1), 3)
+        self.assertEqual(clock.frames_for(0.11), 4)
+        self.assertEqual(clock.frames_for(0.001), 1)
+
+    def test_no_step_without_participants(self):
+        clock = SimulationClock(30, lock_step=True)
+
+        self.assertFalse(clock.wait_for_step(0))
+
+    def test_step_when_all_participants_are_done(self):
+        clock = SimulationClock(30, lock_step=True)
+        clock.add_participant('first')
+        clock.add_participant('second')
+
+        clock.set_waiting('first', 2)
+        self.assertFalse(clock.wait_for_step(0))
+
+        clock.set_waiting('second', 1)
+        self.assertTrue(clock.wait_for_step(0))
+
+        clock.tick()
+        self.assertFalse(clock.wait_for_step(0))
+
+        clock.clear_waiting('second')
+        self.assertFalse(clock.wait_for_step(0))
+
+        clock.remove_participant('second')
+        self.assertTrue(clock.wait_for_step(0))
+
+    def test_wait_for_step_wakes_up(self):
+        clock = SimulationClock(30, lock_step=True)
+        clock.add_participant('first')
+
+        waiter = threading.Thread(target=lambda: clock.set_waiting('first', 1))
+        waiter.start()
+        self.assertTrue(clock.wait_for_step(1))
+        waiter.join()
+
+    def test_tick_listeners(self):
+        clock = SimulationClock(30)
+        frames = []
+        clock.add_tick_listener(frames.append)
+
+        clock.tick()
+        clock.tick()
+        self.assertEqual(frames, [1, 2])
+
+    def test_early_tick_listeners(self):
+        clock = SimulationClock(30)
+        seen = []
+        clock.add_tick_listener(lambda frame: seen.append((frame, clock.frame)), early=True)
+
+        clock.tick()
+        self.assertEqual(seen, [(1, 0)])
+        self.assertEqual(clock.frame, 1)
+
+    def test_pending_result(self):
+        clock = SimulationClock(30)
+        pending = PendingResult(2, lambda: PendingResult(3, lambda: 'value')).then(str.upper)
+
+        self.assertEqual(pending.frame, 2)
+        pending = pending.resume()
+        self.assertEqual(pending.frame, 3)
+        self.assertEqual(pending.resume(), 'VALUE')
+
+
+if __name__ == '__main__':
+    unittest.main()
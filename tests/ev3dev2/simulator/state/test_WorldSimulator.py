@@ -1,7 +1,7 @@
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
-from ev3dev2simulator.config.config import load_config
+from ev3dev2simulator.config.config import load_config, get_simulation_settings
 from ev3dev2simulator.state.world_simulator import WorldSimulator
 
 load_config(None)
@@ -21,6 +21,33 @@ class TestWorldSimulator(unittest.TestCase):
         world_simulator.update()
         self.assertEqual(world_simulator.robot_simulators[0].update.call_count, 1)
 
+    def test_update_advances_clock(self):
+        world_state_mock = MagicMock()
+        world_state_mock.robots = [MagicMock()]
+        world_simulator = WorldSimulator(world_state_mock)
+        world_simulator.robot_simulators[0].update = MagicMock()
+        self.assertEqual(world_simulator.clock.time, 0)
+
+        for _ in range(15):
+            world_simulator.update()
+        self.assertEqual(world_simulator.clock.frame, 15)
+        self.assertAlmostEqual(world_simulator.clock.time, 0.5)
+        self.assertIs(world_simulator.robot_simulators[0].clock, world_simulator.clock)
+
+    def test_update_physics_substeps(self):
+        settings = get_simulation_settings()
+        settings = {**settings, 'exec_settings': {**settings['exec_settings'], 'physics_substeps': 4}}
+        world_state_mock = MagicMock()
+        world_state_mock.robots = [MagicMock()]
+        with patch('ev3dev2simulator.state.world_simulator.get_simulation_settings', return_value=settings):
+            world_simulator = WorldSimulator(world_state_mock)
+        world_simulator.robot_simulators[0].update = MagicMock()
+
+        world_simulator.update()
+        self.assertEqual(world_state_mock.space.step.call_count, 4)
+        world_state_mock.space.step.assert_called_with(1 / 120)
+        self.assertEqual(world_simulator.clock.frame, 1)
+
 
 if __name__ == '__main__':
     unittest.main()
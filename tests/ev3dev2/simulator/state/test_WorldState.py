@@ -1,4 +1,7 @@
 import unittest
+from unittest.mock import MagicMock, patch
+
+from arcade import Sprite
 
 from ev3dev2simulator.config.config import load_config
 from ev3dev2simulator.state.world_state import WorldState
@@ -101,6 +104,39 @@ class TestWorldState(unittest.TestCase):
         bottle = world_state.obstacles[1]
         self.assertEqual(bottle.body.position, (500, 150))
 
+    def test_static_shape_lists(self):
+        class FakeShapeElementList:
+            def __init__(self):
+                self.batches = {}
+
+            def append(self, shape):
+                self.batches.setdefault((shape.mode, shape.line_width), []).append(shape)
+
+        board, side, ring = [MagicMock(mode=mode, line_width=1) for mode in (4, 4, 5)]
+        world_state = WorldState(self.default_config())
+        world_state.static_obstacles = [MagicMock(get_shapes=MagicMock(return_value=shapes))
+                                        for shapes in ([board], [], [side, side], [ring], [side])]
+
+        with patch('arcade.ShapeElementList', FakeShapeElementList):
+            shape_lists = world_state._create_static_shape_lists()
+
+        # the last side would be drawn before the ring in the first list, so it starts a new one
+        self.assertEqual([shape_list.batches for shape_list in shape_lists],
+                         [{(4, 1): [board, side, side], (5, 1): [ring]}, {(4, 1): [side]}])
+
+    def test_setup_visuals_single_sprite_list(self):
+        world_state = WorldState(self.default_config())
+        obstacle = MagicMock(sprite=Sprite())
+        robot_sprites = [Sprite(), Sprite()]
+        robot = MagicMock(get_sprites=MagicMock(return_value=robot_sprites))
+        world_state.static_obstacles = []
+        world_state.obstacles = [obstacle]
+        world_state.robots = [robot]
+
+        world_state.setup_visuals(1)
+        robot.setup_visuals.assert_called_once_with(1)
+        self.assertEqual(list(world_state.sprite_list), [obstacle.sprite] + robot_sprites)
+
 
 if __name__ == '__main__':
     unittest.main()
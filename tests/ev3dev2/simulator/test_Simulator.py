@@ -27,7 +27,11 @@ class TestSimulator(unittest.TestCase):
                               'simulation_file': 'config_small',
                               'show_on_second_monitor': False,
                               'fullscreen': False,
-                              'maximized': False
+                              'maximized': False,
+                              'headless': False,
+                              'speed': 1.0,
+                              'lockstep': False,
+                              'allow_multiple': False
                               })
 
     def test_single_dash_parsing(self):
@@ -37,7 +41,11 @@ class TestSimulator(unittest.TestCase):
                               'simulation_file': 'config_test',
                               'show_on_second_monitor': True,
                               'fullscreen': True,
-                              'maximized': True
+                              'maximized': True,
+                              'headless': False,
+                              'speed': 1.0,
+                              'lockstep': False,
+                              'allow_multiple': False
                               })
 
     def test_double_dash_parsing(self):
@@ -48,7 +56,11 @@ class TestSimulator(unittest.TestCase):
                               'simulation_file': 'config_test',
                               'show_on_second_monitor': True,
                               'fullscreen': True,
-                              'maximized': True
+                              'maximized': True,
+                              'headless': False,
+                              'speed': 1.0,
+                              'lockstep': False,
+                              'allow_multiple': False
                               })
 
     def test_main_print_version(self):
@@ -63,7 +75,7 @@ class TestSimulator(unittest.TestCase):
     def test_main(self):
         testargs = ['name']
         with patch.object(sys, 'argv', testargs):
-            with patch('ev3dev2simulator.simulator.Visualiser') as VisualiserMock:
+            with patch('ev3dev2simulator.visualisation.visualiser.Visualiser') as VisualiserMock:
                 with patch('ev3dev2simulator.simulator.ServerSockets') as serverSocketsMock:
                     sockets_instance = serverSocketsMock.return_value
                     main(None)
@@ -83,6 +95,34 @@ class TestSimulator(unittest.TestCase):
                     self.assertEqual(fn_name, 'start')
                     self.assertEqual(args, ())
 
+    def test_headless_parsing(self):
+        args = vars(parse_args(['--headless', '--speed', '20']))
+        self.assertTrue(args['headless'])
+        self.assertEqual(args['speed'], 20.0)
+
+    def test_allow_multiple_parsing(self):
+        args = vars(parse_args(['--allow-multiple']))
+        self.assertTrue(args['allow_multiple'])
+
+    def test_lockstep_parsing(self):
+        args = vars(parse_args(['--lockstep']))
+        self.assertTrue(args['lockstep'])
+        self.assertFalse(args['headless'])
+
+    def test_main_headless(self):
+        testargs = ['name', '--headless']
+        with patch.object(sys, 'argv', testargs):
+            with patch('ev3dev2simulator.simulator.HeadlessRunner') as HeadlessRunnerMock:
+                with patch('ev3dev2simulator.simulator.ServerSockets') as serverSocketsMock:
+                    sockets_instance = serverSocketsMock.return_value
+                    main(None)
+
+                    self.assertEqual(len(HeadlessRunnerMock.mock_calls), 2)
+                    fn_name, args, kwargs = HeadlessRunnerMock.mock_calls[1]
+                    self.assertEqual(fn_name, '().run')
+
+                    self.assertEqual(len(sockets_instance.mock_calls), 2)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+from unittest.mock import MagicMock
+
+from ev3dev2simulator.util.instance_checker import InstanceChecker
+
+
+class TestInstanceChecker(unittest.TestCase):
+
+    def test_second_instance_exits(self):
+        first = InstanceChecker(MagicMock())
+        first.check_for_unique_instance()
+        self.addCleanup(first.lock_file.close)
+
+        second = InstanceChecker(MagicMock())
+        second.pid = 'second'
+        with self.assertRaises(SystemExit):
+            second.check_for_unique_instance()
+        second.lock_file.close()
+
+        # the running instance is asked to activate its window
+        with open(first.pid_file) as pid_file:
+            self.assertEqual(pid_file.read(), 'second')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from types import SimpleNamespace
+
+from ev3dev2simulator.visualisation.pose_interpolator import PoseInterpolator
+
+
+def create_sprite(center_x, center_y, angle):
+    return SimpleNamespace(center_x=center_x, center_y=center_y, angle=angle)
+
+
+class TestPoseInterpolator(unittest.TestCase):
+    def test_apply(self):
+        sprite = create_sprite(0.0, 10.0, 350.0)
+        interpolator = PoseInterpolator()
+        interpolator.capture([sprite])
+
+        sprite.center_x, sprite.center_y, sprite.angle = 10.0, 30.0, 10.0
+        interpolator.capture([sprite])
+
+        interpolator.apply(0.25)
+        self.assertAlmostEqual(sprite.center_x, 2.5)
+        self.assertAlmostEqual(sprite.center_y, 15.0)
+        self.assertAlmostEqual(sprite.angle, 355.0)
+
+        interpolator.apply(2)
+        self.assertAlmostEqual(sprite.center_x, 10.0)
+        self.assertAlmostEqual(sprite.angle, 370.0)
+
+        interpolator.restore()
+        self.assertEqual((sprite.center_x, sprite.center_y, sprite.angle), (10.0, 30.0, 10.0))
+
+    def test_apply_new_sprite(self):
+        interpolator = PoseInterpolator()
+        interpolator.capture([create_sprite(0.0, 0.0, 0.0)])
+
+        sprite = create_sprite(5.0, 5.0, 90.0)
+        interpolator.capture([sprite])
+        interpolator.apply(0.5)
+        self.assertEqual((sprite.center_x, sprite.center_y, sprite.angle), (5.0, 5.0, 90.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
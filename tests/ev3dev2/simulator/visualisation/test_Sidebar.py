@@ -1,5 +1,7 @@
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
+
+from PIL import Image
 
 from ev3dev2simulator.state.robot_state import RobotState
 from ev3dev2simulator.util.dimensions import Dimensions
@@ -32,6 +34,43 @@ class MyTestCase(unittest.TestCase):
         self.assertEqual(sidebar.robot_info[state.name][(0, 'ev3-ports:in4')]['value'], 5)
         self.assertEqual(sidebar.robot_info[state.name][(0, 'speaker')]['value'], 'test_sound')
 
+    def test_add_robot_info_dirty(self):
+        conf = TestRobotState.default_config()
+        state = RobotState(conf)
+
+        sidebar = Sidebar(Point(100, 150), Dimensions(200, 300))
+        sidebar.init_robot(state.name, state.sensors, state.bricks, [])
+        state.values[(0, 'ev3-ports:in4')] = 5
+        sidebar.add_robot_info(state.name, state.values, state.sounds)
+        self.assertTrue(sidebar.is_dirty)
+
+        sidebar._update_text()
+        self.assertFalse(sidebar.is_dirty)
+        self.assertEqual(len(sidebar.text_sprites), 1)
+
+        sidebar.add_robot_info(state.name, state.values, state.sounds)
+        self.assertFalse(sidebar.is_dirty)
+        state.values[(0, 'ev3-ports:in4')] = 5.0
+        sidebar.add_robot_info(state.name, state.values, state.sounds)
+        self.assertTrue(sidebar.is_dirty)
+
+    @patch('ev3dev2simulator.visualisation.sidebar.TEXT_CACHE_SIZE', 2)
+    @patch('arcade.get_text_image')
+    def test_text_cache(self, get_text_image_mock):
+        get_text_image_mock.side_effect = lambda text, color, size: Image.new('RGBA', (len(text), size))
+        sidebar = Sidebar(Point(100, 150), Dimensions(200, 300))
+
+        first = sidebar._get_text_image('first: 1', 10)
+        self.assertIs(sidebar._get_text_image('first: 1', 10), first)
+        sidebar._get_text_image('second: 2', 10)
+        sidebar._get_text_image('first: 1', 10)
+        sidebar._get_text_image('third: 3', 10)
+        self.assertEqual(get_text_image_mock.call_count, 3)
+
+        self.assertEqual(list(sidebar.text_cache), [('first: 1', 10), ('third: 3', 10)])
+        sidebar._get_text_image('second: 2', 10)
+        self.assertEqual(get_text_image_mock.call_count, 4)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -39,6 +39,21 @@ class TestVisualiser(unittest.TestCase):
         vis.update_current_screen()  # only checking if it does not crash at the moment
         vis.on_draw()
 
+    def test_resize_keeps_physics(self):
+        if conf.PRODUCTION:
+            return
+
+        world_state_mock = MagicMock()
+
+        world_state_mock.board_height = 500
+        world_state_mock.board_width = 500
+        vis = Visualiser(lambda: None, world_state_mock, False, False, False)
+        world_state_mock.setup_pymunk_shapes.assert_called_once_with(1)
+
+        vis.on_resize(800, 600)
+        world_state_mock.setup_pymunk_shapes.assert_called_once_with(1)
+        self.assertAlmostEqual(vis.scale, 600 / 500)
+
 
 if __name__ == '__main__':
     unittest.main()